@@ -0,0 +1,80 @@
+"""
+Benchmark of how :class:`oauth2.Provider` finds the grant of a request.
+
+Compares the route table with calling every grant factory in turn, for a
+request of the last registered grant and for an unsupported request::
+
+    python benchmarks/bench_dispatch.py
+"""
+import os
+import sys
+import timeit
+from io import BytesIO
+
+sys.path.insert(0, os.path.abspath(os.path.realpath(__file__) + '/../../'))
+
+from oauth2 import Provider
+from oauth2.compatibility import urlencode
+from oauth2.grant import (AuthorizationCodeGrant, ClientCredentialsGrant,
+                          ImplicitGrant, RefreshToken, ResourceOwnerGrant)
+from oauth2.store.memory import ClientStore, TokenStore
+from oauth2.tokengenerator import Uuid4TokenGenerator
+from oauth2.web import (AuthorizationCodeGrantSiteAdapter,
+                        ImplicitGrantSiteAdapter,
+                        ResourceOwnerGrantSiteAdapter)
+from oauth2.web.wsgi import Request
+
+NUMBER = 50000
+
+
+class ProbingProvider(Provider):
+    """
+    Looks up grants like before the route table was introduced.
+    """
+
+    def _find_grant(self, request):
+        for grant in self.grant_types:
+            grant_handler = grant(request, self)
+            if grant_handler is not None:
+                return grant_handler
+
+        return None
+
+
+def create_provider(provider_class):
+    token_store = TokenStore()
+    provider = provider_class(access_token_store=token_store, auth_code_store=token_store,
+                              client_store=ClientStore(), token_generator=Uuid4TokenGenerator())
+    provider.add_grant(AuthorizationCodeGrant(site_adapter=AuthorizationCodeGrantSiteAdapter()))
+    provider.add_grant(ImplicitGrant(site_adapter=ImplicitGrantSiteAdapter()))
+    provider.add_grant(ResourceOwnerGrant(site_adapter=ResourceOwnerGrantSiteAdapter()))
+    provider.add_grant(RefreshToken(expires_in=3600))
+    provider.add_grant(ClientCredentialsGrant())
+    return provider
+
+
+def token_request(grant_type):
+    body = urlencode({"grant_type": grant_type}).encode("utf-8")
+    return Request({"REQUEST_METHOD": "POST", "QUERY_STRING": "", "PATH_INFO": "/token",
+                    "CONTENT_TYPE": "application/x-www-form-urlencoded",
+                    "CONTENT_LENGTH": str(len(body)), "wsgi.input": BytesIO(body)})
+
+
+def determine(provider, request):
+    provider._find_grant(request)
+
+
+def main():
+    requests = [("client_credentials", token_request("client_credentials")),
+                ("unsupported", token_request("unsupported"))]
+    providers = [("probing", create_provider(ProbingProvider)), ("routes", create_provider(Provider))]
+
+    print("{0:<20}".format("") + "".join("{0:>16}".format(name) for name, _ in providers))
+    for request_name, request in requests:
+        timings = [timeit.timeit(lambda: determine(provider, request), number=NUMBER) / NUMBER * 1e6
+                   for _, provider in providers]
+        print("{0:<20}".format(request_name) + "".join("{0:>13.2f} us".format(timing) for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Throughput of random token generators with and without :class:`oauth2.tokengenerator.EntropyPool`::
+
+    python benchmarks/bench_entropy.py
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.realpath(__file__) + '/../../'))
+
+from oauth2.tokengenerator import URandomTokenGenerator, Uuid4TokenGenerator
+
+NUMBER = 100000
+THREADS = 4
+
+
+def urandom_sha512(length=40):
+    """
+    The implementation of ``URandomTokenGenerator.generate`` before the entropy pool.
+    """
+    hash_gen = hashlib.new("sha512")
+    hash_gen.update(os.urandom(100))
+    return hash_gen.hexdigest()[:length]
+
+
+def tokens_per_second(generate, threads=1):
+    def issue():
+        for _ in range(NUMBER // threads):
+            generate()
+
+    workers = [threading.Thread(target=issue) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return NUMBER / (time.perf_counter() - start)
+
+
+def main():
+    candidates = [("os.urandom + sha512", urandom_sha512),
+                  ("URandomTokenGenerator", URandomTokenGenerator().generate),
+                  ("URandom urlsafe", URandomTokenGenerator(urlsafe=True).generate),
+                  ("str(uuid.uuid4())", lambda: str(uuid.uuid4())),
+                  ("Uuid4TokenGenerator", Uuid4TokenGenerator().generate)]
+
+    print("{0:<24}{1:>16}{2:>16}".format("tokens/s", "1 thread", "{0} threads".format(THREADS)))
+    for name, generate in candidates:
+        print("{0:<24}{1:>16,.0f}{2:>16,.0f}".format(name, tokens_per_second(generate),
+                                                    tokens_per_second(generate, THREADS)))
+
+
+if __name__ == "__main__":
+    main()
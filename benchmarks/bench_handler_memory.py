@@ -0,0 +1,87 @@
+"""
+Memory held by the grant handler of one request, measured with ``tracemalloc``.
+
+Grant handlers and :class:`oauth2.grant.Scope` declare ``__slots__``. The
+comparison uses subclasses without ``__slots__``, which store their
+attributes in a ``__dict__`` like the handlers did before::
+
+    python benchmarks/bench_handler_memory.py
+"""
+import os
+import sys
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.abspath(os.path.realpath(__file__) + '/../../'))
+
+from oauth2 import Provider, grant
+from oauth2.compatibility import urlencode
+from oauth2.grant import (AuthorizationCodeGrant, ClientCredentialsGrant,
+                          RefreshToken, ResourceOwnerGrant, Scope)
+from oauth2.store.memory import ClientStore, TokenStore
+from oauth2.tokengenerator import Uuid4TokenGenerator
+from oauth2.web import (AuthorizationCodeGrantSiteAdapter,
+                        ResourceOwnerGrantSiteAdapter)
+from oauth2.web.wsgi import Request
+
+NUMBER = 10000
+
+HANDLERS = ["AuthorizationCodeTokenHandler", "ResourceOwnerGrantHandler", "RefreshTokenHandler",
+            "ClientCredentialsHandler"]
+
+
+class DictScope(Scope):
+    pass
+
+
+def create_provider(scope_class):
+    token_store = TokenStore()
+    provider = Provider(access_token_store=token_store, auth_code_store=token_store,
+                        client_store=ClientStore(), token_generator=Uuid4TokenGenerator())
+    provider.add_grant(AuthorizationCodeGrant(site_adapter=AuthorizationCodeGrantSiteAdapter(),
+                                              scope_class=scope_class))
+    provider.add_grant(ResourceOwnerGrant(site_adapter=ResourceOwnerGrantSiteAdapter(), scope_class=scope_class))
+    provider.add_grant(RefreshToken(expires_in=3600, scope_class=scope_class))
+    provider.add_grant(ClientCredentialsGrant(scope_class=scope_class))
+    return provider
+
+
+def token_request(grant_type):
+    body = urlencode({"grant_type": grant_type}).encode("utf-8")
+    return Request({"REQUEST_METHOD": "POST", "QUERY_STRING": "", "PATH_INFO": "/token",
+                    "CONTENT_TYPE": "application/x-www-form-urlencoded",
+                    "CONTENT_LENGTH": str(len(body)), "wsgi.input": BytesIO(body)})
+
+
+def measure(provider, request):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    handlers = [provider._determine_grant_type(request) for _ in range(NUMBER)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in stats) - sys.getsizeof(handlers)
+    blocks = sum(stat.count_diff for stat in stats) - 1
+    return size / float(NUMBER), blocks / float(NUMBER)
+
+
+def main():
+    grant_types = ["authorization_code", "password", "refresh_token", "client_credentials"]
+
+    slotted = [measure(create_provider(Scope), token_request(grant_type)) for grant_type in grant_types]
+
+    # Subclasses without __slots__ get a __dict__ again.
+    for name in HANDLERS:
+        setattr(grant, name, type(name, (getattr(grant, name),), {}))
+
+    with_dict = [measure(create_provider(DictScope), token_request(grant_type)) for grant_type in grant_types]
+
+    print("{0:<20}{1:>24}{2:>24}".format("", "__dict__ bytes/blocks", "__slots__ bytes/blocks"))
+    for grant_type, (dict_size, dict_blocks), (slots_size, slots_blocks) in zip(grant_types, with_dict, slotted):
+        print("{0:<20}{1:>16.0f} / {2:<5.1f}{3:>16.0f} / {4:<5.1f}".format(
+            grant_type, dict_size, dict_blocks, slots_size, slots_blocks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Report of the bytes per access token that :class:`oauth2.store.redisdb.TokenStore` writes to redis.
+
+Compares the previous layout, which stored a copy of the token data under the
+access token, the unique token key and the refresh token, with the current
+layout, in which the unique token key only points to the record, and the
+value codecs of the current layout. The payload sizes are computed without a server::
+
+    python benchmarks/bench_redis_memory.py
+
+With a reachable redis-server the report also contains the bytes redis
+allocates per token as reported by ``MEMORY USAGE``. Set ``REDIS_HOST`` and
+``REDIS_PORT`` to use another server than ``127.0.0.1:6379``. Keys are
+written to database ``REDIS_DB`` (default 15) with the prefix ``oauth2bench``
+and deleted afterwards.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.realpath(__file__) + '/../../'))
+
+import redis
+from oauth2.compatibility import json
+from oauth2.datatype import AccessToken
+from oauth2.store.redisdb import HashCodec, JsonCodec, MsgpackCodec, TokenStore, msgpack
+from oauth2.tokengenerator import Uuid4TokenGenerator
+
+NUMBER = 1000
+
+
+class CopyingTokenStore(TokenStore):
+    """
+    Writes a copy of the token data under every key like the store did before.
+    """
+
+    def _save_token(self, access_token, pipe):
+        data = access_token.__dict__
+
+        self.write(access_token.token, data, pipe)
+        self.write(self._unique_token_key(access_token.client_id, access_token.grant_type, access_token.user_id),
+                   data, pipe)
+
+        if access_token.refresh_token is not None:
+            self.write(access_token.refresh_token, data, pipe)
+
+
+class RecordingPipeline(object):
+    """
+    Collects the keys and values written by a store.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, name, value, ex=None):
+        self.values[name] = value
+
+    def delete(self, name):
+        self.values.pop(name, None)
+
+    def hset(self, name, mapping):
+        self.values[name] = mapping
+
+    def expire(self, name, ttl):
+        pass
+
+    def execute(self):
+        pass
+
+
+def size(value):
+    if isinstance(value, dict):
+        return sum(size(name) + size(field) for name, field in value.items())
+
+    return len(value if isinstance(value, bytes) else value.encode("utf-8"))
+
+
+def access_tokens():
+    generator = Uuid4TokenGenerator()
+    return [AccessToken(client_id="client-{0}".format(number % 10), grant_type="password",
+                        token=generator.generate(), refresh_token=generator.generate(),
+                        data={"name": "John"}, scopes=["read", "write"], expires_at=2000000000,
+                        refresh_expires_at=2000086400, user_id=number)
+            for number in range(NUMBER)]
+
+
+def payload_bytes(store_class, codec, tokens):
+    pipe = RecordingPipeline()
+    store = store_class(rs=object(), prefix="oauth2bench", codec=codec)
+
+    for access_token in tokens:
+        store._save_token(access_token, pipe)
+
+    return sum(size(name) + size(value) for name, value in pipe.values.items()) / float(len(tokens))
+
+
+def memory_usage(rs, store_class, codec, tokens):
+    store = store_class(rs=rs, prefix="oauth2bench", codec=codec)
+    store.save_tokens(tokens)
+
+    keys = list(rs.scan_iter(match="oauth2bench_*", count=1000))
+    pipe = rs.pipeline(transaction=False)
+    for key in keys:
+        pipe.memory_usage(key, samples=0)
+    size = sum(pipe.execute())
+
+    rs.delete(*keys)
+    return size / float(len(tokens))
+
+
+def connect():
+    rs = redis.StrictRedis(host=os.environ.get("REDIS_HOST", "127.0.0.1"),
+                           port=int(os.environ.get("REDIS_PORT", 6379)), db=int(os.environ.get("REDIS_DB", 15)))
+    try:
+        rs.ping()
+    except redis.ConnectionError:
+        return None
+
+    return rs
+
+
+def main():
+    tokens = access_tokens()
+    rs = connect()
+    layouts = [("copies", CopyingTokenStore, JsonCodec()),
+               ("record + pointer", TokenStore, JsonCodec()),
+               ("hash", TokenStore, HashCodec())]
+    if msgpack is not None:
+        layouts.append(("msgpack", TokenStore, MsgpackCodec()))
+
+    print("token data: {0} bytes".format(len(json.dumps(tokens[0].__dict__))))
+    print("{0:<20}{1:>24}{2:>24}".format("", "payload bytes / token", "redis bytes / token"))
+    for name, store_class, codec in layouts:
+        if rs is not None:
+            usage = "{0:>24.0f}".format(memory_usage(rs, store_class, codec, tokens))
+        else:
+            usage = "{0:>24}".format("-")
+        print("{0:<20}{1:>24.0f}{2}".format(name, payload_bytes(store_class, codec, tokens), usage))
+
+    if rs is None:
+        print("\nNo redis server reachable, MEMORY USAGE was not measured.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of the writes of :class:`oauth2.store.redisdb.TokenStore` against a local redis-server.
+
+Compares storing an access token and deleting a refresh token with one command
+per key, like the store did before, with the pipelined ``MULTI`` block and the
+delete script used now::
+
+    redis-server --port 6379 &
+    python benchmarks/bench_redis_store.py
+
+Set ``REDIS_HOST`` and ``REDIS_PORT`` to use another server. Keys are written
+to database ``REDIS_DB`` (default 15) with the prefix ``oauth2bench``.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.realpath(__file__) + '/../../'))
+
+import redis
+from oauth2.datatype import AccessToken
+from oauth2.store.redisdb import TokenStore
+
+NUMBER = 5000
+
+
+class UnpipelinedTokenStore(TokenStore):
+    """
+    Writes and deletes like the store did before, with one round trip per key.
+    """
+
+    def save_token(self, access_token):
+        self.write(access_token.token, access_token.__dict__)
+
+        unique_token_key = self._unique_token_key(access_token.client_id, access_token.grant_type, access_token.user_id)
+        self.write(unique_token_key, access_token.__dict__)
+
+        if access_token.refresh_token is not None:
+            self.write(access_token.refresh_token, access_token.__dict__)
+
+    def delete_refresh_token(self, refresh_token):
+        access_token = self.fetch_by_refresh_token(refresh_token)
+
+        self.delete(access_token.token)
+        self.delete(refresh_token)
+
+
+def access_token(number):
+    return AccessToken(client_id="abc", grant_type="password", token="token-{0}".format(number),
+                       refresh_token="refresh-{0}".format(number), data={"name": "John"}, scopes=["read", "write"],
+                       expires_at=2000000000, user_id=number)
+
+
+def bench(store):
+    tokens = [access_token(number) for number in range(NUMBER)]
+
+    save = timeit.timeit(lambda: store.save_token(tokens.pop()), number=NUMBER)
+    refresh_tokens = ["refresh-{0}".format(number) for number in range(NUMBER)]
+    delete = timeit.timeit(lambda: store.delete_refresh_token(refresh_tokens.pop()), number=NUMBER)
+
+    return save / NUMBER * 1e6, delete / NUMBER * 1e6
+
+
+def main():
+    rs = redis.StrictRedis(host=os.environ.get("REDIS_HOST", "127.0.0.1"),
+                           port=int(os.environ.get("REDIS_PORT", 6379)), db=int(os.environ.get("REDIS_DB", 15)))
+    try:
+        rs.ping()
+    except redis.ConnectionError as error:
+        sys.exit("Cannot connect to redis: {0}".format(error))
+
+    results = [("one per key", bench(UnpipelinedTokenStore(rs=rs, prefix="oauth2bench"))),
+               ("pipelined", bench(TokenStore(rs=rs, prefix="oauth2bench")))]
+
+    print("{0:<16}{1:>18}{2:>26}".format("", "us / save_token", "us / delete_refresh_token"))
+    for name, (save, delete) in results:
+        print("{0:<16}{1:>18.2f}{2:>26.2f}".format(name, save, delete))
+
+
+if __name__ == "__main__":
+    main()
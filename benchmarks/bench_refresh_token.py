@@ -0,0 +1,143 @@
+"""
+End-to-end benchmark of the refresh token grant.
+
+Sends refresh token requests through :meth:`oauth2.Provider.dispatch` and
+counts the calls that reach the token backend. The redis store talks to an
+in-process client that only counts commands, so the timings show the cost of
+the provider itself. The stateless store reads everything from the signed
+refresh token and makes no backend call at all::
+
+    python benchmarks/bench_refresh_token.py
+"""
+import os
+import sys
+import timeit
+from io import BytesIO
+
+sys.path.insert(0, os.path.abspath(os.path.realpath(__file__) + '/../../'))
+
+from oauth2 import Provider
+from oauth2.compatibility import json, urlencode
+from oauth2.grant import RefreshToken, ResourceOwnerGrant
+from oauth2.store.memory import ClientStore
+from oauth2.store.redisdb import TokenStore as RedisTokenStore
+from oauth2.store.stateless import TokenStore as StatelessTokenStore
+from oauth2.tokengenerator import StatelessTokenGenerator, Uuid4TokenGenerator
+from oauth2.web import ResourceOwnerGrantSiteAdapter
+from oauth2.web.wsgi import Request
+
+NUMBER = 5000
+
+
+class CountingRedis(object):
+    """
+    Keeps values in a ``dict`` and counts every round trip to it.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.data = {}
+
+    def get(self, name):
+        self.calls += 1
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None):
+        self.calls += 1
+        self.data[name] = value.encode("utf-8")
+
+    def delete(self, name):
+        self.calls += 1
+        self.data.pop(name, None)
+
+    def pipeline(self, transaction=True):
+        return CountingPipeline(self)
+
+    def register_script(self, script):
+        def read(keys, args):
+            self.calls += 1
+            return self.data.get(keys[0])
+
+        return read
+
+
+class CountingPipeline(object):
+    """
+    Queues commands and sends them to a :class:`CountingRedis` as one round trip.
+    """
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, name, value, ex=None):
+        self.commands.append((name, value))
+
+    def delete(self, name):
+        self.commands.append((name, None))
+
+    def execute(self):
+        self.redis.calls += 1
+        results = []
+        for name, value in self.commands:
+            if value is None:
+                results.append(int(self.redis.data.pop(name, None) is not None))
+            else:
+                self.redis.data[name] = value.encode("utf-8")
+                results.append(True)
+        return results
+
+
+class SiteAdapter(ResourceOwnerGrantSiteAdapter):
+    def authenticate(self, request, environ, scopes, client):
+        return {"name": "John"}, 123
+
+
+def create_provider(token_store, token_generator):
+    client_store = ClientStore()
+    client_store.add_client(client_id="abc", client_secret="secret", redirect_uris=[])
+
+    provider = Provider(access_token_store=token_store, auth_code_store=None, client_store=client_store,
+                        token_generator=token_generator)
+    provider.add_grant(ResourceOwnerGrant(site_adapter=SiteAdapter(), expires_in=600))
+    provider.add_grant(RefreshToken(expires_in=3600))
+    return provider
+
+
+def token_request(provider, **params):
+    body = urlencode(dict(client_id="abc", client_secret="secret", **params)).encode("utf-8")
+    request = Request({"REQUEST_METHOD": "POST", "QUERY_STRING": "", "PATH_INFO": "/token",
+                       "CONTENT_TYPE": "application/x-www-form-urlencoded",
+                       "CONTENT_LENGTH": str(len(body)), "wsgi.input": BytesIO(body)})
+    response = provider.dispatch(request, {})
+    assert response.status_code == 200, response.body
+    return json.loads(response.body)
+
+
+def bench(provider, backend=None):
+    refresh_token = token_request(provider, grant_type="password", username="john",
+                                  password="pass")["refresh_token"]
+
+    calls = backend.calls if backend is not None else 0
+    seconds = timeit.timeit(lambda: token_request(provider, grant_type="refresh_token", refresh_token=refresh_token),
+                            number=NUMBER)
+    calls = (backend.calls - calls) if backend is not None else 0
+
+    return seconds / NUMBER * 1e6, calls / float(NUMBER)
+
+
+def main():
+    redis_client = CountingRedis()
+    stateless_token = StatelessTokenGenerator(secret_key="secret")
+
+    results = [("redis", bench(create_provider(RedisTokenStore(rs=redis_client), Uuid4TokenGenerator()),
+                               redis_client)),
+               ("stateless", bench(create_provider(StatelessTokenStore(stateless_token), stateless_token)))]
+
+    print("{0:<12}{1:>16}{2:>24}".format("", "us / refresh", "backend calls / refresh"))
+    for name, (micros, calls) in results:
+        print("{0:<12}{1:>16.2f}{2:>24.1f}".format(name, micros, calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark of :class:`oauth2.tokengenerator.StatelessTokenGenerator`.
+
+Compares the built-in signer with the previous implementation that went
+through ``itsdangerous.URLSafeTimedSerializer`` for every token and with
+the compact token format::
+
+    python benchmarks/bench_tokengenerator.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.realpath(__file__) + '/../../'))
+
+import itsdangerous
+
+from oauth2.error import AccessTokenNotFound
+from oauth2.tokengenerator import StatelessTokenGenerator
+
+NUMBER = 20000
+
+ARGS = dict(grant_type="authorization_code", data={"name": "John"}, scopes=["profile_read", "profile_write"],
+            user_id="user1", client_id="client1")
+
+
+class ItsdangerousTokenGenerator(StatelessTokenGenerator):
+    """
+    The implementation before the signer was moved into ``oauth2.tokengenerator``.
+    """
+
+    def __init__(self, secret_key):
+        StatelessTokenGenerator.__init__(self, secret_key)
+        self.serializer = itsdangerous.URLSafeTimedSerializer(secret_key)
+
+    def json_serialize(self, data):
+        _data = dict((k, v) for k, v in data.items() if v)
+        return self.serializer.dumps(_data)
+
+    def unserialize(self, serialized):
+        try:
+            payload, timestamp = self.serializer.loads(serialized, return_timestamp=True)
+            payload["refresh_expires_at"] = timestamp
+            return payload
+        except (itsdangerous.BadSignature, itsdangerous.SignatureExpired):
+            raise AccessTokenNotFound
+
+    def generate(self, grant_type=None, data=None, scopes=None, user_id=None, client_id=None):
+        return self.json_serialize(dict(type='access_token', grant_type=grant_type, user_id=user_id, data=data,
+                                        scopes=scopes, client_id=client_id))
+
+    def refresh_generate(self, grant_type=None, data=None, scopes=None, user_id=None, client_id=None):
+        return self.json_serialize(dict(type='refresh_token', grant_type=grant_type, user_id=user_id, data=data,
+                                        scopes=scopes, client_id=client_id))
+
+
+def bench(generator):
+    token = generator.generate(**ARGS)
+
+    return len(token), {
+        "generate": timeit.timeit(lambda: generator.generate(**ARGS), number=NUMBER),
+        "refresh_generate": timeit.timeit(lambda: generator.refresh_generate(**ARGS), number=NUMBER),
+        "validate_token": timeit.timeit(lambda: generator.validate_token(token, "access_token"), number=NUMBER),
+    }
+
+
+def main():
+    scopes = ARGS["scopes"]
+    results = [("itsdangerous",) + bench(ItsdangerousTokenGenerator("secret")),
+               ("json",) + bench(StatelessTokenGenerator("secret")),
+               ("compact",) + bench(StatelessTokenGenerator("secret", token_format="compact", scopes=scopes))]
+
+    print("{0:<20}".format("") + "".join("{0:>16}".format(name) for name, _, _ in results))
+    print("{0:<20}".format("token length") + "".join("{0:>16}".format(size) for _, size, _ in results))
+    for name in results[0][2]:
+        print("{0:<20}".format(name) + "".join("{0:>13.2f} us".format(timings[name] / NUMBER * 1e6)
+                                               for _, _, timings in results))
+
+
+if __name__ == "__main__":
+    main()
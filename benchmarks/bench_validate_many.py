@@ -0,0 +1,66 @@
+"""
+Benchmark of :meth:`oauth2.tokengenerator.StatelessTokenGenerator.validate_many`.
+
+Compares batch validation with calling ``validate_token`` for every token,
+like an API gateway does::
+
+    python benchmarks/bench_validate_many.py
+"""
+import os
+import sys
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.realpath(__file__) + '/../../'))
+
+from oauth2.error import AccessTokenNotFound
+from oauth2.tokengenerator import StatelessTokenGenerator
+
+BATCH_SIZE = 10000
+NUMBER = 5
+
+
+def validate_loop(generator, tokens):
+    results = []
+    for token in tokens:
+        try:
+            results.append((generator.validate_token(token, "access_token"), None))
+        except AccessTokenNotFound as error:
+            results.append((None, error))
+    return results
+
+
+def batches(generator):
+    unique = [generator.generate(grant_type="password", scopes=["profile_read"], user_id=str(i), client_id="abc")
+              for i in range(BATCH_SIZE)]
+    # A gateway sees the same bearer token many times, and some invalid ones.
+    repeated = [unique[i % 500] for i in range(BATCH_SIZE)]
+    invalid = [token[:-2] if i % 10 == 0 else token for i, token in enumerate(unique)]
+
+    return [("unique tokens", unique), ("500 distinct tokens", repeated), ("10% invalid", invalid)]
+
+
+def main():
+    executor = ThreadPoolExecutor(max_workers=4)
+
+    for token_format in StatelessTokenGenerator.token_formats:
+        generator = StatelessTokenGenerator("secret", token_format=token_format)
+
+        print("{0} tokens, batches of {1}".format(token_format, BATCH_SIZE))
+        print("{0:<24}{1:>16}{2:>16}{3:>16}".format("", "validate_token", "validate_many", "thread pool"))
+
+        for name, tokens in batches(generator):
+            timings = [timeit.timeit(lambda: validate_loop(generator, tokens), number=NUMBER),
+                       timeit.timeit(lambda: generator.validate_many(tokens, "access_token"), number=NUMBER),
+                       timeit.timeit(lambda: generator.validate_many(tokens, "access_token", executor=executor),
+                                     number=NUMBER)]
+
+            print("{0:<24}".format(name) + "".join("{0:>13.2f} us".format(timing / NUMBER / BATCH_SIZE * 1e6)
+                                                   for timing in timings))
+        print("")
+
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
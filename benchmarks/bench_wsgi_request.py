@@ -0,0 +1,74 @@
+"""
+Benchmark of :class:`oauth2.web.wsgi.Request`.
+
+Compares parsing the query string and body up front with parsing them on
+first access, for a token request that reads three params and for a request
+that the provider rejects without reading any::
+
+    python benchmarks/bench_wsgi_request.py
+"""
+import os
+import sys
+import timeit
+from io import BytesIO
+
+sys.path.insert(0, os.path.abspath(os.path.realpath(__file__) + '/../../'))
+
+from oauth2.compatibility import parse_qs, urlencode
+from oauth2.web.wsgi import Request
+
+NUMBER = 50000
+
+
+class EagerRequest(object):
+    """
+    Parses like :class:`oauth2.web.wsgi.Request` did before parsing became lazy.
+    """
+
+    def __init__(self, env):
+        self.query_params = dict((param, value[0]) for param, value in parse_qs(env["QUERY_STRING"]).items())
+        self.post_params = {}
+
+        if env["REQUEST_METHOD"] == "POST" and env["CONTENT_TYPE"].startswith("application/x-www-form-urlencoded"):
+            content = env["wsgi.input"].read(int(env["CONTENT_LENGTH"]))
+            for param, value in parse_qs(content).items():
+                self.post_params[param.decode("utf-8")] = value[0].decode("utf-8")
+
+    def post_param(self, name, default=None):
+        return self.post_params.get(name, default)
+
+
+BODY = urlencode({"grant_type": "authorization_code", "client_id": "abc", "client_secret": "secret",
+                  "code": "a" * 40, "redirect_uri": "https://client.example.com/callback?a=1&b=2",
+                  "scope": "profile_read profile_write email"}).encode("utf-8")
+
+
+def environ():
+    return {"REQUEST_METHOD": "POST", "QUERY_STRING": "", "PATH_INFO": "/token",
+            "CONTENT_TYPE": "application/x-www-form-urlencoded", "CONTENT_LENGTH": str(len(BODY)),
+            "wsgi.input": BytesIO(BODY)}
+
+
+def token_request(request_class):
+    request = request_class(environ())
+    request.post_param("grant_type")
+    request.post_param("code")
+    request.post_param("redirect_uri")
+
+
+def rejected_request(request_class):
+    request_class(environ())
+
+
+def main():
+    request_classes = [("eager", EagerRequest), ("lazy", Request)]
+
+    print("{0:<12}".format("") + "".join("{0:>16}".format(name) for name, _ in request_classes))
+    for name, bench in [("token", token_request), ("rejected", rejected_request)]:
+        timings = [timeit.timeit(lambda: bench(request_class), number=NUMBER) / NUMBER * 1e6
+                   for _, request_class in request_classes]
+        print("{0:<12}".format(name) + "".join("{0:>13.2f} us".format(timing) for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -23,13 +23,17 @@ oauth2-stateless is available on
     pip install oauth2-stateless
 """
 
+from operator import itemgetter
+
 from oauth2.client_authenticator import ClientAuthenticator, request_body
-from oauth2.compatibility import json
+from oauth2.compatibility import json_dumps_bytes
+from oauth2.coroutines import maybe_await, run_sync
 from oauth2.error import (ClientNotFoundError, OAuthInvalidError,
                           OAuthInvalidNoRedirectError, UnsupportedGrantError)
-from oauth2.grant import (AuthorizationCodeGrant, ClientCredentialsGrant,
-                          ImplicitGrant, RefreshToken, ResourceOwnerGrant,
-                          Scope)
+from oauth2.grant import (AuthorizationCodeGrant, CheckParamsMixin,
+                          ClientCredentialsGrant, GrantHandlerFactory, ImplicitGrant, RefreshToken,
+                          ResourceOwnerGrant, Scope, ScopeGrant, ScopeTable,
+                          access_token_from_data)
 from oauth2.log import app_log
 from oauth2.tokengenerator import Uuid4TokenGenerator
 from oauth2.web import Response
@@ -56,30 +60,47 @@ class Provider(object):
     :type client_authentication_source: callable
 
     :param response_class: Class of the response object. Defaults to :class:`oauth2.web.Response`.
+                           Responses to invalid redirect URIs and unsupported grants are created once and
+                           copied with ``copy()`` for every request.
     :type response_class: oauth2.web.Response
+
+    :param scope_table: Bits of the scopes in the integer masks issued by grants with ``scope_masks=True``.
+                        Defaults to a new table filled in the order grants are added.
+    :type scope_table: oauth2.grant.ScopeTable
     """
     authorize_path = "/authorize"
     token_path = "/token"
 
     def __init__(self, access_token_store, auth_code_store, client_store,
                  token_generator, client_authentication_source=request_body,
-                 response_class=Response):
+                 response_class=Response, scope_table=None):
         self.grant_types = []
         self._input_handler = None
+        self._routes = {}
+        self._route_params = []
+        self._probed_grants = []
 
         self.access_token_store = access_token_store
         self.auth_code_store = auth_code_store
         self.client_authenticator = ClientAuthenticator(client_store=client_store,
                                                         source=client_authentication_source)
         self.response_class = response_class
+        self.scope_table = ScopeTable() if scope_table is None else scope_table
         self.token_generator = token_generator
 
+        # Responses to the errors that dispatch() answers itself are built once and copied per request.
+        self._error_responses = dict((error, self._build_error_response(error, description)) for error, description
+                                     in (("invalid_redirect_uri", "Invalid redirect URI"),
+                                         ("unsupported_response_type", "Grant not supported")))
+
     def add_grant(self, grant):
         """
         Adds a Grant that the provider should support.
 
         :param grant: An instance of a class that extends :class:`oauth2.grant.GrantHandlerFactory`
         :type grant: oauth2.grant.GrantHandlerFactory
+
+        :raises ValueError: If the grant issues scope masks and the token generator cannot carry them.
         """
         if hasattr(grant, "expires_in"):
             self.token_generator.expires_in[grant.grant_type] = grant.expires_in
@@ -87,8 +108,28 @@ class Provider(object):
         if hasattr(grant, "refresh_expires_in"):
             self.token_generator.refresh_expires_in = grant.refresh_expires_in
 
+        # Masks issued by one grant are checked by another one, all of them use the same bits.
+        if isinstance(grant, ScopeGrant):
+            if grant.scope_policy.issue_masks and not getattr(self.token_generator, "supports_scope_masks", True):
+                raise ValueError("%s cannot issue tokens with scope masks" % type(self.token_generator).__name__)
+
+            grant.scope_policy.use_table(self.scope_table)
+
+        position = len(self.grant_types)
         self.grant_types.append(grant)
 
+        routes = grant.routes() if self._has_routes(grant) else None
+
+        if routes is None:
+            self._probed_grants.append((position, grant))
+            return
+
+        for route in routes:
+            self._routes.setdefault((route.source, route.param, route.value), []).append((position, route))
+
+            if (route.source, route.param) not in self._route_params:
+                self._route_params.append((route.source, route.param))
+
     def dispatch(self, request, environ):
         """
         Checks which Grant supports the current request and dispatches to it.
@@ -102,34 +143,32 @@ class Provider(object):
         :return: An instance of ``oauth2.web.Response``.
         """
         try:
-            grant_type = self._determine_grant_type(request)
+            grant_type = self._find_grant(request)
+
+            if grant_type is None:
+                return self._error_response("unsupported_response_type")
 
             response = self.response_class()
 
-            grant_type.read_validate_params(request)
+            # Built-in handlers return common errors instead of raising them.
+            if self._checks_params(grant_type):
+                error = run_sync(grant_type._check_params_async(request))
+            else:
+                error = grant_type.read_validate_params(request)
+
+            if isinstance(error, OAuthInvalidNoRedirectError):
+                return self._error_response("invalid_redirect_uri")
+            if isinstance(error, OAuthInvalidError):
+                return grant_type.handle_error(error=error, response=response)
 
             return grant_type.process(request, response, environ)
         except OAuthInvalidNoRedirectError:
-            response = self.response_class()
-            response.add_header("Content-Type", "application/json")
-            response.status_code = 400
-            response.body = json.dumps({
-                "error": "invalid_redirect_uri",
-                "error_description": "Invalid redirect URI"
-            })
-            return response
+            return self._error_response("invalid_redirect_uri")
         except OAuthInvalidError as err:
             response = self.response_class()
             return grant_type.handle_error(error=err, response=response)
         except UnsupportedGrantError:
-            response = self.response_class()
-            response.add_header("Content-Type", "application/json")
-            response.status_code = 400
-            response.body = json.dumps({
-                "error": "unsupported_response_type",
-                "error_description": "Grant not supported"
-            })
-            return response
+            return self._error_response("unsupported_response_type")
         except:
             app_log.error("Uncaught Exception", exc_info=True)
             response = self.response_class()
@@ -137,6 +176,115 @@ class Provider(object):
                 error=OAuthInvalidError(error="server_error", explanation="Internal server error"),
                 response=response)
 
+    async def dispatch_async(self, request, environ):
+        """
+        Like :meth:`dispatch` but awaits asynchronous stores and site adapters instead of blocking on them.
+
+        Stores, site adapters and the client store can each be synchronous or implement the interfaces in
+        :mod:`oauth2.store` and :mod:`oauth2.web` with coroutines. Synchronous ones are called directly.
+
+        :param request: The incoming request.
+        :type request: :class:`oauth2.web.Request`
+
+        :param environ: Dict containing variables of the environment.
+        :type environ: dict
+
+        :return: An instance of ``oauth2.web.Response``.
+        """
+        try:
+            grant_type = self._find_grant(request)
+
+            if grant_type is None:
+                return self._error_response("unsupported_response_type")
+
+            response = self.response_class()
+
+            if self._checks_params(grant_type):
+                error = await grant_type._check_params_async(request)
+            else:
+                error = await maybe_await(grant_type.read_validate_params_async(request))
+
+            if isinstance(error, OAuthInvalidNoRedirectError):
+                return self._error_response("invalid_redirect_uri")
+            if isinstance(error, OAuthInvalidError):
+                return grant_type.handle_error(error=error, response=response)
+
+            return await maybe_await(grant_type.process_async(request, response, environ))
+        except OAuthInvalidNoRedirectError:
+            return self._error_response("invalid_redirect_uri")
+        except OAuthInvalidError as err:
+            response = self.response_class()
+            return grant_type.handle_error(error=err, response=response)
+        except UnsupportedGrantError:
+            return self._error_response("unsupported_response_type")
+        except Exception:
+            app_log.error("Uncaught Exception", exc_info=True)
+            response = self.response_class()
+            return grant_type.handle_error(
+                error=OAuthInvalidError(error="server_error", explanation="Internal server error"),
+                response=response)
+
+    def issue_tokens(self, requests):
+        """
+        Issues many access tokens at once without an HTTP request, e.g. to bootstrap services or for load tests.
+
+        Tokens are created by :meth:`oauth2.tokengenerator.TokenGenerator.create_access_token_data_many` and
+        persisted with a single call to :meth:`oauth2.store.AccessTokenStore.save_tokens`.
+
+        :param requests: ``dict`` objects with the keys ``client_id``, ``grant_type``, ``user_id``,
+                         ``scopes`` and ``data``. Missing keys default to ``None``.
+        :type requests: list
+
+        :return: A ``list`` of ``dict`` containing ``access_token``, ``token_type`` and, if the grant
+                 issues refresh tokens, ``refresh_token`` and ``expires_in``.
+        :rtype: list
+
+        :raises RuntimeError: If the access token store is asynchronous. Use :meth:`issue_tokens_async` instead.
+        """
+        return run_sync(self.issue_tokens_async(requests))
+
+    async def issue_tokens_async(self, requests):
+        """
+        Like :meth:`issue_tokens` but awaits an asynchronous access token store.
+        """
+        requests = list(requests)
+        results = self.token_generator.create_access_token_data_many(requests)
+
+        await maybe_await(self.access_token_store.save_tokens([
+            access_token_from_data(token_data, request.get("client_id"), request.get("data"),
+                                   request.get("grant_type"), request.get("scopes"), request.get("user_id"),
+                                   self.token_generator)
+            for request, token_data in zip(requests, results)]))
+
+        return results
+
+    def warm_up(self, client_ids=()):
+        """
+        Prepares a freshly started or forked process before it serves its first request.
+
+        Generates a token, which reads the signing keys or refills the entropy pool of the token generator, and
+        fetches the given clients so that caching client stores and connection pools are filled. Grants are already
+        compiled into the dispatch table by :meth:`add_grant`.
+
+        :param client_ids: Identifiers of clients to fetch from the client store.
+        :type client_ids: list
+
+        :raises RuntimeError: If the client store is asynchronous. Use :meth:`warm_up_async` instead.
+        """
+        run_sync(self.warm_up_async(client_ids))
+
+    async def warm_up_async(self, client_ids=()):
+        """
+        Like :meth:`warm_up` but awaits an asynchronous client store.
+        """
+        self.token_generator.generate()
+
+        for client_id in client_ids:
+            try:
+                await maybe_await(self.client_authenticator.client_store.fetch_by_client_id(client_id))
+            except ClientNotFoundError:
+                app_log.warning("Client '%s' to warm up was not found", client_id)
+
     def enable_unique_tokens(self):
         """
         Enable the use of unique access tokens on all grant types that support this option.
@@ -161,10 +309,71 @@ class Provider(object):
         """
         Scope.separator = separator
 
+    @staticmethod
+    def _checks_params(grant_handler):
+        # Subclasses that override the public methods are called through them.
+        handler_class = type(grant_handler)
+        return (isinstance(grant_handler, CheckParamsMixin)
+                and handler_class.read_validate_params is CheckParamsMixin.read_validate_params
+                and handler_class.read_validate_params_async is CheckParamsMixin.read_validate_params_async)
+
+    @staticmethod
+    def _has_routes(grant):
+        if not isinstance(grant, GrantHandlerFactory):
+            return False
+
+        grant_class = type(grant)
+        if grant_class.__call__ is GrantHandlerFactory.__call__:
+            return True
+
+        # A subclass that overrides __call__ decides which requests it handles, unless it declares its routes as well.
+        return _defining_class(grant_class, "__call__") is _defining_class(grant_class, "routes")
+
     def _determine_grant_type(self, request):
-        for grant in self.grant_types:
-            grant_handler = grant(request, self)
+        grant_handler = self._find_grant(request)
+
+        if grant_handler is None:
+            raise UnsupportedGrantError
+
+        return grant_handler
+
+    def _build_error_response(self, error, description):
+        response = self.response_class()
+        response.add_header("Content-Type", "application/json")
+        response.status_code = 400
+        response.body = json_dumps_bytes({"error": error, "error_description": description})
+        return response
+
+    def _error_response(self, error):
+        return self._error_responses[error].copy()
+
+    def _find_grant(self, request):
+        # Grants that declare their routes are looked up by the value of "grant_type" or "response_type".
+        candidates = []
+        for source, param in self._route_params:
+            value = request.post_param(param) if source == "body" else request.get_param(param)
+
+            for position, route in self._routes.get((source, param, value), ()):
+                if route.method is not None and request.method != route.method:
+                    continue
+
+                if route.path is not None and request.path != getattr(self, route.path):
+                    continue
+
+                candidates.append((position, route.create))
+
+        # As with probing every grant, the grant added first wins.
+        candidates.extend(self._probed_grants)
+        if len(candidates) > 1:
+            candidates.sort(key=itemgetter(0))
+
+        for _, create in candidates:
+            grant_handler = create(request, self)
             if grant_handler is not None:
                 return grant_handler
 
-        raise UnsupportedGrantError
+        return None
+
+
+def _defining_class(cls, name):
+    return next(base for base in cls.__mro__ if name in vars(base))
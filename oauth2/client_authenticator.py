@@ -8,6 +8,7 @@ some of which come bundled with this module.
 
 from base64 import b64decode
 
+from oauth2.coroutines import maybe_await, resolve
 from oauth2.error import (ClientNotFoundError, OAuthInvalidError,
                           OAuthInvalidNoRedirectError, RedirectUriUnknown)
 
@@ -33,18 +34,21 @@ class ClientAuthenticator(object):
         :param request: The incoming request
         :type request: oauth2.web.Request
 
-        :return: The identified client
+        :return: The identified client, or an awaitable of it if the client store is asynchronous.
         :rtype: oauth2.datatype.Client
 
         :raises: :class OAuthInvalidNoRedirectError:
         """
+        return resolve(self._by_identifier(request))
+
+    async def _by_identifier(self, request):
         client_id = request.get_param("client_id")
 
         if client_id is None:
             raise OAuthInvalidNoRedirectError(error="missing_client_id")
 
         try:
-            client = self.client_store.fetch_by_client_id(client_id)
+            client = await maybe_await(self.client_store.fetch_by_client_id(client_id))
         except ClientNotFoundError:
             raise OAuthInvalidNoRedirectError(error="unknown_client")
 
@@ -65,28 +69,57 @@ class ClientAuthenticator(object):
         :param request: The incoming request
         :type request: oauth2.web.Request
 
-        :return: The identified client
+        :return: The identified client, or an awaitable of it if the client store is asynchronous.
         :rtype: oauth2.datatype.Client
 
         :raises OAuthInvalidError: If the client could not be found, is not allowed to to use the current grant or
                                    supplied invalid credentials
         """
-        client_id, client_secret = self.source(request=request)
+        return resolve(self._by_identifier_secret(request))
+
+    async def _by_identifier_secret(self, request):
+        client, error = await self._check_identifier_secret(request)
+
+        if error is not None:
+            raise error
+
+        return client
+
+    def check_identifier_secret(self, request):
+        """
+        Like :meth:`by_identifier_secret` but returns the error instead of raising it.
+
+        Rejecting a client this way only costs a few lookups, which matters when most requests carry bad credentials.
+
+        :param request: The incoming request
+        :type request: oauth2.web.Request
+
+        :return: A tuple ``(client, None)`` or ``(None, error)`` where error is an
+                 :class:`oauth2.error.OAuthInvalidError`, or an awaitable of it if the client store is asynchronous.
+        :rtype: tuple
+        """
+        return resolve(self._check_identifier_secret(request))
+
+    async def _check_identifier_secret(self, request):
+        try:
+            client_id, client_secret = self.source(request=request)
+        except OAuthInvalidError as error:
+            return None, error
 
         try:
-            client = self.client_store.fetch_by_client_id(client_id)
+            client = await maybe_await(self.client_store.fetch_by_client_id(client_id))
         except ClientNotFoundError:
-            raise OAuthInvalidError(error="invalid_client", explanation="No client could be found")
+            return None, OAuthInvalidError(error="invalid_client", explanation="No client could be found")
 
         grant_type = request.post_param("grant_type")
         if client.grant_type_supported(grant_type) is False:
-            raise OAuthInvalidError(error="unauthorized_client",
-                                    explanation="The client is not allowed to use this grant type")
+            return None, OAuthInvalidError(error="unauthorized_client",
+                                           explanation="The client is not allowed to use this grant type")
 
         if client.secret != client_secret:
-            raise OAuthInvalidError(error="invalid_client", explanation="Invalid client credentials")
+            return None, OAuthInvalidError(error="invalid_client", explanation="Invalid client credentials")
 
-        return client
+        return client, None
 
 
 def request_body(request):
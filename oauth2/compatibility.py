@@ -6,8 +6,69 @@ and The availability of which depends on the developer's preferences.
 from urllib.parse import parse_qs  # pragma: no cover
 from urllib.parse import urlencode  # pragma: no cover
 from urllib.parse import quote  # pragma: no cover
+from urllib.parse import unquote_plus  # pragma: no cover
 
 try:
     import ujson as json  # pragma: no cover
 except ImportError:
     import json  # pragma: no cover
+
+
+def _orjson_backend():
+    import orjson
+
+    return orjson.dumps
+
+
+def _ujson_backend():
+    import ujson
+
+    return lambda data: ujson.dumps(data).encode("utf-8")
+
+
+def _stdlib_backend():
+    import json
+
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    return lambda data: encode(data).encode("utf-8")
+
+
+#: Backends that serialize JSON to bytes, by preference.
+JSON_BACKENDS = {"orjson": _orjson_backend, "ujson": _ujson_backend, "json": _stdlib_backend}
+
+
+def use_json_backend(name):
+    """
+    Selects the library that :func:`json_dumps_bytes` uses.
+
+    :param name: One of "orjson", "ujson" or "json".
+
+    :raises ValueError: If the backend is unknown.
+    :raises ImportError: If the library of the backend is not installed.
+    """
+    global _dumps_bytes, json_backend
+
+    try:
+        backend = JSON_BACKENDS[name]
+    except KeyError:
+        raise ValueError("Unknown JSON backend '%s'" % name)
+
+    _dumps_bytes = backend()
+    json_backend = name
+
+
+def json_dumps_bytes(data):
+    """
+    Serializes ``data`` to UTF-8 encoded JSON with the selected backend.
+
+    :rtype: bytes
+    """
+    return _dumps_bytes(data)
+
+
+for json_backend in ("orjson", "ujson", "json"):  # pragma: no cover
+    try:
+        use_json_backend(json_backend)
+        break
+    except ImportError:
+        continue
@@ -0,0 +1,99 @@
+"""
+Helpers to serve requests with synchronous and asynchronous stores and site adapters.
+
+The built-in grant handlers implement their logic once as coroutines. Every call to a store, a site adapter or
+the :class:`oauth2.client_authenticator.ClientAuthenticator` goes through :func:`maybe_await`, so a plain
+return value is used as is and an awaitable is awaited. :meth:`oauth2.Provider.dispatch` runs these coroutines
+to completion with :func:`run_sync`, :meth:`oauth2.Provider.dispatch_async` awaits them in an event loop.
+"""
+
+import inspect
+
+
+async def maybe_await(value):
+    """
+    Awaits ``value`` if it is awaitable.
+
+    :param value: The return value of a synchronous or an asynchronous call.
+
+    :return: ``value`` or the result of awaiting it.
+    """
+    if inspect.isawaitable(value):
+        return await value
+
+    return value
+
+
+def run_sync(coroutine):
+    """
+    Runs a coroutine that is expected to finish without suspending.
+
+    That is the case as long as all stores and site adapters it calls are synchronous.
+
+    :param coroutine: The coroutine to run.
+
+    :return: The return value of the coroutine.
+
+    :raises RuntimeError: If the coroutine suspends, e.g. because an asynchronous store waits for I/O.
+    """
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+    coroutine.close()
+    raise RuntimeError("An asynchronous store or site adapter has to be used with a coroutine like "
+                       "Provider.dispatch_async()")
+
+
+def resolve(coroutine):
+    """
+    Runs a coroutine until it finishes or suspends for the first time.
+
+    Lets a method with a synchronous signature return its result directly when all of its collaborators are
+    synchronous, and an awaitable otherwise.
+
+    :param coroutine: The coroutine to run.
+
+    :return: The return value of the coroutine or, if it suspended, an awaitable that finishes it.
+    """
+    try:
+        yielded = coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+    return _Resume(coroutine, yielded)
+
+
+class _Resume(object):
+    """
+    Awaitable that continues a coroutine started by :func:`resolve`.
+    """
+
+    __slots__ = ("coroutine", "yielded")
+
+    def __init__(self, coroutine, yielded):
+        self.coroutine = coroutine
+        self.yielded = yielded
+
+    def __await__(self):
+        coroutine = self.coroutine
+        yielded = self.yielded
+
+        while True:
+            try:
+                sent = yield yielded
+            except GeneratorExit:
+                coroutine.close()
+                raise
+            except BaseException as error:
+                step = coroutine.throw
+                value = error
+            else:
+                step = coroutine.send
+                value = sent
+
+            try:
+                yielded = step(value)
+            except StopIteration as stop:
+                return stop.value
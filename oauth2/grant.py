@@ -27,8 +27,10 @@ So there are two remaining parties:
 * The server that issues the access.
 """
 import time
+from collections import namedtuple
 
-from oauth2.compatibility import json, quote, urlencode
+from oauth2.compatibility import json_dumps_bytes, quote, urlencode
+from oauth2.coroutines import maybe_await, run_sync
 from oauth2.datatype import AccessToken, AuthorizationCode
 from oauth2.error import (AccessTokenNotFound, AuthCodeNotFound,
                           InvalidSiteAdapter, OAuthInvalidError,
@@ -53,15 +55,29 @@ def encode_scopes(scopes, use_quote=False):
     return quote(scopes_as_string) if use_quote else scopes_as_string
 
 
+#: Maximum number of serialized error bodies kept by :func:`json_error_response`.
+MAX_CACHED_ERROR_BODIES = 256
+
+_error_bodies = {}
+
+
 def json_error_response(error, response, status_code=400):
     """
     Formats an error as a response containing a JSON body.
+
+    Errors and their explanations are a small fixed set, so their bodies are serialized only once.
     """
-    msg = {"error": error.error, "error_description": error.explanation}
+    key = (error.error, error.explanation)
+    body = _error_bodies.get(key)
+
+    if body is None:
+        body = json_dumps_bytes({"error": error.error, "error_description": error.explanation})
+        if len(_error_bodies) < MAX_CACHED_ERROR_BODIES:
+            _error_bodies[key] = body
 
     response.status_code = status_code
     response.add_header("Content-Type", "application/json")
-    response.body = json.dumps(msg)
+    response.body = body
 
     return response
 
@@ -72,7 +88,7 @@ def json_success_response(data, response):
 
     Also adds default headers and status code.
     """
-    response.body = json.dumps(data)
+    response.body = json_dumps_bytes(data)
     response.status_code = 200
 
     response.add_header("Content-Type", "application/json")
@@ -80,11 +96,164 @@ def json_success_response(data, response):
     response.add_header("Pragma", "no-cache")
 
 
+def access_token_from_data(token_data, client_id, data, grant_type, scopes, user_id, token_generator):
+    """
+    Creates the :class:`oauth2.datatype.AccessToken` to store for a token issued by a token generator.
+
+    :param token_data: A ``dict`` as returned by
+                       :meth:`oauth2.tokengenerator.TokenGenerator.create_access_token_data`.
+    :param token_generator: The :class:`oauth2.tokengenerator.TokenGenerator` that created ``token_data``.
+
+    :return: An instance of :class:`oauth2.datatype.AccessToken`.
+    """
+    access_token = AccessToken(client_id=client_id, data=data,
+                               grant_type=grant_type,
+                               token=token_data["access_token"],
+                               scopes=scopes,
+                               user_id=user_id)
+
+    if "refresh_token" in token_data:
+        expires_at = int(time.time()) + token_data["expires_in"]
+        access_token.expires_at = expires_at
+        access_token.refresh_token = token_data["refresh_token"]
+        refresh_expires_in = token_generator.refresh_expires_in
+        refresh_expires_at = int(time.time()) + refresh_expires_in if refresh_expires_in else refresh_expires_in
+        access_token.refresh_expires_at = refresh_expires_at
+
+    return access_token
+
+
 class ResponseTypeGrant(object):
     def error_response(self, response):
         pass
 
 
+class ScopeTable(object):
+    """
+    Assigns every scope one bit of an integer mask, shared by all grants of a :class:`oauth2.Provider`.
+
+    A mask issued by one grant is checked by another one, e.g. by :class:`RefreshToken`, so all grants
+    have to agree on the bit of a scope. Bits are assigned in the order scopes are added. Once masks
+    have been issued, grants have to be added in the same order and scopes may only be appended.
+
+    :param scopes: Scopes that get the first bits. (optional)
+    """
+
+    def __init__(self, scopes=None):
+        self.bits = {}
+        self.add(scopes or [])
+
+    def add(self, scopes):
+        """
+        Assigns the next free bits to the scopes that do not have one yet.
+
+        :param scopes: A list of scopes.
+        """
+        bits = self.bits
+        for scope in scopes:
+            if scope not in bits:
+                bits[scope] = 1 << len(bits)
+
+
+class ScopePolicy(object):
+    """
+    The scope configuration of a grant, compiled once and shared by the :class:`Scope` of every request.
+
+    Available scopes are kept in a ``frozenset`` and every one of them gets a bit by its position in
+    ``available``, so a set of scopes can also be stored as an integer mask. :class:`oauth2.Provider`
+    replaces these bits with the ones of its :class:`ScopeTable`, see :meth:`use_table`.
+
+    :param available: A list of strings each defining one supported scope.
+    :param default: Value to fall back to in case no scope is present in a request.
+    :param max_scopes: Maximum number of scopes accepted in one request.
+    :param max_scope_length: Maximum length of a single scope in a request.
+    :param issue_masks: Whether new tokens store their scopes as an integer mask instead of a list.
+                        Requires a token store and token generator that keep the scopes as one value.
+    """
+
+    def __init__(self, available=None, default=None, max_scopes=100, max_scope_length=256, issue_masks=False):
+        self.scopes = available if isinstance(available, list) else []
+        self.default = default
+        self.max_scopes = max_scopes
+        self.max_scope_length = max_scope_length
+        self.issue_masks = issue_masks
+
+        self.available = frozenset(self.scopes)
+        self.bits = dict((scope, 1 << index) for index, scope in enumerate(self.scopes))
+        # Upper bound of a valid "scope" parameter, checked before it is split.
+        self.max_length = max_scopes * (max_scope_length + len(Scope.separator))
+
+    def use_table(self, table):
+        """
+        Takes the bits of the scopes from a table shared with other grants.
+
+        :param table: The table of the provider.
+        :type table: ScopeTable
+        """
+        table.add(self.scopes)
+        self.bits = table.bits
+
+    def mask(self, scopes):
+        """
+        Converts a list of scopes into an integer mask.
+
+        :param scopes: A list of scopes.
+
+        :return: The mask or ``None`` if one of the scopes is not available.
+        :rtype: int
+        """
+        bits = self.bits
+        mask = 0
+        for scope in scopes:
+            bit = bits.get(scope)
+            if bit is None:
+                return None
+            mask |= bit
+
+        return mask
+
+    def names(self, mask):
+        """
+        Reverse of :meth:`mask`.
+
+        :param mask: An integer mask.
+
+        :return: The available scopes whose bit is set in ``mask``.
+        :rtype: list
+        """
+        return [scope for scope in self.scopes if mask & self.bits[scope]]
+
+    def parse(self, value):
+        """
+        Splits the value of a "scope" parameter and keeps the available scopes.
+
+        :param value: The "scope" parameter of a request.
+
+        :return: The requested scopes that are available, in the order of the request.
+        :rtype: list
+
+        :raises: :class:`oauth2.error.OAuthInvalidError` if the value exceeds ``max_scopes`` or
+                 ``max_scope_length``.
+        """
+        if len(value) > self.max_length:
+            raise OAuthInvalidError(error="invalid_scope", explanation="Scope parameter too long")
+
+        requested = value.split(Scope.separator, self.max_scopes)
+        if len(requested) > self.max_scopes:
+            raise OAuthInvalidError(error="invalid_scope", explanation="Too many scopes requested")
+
+        available = self.available
+        max_scope_length = self.max_scope_length
+        scopes = []
+        for scope in requested:
+            if len(scope) > max_scope_length:
+                raise OAuthInvalidError(error="invalid_scope", explanation="Scope too long")
+            if scope in available:
+                scopes.append(scope)
+
+        return scopes
+
+
 class Scope(object):
     """
     Handling of the "scope" parameter in a request.
@@ -93,31 +262,67 @@ class Scope(object):
 
     :param available: A list of strings each defining one supported scope.
     :param default: Value to fall back to in case no scope is present in a request.
+    :param policy: A compiled :class:`ScopePolicy`. Takes precedence over ``available`` and ``default``.
     """
 
+    __slots__ = ("scopes", "send_back", "policy")
+
     separator = " "
 
-    def __init__(self, available=None, default=None):
+    def __init__(self, available=None, default=None, policy=None):
         self.scopes = []
         self.send_back = False
 
-        self.available_scopes = available if isinstance(available, list) else []
-        self.default = default
+        self.policy = policy if policy is not None else ScopePolicy(available=available, default=default)
+
+    @property
+    def available_scopes(self):
+        return self.policy.scopes
+
+    @property
+    def default(self):
+        return self.policy.default
+
+    @property
+    def mask(self):
+        """
+        The parsed scopes as an integer mask or ``None`` if one of them has no bit in the policy.
+        """
+        return self.policy.mask(self.scopes)
 
     def compare(self, previous_scopes):
         """
         Compares the scopes read from request with previously issued scopes.
 
-        :param previous_scopes: A list of scopes.
+        :param previous_scopes: A list of scopes or the integer mask of a token issued with
+                                :attr:`ScopePolicy.issue_masks`.
 
         :return: ``True``
         """
-        for scope in self.scopes:
-            if scope not in previous_scopes:
-                raise OAuthInvalidError(error="invalid_scope", explanation="Invalid scope parameter in request")
+        if isinstance(previous_scopes, int):
+            mask = self.mask
+            valid = mask is not None and mask & ~previous_scopes == 0
+        else:
+            valid = set(self.scopes).issubset(previous_scopes)
+
+        if not valid:
+            raise OAuthInvalidError(error="invalid_scope", explanation="Invalid scope parameter in request")
 
         return True
 
+    def token_scopes(self):
+        """
+        The scopes to store with a new token.
+
+        :return: The integer mask if the policy issues masks and all scopes have a bit, else the list of scopes.
+        """
+        if self.policy.issue_masks:
+            mask = self.mask
+            if mask is not None:
+                return mask
+
+        return self.scopes
+
     def parse(self, request, source):
         """
         Parses scope value in given request.
@@ -143,22 +348,22 @@ class Scope(object):
         else:
             raise ValueError("Unknown scope source '%s'" % source)
 
+        policy = self.policy
+
         if req_scope is None:
-            if self.default is not None:
-                self.scopes = [self.default]
+            if policy.default is not None:
+                self.scopes = [policy.default]
                 self.send_back = True
                 return
-            elif len(self.available_scopes) != 0:
+            elif len(policy.scopes) != 0:
                 raise OAuthInvalidError(error="invalid_scope", explanation="Missing scope parameter in request")
             else:
                 return
 
-        req_scopes = req_scope.split(self.separator)
+        self.scopes = policy.parse(req_scope)
 
-        self.scopes = [scope for scope in req_scopes if scope in self.available_scopes]
-
-        if len(self.scopes) == 0 and self.default is not None:
-            self.scopes = [self.default]
+        if len(self.scopes) == 0 and policy.default is not None:
+            self.scopes = [policy.default]
             self.send_back = True
 
 
@@ -166,29 +371,44 @@ class ScopeGrant(object):
     """
     Handling of scopes in the OAuth 2.0 flow.
 
-    Inherited by all grants that need to support scopes.
+    Inherited by all grants that need to support scopes. The scope configuration is compiled once into a
+    :class:`ScopePolicy`.
 
     :param default_scope: The scope identifier that is returned by default. (optional)
     :param scopes:        A list of strings identifying the scopes that the grant supports.
     :param scope_class: The class that does the actual handling in a request. Default: :class:`oauth2.grant.Scope`.
+    :param max_scopes: Maximum number of scopes accepted in one request. Default: 100.
+    :param max_scope_length: Maximum length of a single scope in a request. Default: 256.
+    :param scope_masks: Store the scopes of issued tokens as an integer mask. Default: ``False``.
     """
 
-    def __init__(self, default_scope=None, scopes=None, scope_class=Scope, **kwargs):
+    def __init__(self, default_scope=None, scopes=None, scope_class=Scope, max_scopes=100, max_scope_length=256,
+                 scope_masks=False, **kwargs):
         self.default_scope = default_scope
         self.scopes = scopes
         self.scope_class = scope_class
+        self.scope_policy = ScopePolicy(available=scopes, default=default_scope, max_scopes=max_scopes,
+                                        max_scope_length=max_scope_length, issue_masks=scope_masks)
 
         super().__init__(**kwargs)
 
     def _create_scope_handler(self):
+        if self.scope_class is Scope:
+            return Scope(policy=self.scope_policy)
         return self.scope_class(available=self.scopes, default=self.default_scope)
 
 
 class GrantHandler(object):
     """
     Base class every oauth2 handler can extend.
+
+    A handler is created for every request and holds the state of that request.
+    The built-in handlers and their mixins declare ``__slots__``, so a handler is a
+    small object without a ``__dict__``. Subclasses without ``__slots__`` work as before.
     """
 
+    __slots__ = ()
+
     def process(self, request, response, environ):
         """
         Handles the logic of how a user gets an access token.
@@ -206,6 +426,22 @@ class GrantHandler(object):
         """
         raise NotImplementedError
 
+    async def process_async(self, request, response, environ):
+        """
+        Called by :meth:`oauth2.Provider.dispatch_async` instead of :meth:`process`.
+
+        Calls :meth:`process` unless a handler implements it natively.
+        """
+        return self.process(request, response, environ)
+
+    async def read_validate_params_async(self, request):
+        """
+        Called by :meth:`oauth2.Provider.dispatch_async` instead of :meth:`read_validate_params`.
+
+        Calls :meth:`read_validate_params` unless a handler implements it natively.
+        """
+        return self.read_validate_params(request)
+
     def handle_error(self, error, response):
         """
         Takes all the actions necessary to return an error response in the format defined for a specific grant handler.
@@ -213,15 +449,57 @@ class GrantHandler(object):
         raise NotImplementedError
 
 
+Route = namedtuple("Route", ["method", "path", "source", "param", "value", "create"])
+Route.__doc__ = """
+A kind of request that a :class:`GrantHandlerFactory` handles.
+
+:param method: The HTTP method, ``None`` matches every method.
+:param path: Name of the attribute of :class:`oauth2.Provider` holding the path, e.g. ``"token_path"``.
+             ``None`` matches every path.
+:param source: Where ``param`` is read from, ``"body"`` or ``"query"``.
+:param param: The parameter selecting the grant, ``"grant_type"`` or ``"response_type"``.
+:param value: The value of ``param``.
+:param create: Callable ``create(request, server)`` returning the :class:`GrantHandler`.
+"""
+
+
 class GrantHandlerFactory(object):
     """
     Base class every handler factory can extend.
 
     This class defines the basic interface of each Grant.
+
+    A factory that returns its :class:`Route` objects from :meth:`routes` is looked up by
+    :class:`oauth2.Provider` in a table. Other factories have to implement ``__call__``
+    and are called for every request that no route matches. A subclass that overrides
+    ``__call__`` is called as well, unless the same class also overrides :meth:`routes`.
     """
 
     def __call__(self, request, server):
-        raise NotImplementedError
+        routes = self.routes()
+
+        if routes is None:
+            raise NotImplementedError
+
+        for route in routes:
+            if route.method is not None and request.method != route.method:
+                continue
+
+            if route.source == "body":
+                value = request.post_param(route.param)
+            else:
+                value = request.get_param(route.param)
+
+            if value == route.value and (route.path is None or request.path == getattr(server, route.path)):
+                return route.create(request, server)
+
+        return None
+
+    def routes(self):
+        """
+        :return: A ``list`` of :class:`Route` objects, or ``None`` if requests have to be matched by ``__call__``.
+        """
+        return None
 
 
 class AuthRequestMixin(object):
@@ -230,6 +508,8 @@ class AuthRequestMixin(object):
     `oauth2.grant.AuthorizationCodeAuthHandler` and `oauth2.grant.ImplicitGrantHandler`.
     """
 
+    __slots__ = ()
+
     def __init__(self, client_authenticator, scope_handler, token_generator, **kwargs):
         self.client = None
         self.state = None
@@ -245,7 +525,10 @@ class AuthRequestMixin(object):
         Reads and validates data in an incoming request as required by
         the Authorization Request of the Authorization Code Grant and the Implicit Grant.
         """
-        self.client = self.client_authenticator.by_identifier(request)
+        return run_sync(self.read_validate_params_async(request))
+
+    async def read_validate_params_async(self, request):
+        self.client = await maybe_await(self.client_authenticator.by_identifier(request))
 
         response_type = request.get_param("response_type")
 
@@ -264,6 +547,8 @@ class AuthorizeMixin(object):
     Used by all grants that involve user interaction.
     """
 
+    __slots__ = ()
+
     def __init__(self, site_adapter, **kwargs):
         self.site_adapter = site_adapter
         super().__init__(**kwargs)
@@ -279,29 +564,71 @@ class AuthorizeMixin(object):
 
         :return: A tuple containing (`dict`, user_id) or the response.
         """
+        return run_sync(self.authorize_async(request, response, environ, scopes))
 
-        if self.site_adapter.user_has_denied_access(request) is True:
+    async def authorize_async(self, request, response, environ, scopes):
+        if await maybe_await(self.site_adapter.user_has_denied_access(request)) is True:
             raise OAuthInvalidError(error="access_denied", explanation="Authorization denied by user")
 
         try:
-            result = self.site_adapter.authenticate(request, environ, scopes, self.client)
+            result = await maybe_await(self.site_adapter.authenticate(request, environ, scopes, self.client))
             return self.sanitize_return_value(result)
         except UserNotAuthenticated:
-            return self.site_adapter.render_auth_page(request, response, environ, scopes, self.client)
+            return await maybe_await(self.site_adapter.render_auth_page(request, response, environ, scopes,
+                                                                        self.client))
 
     @staticmethod
     def sanitize_return_value(value):
-        if isinstance(value, tuple) and len(value) is 2:
+        if isinstance(value, tuple) and len(value) == 2:
             return value
 
         return value, None
 
 
+class CheckParamsMixin(object):
+    """
+    Used by token handlers that report common validation errors without raising them.
+
+    Handlers implement ``_check_params_async()``, which returns an :class:`oauth2.error.OAuthInvalidError`
+    instead of raising it. :class:`oauth2.Provider` calls it directly, other callers get the error raised.
+    """
+
+    __slots__ = ()
+
+    def read_validate_params(self, request):
+        """
+        Reads and validates the incoming data.
+
+        :param request: The incoming :class:`oauth2.web.Request`.
+
+        :return: ``True`` if data is valid.
+
+        :raises: :class:`oauth2.error.OAuthInvalidError`
+        """
+        return run_sync(self.read_validate_params_async(request))
+
+    async def read_validate_params_async(self, request):
+        """
+        Like :meth:`read_validate_params` with asynchronous stores.
+        """
+        result = await self._check_params_async(request)
+
+        if isinstance(result, OAuthInvalidError):
+            raise result
+
+        return result
+
+    async def _check_params_async(self, request):
+        raise NotImplementedError
+
+
 class AccessTokenMixin(object):
     """
     Used by grants that handle refresh token and unique token.
     """
 
+    __slots__ = ()
+
     def __init__(self, access_token_store, token_generator, unique_token=False, **kwargs):
         self.access_token_store = access_token_store
         self.token_generator = token_generator
@@ -315,12 +642,16 @@ class AccessTokenMixin(object):
         super().__init__(**kwargs)
 
     def create_token(self, client_id, data, grant_type, scopes, user_id):
+        return run_sync(self.create_token_async(client_id, data, grant_type, scopes, user_id))
+
+    async def create_token_async(self, client_id, data, grant_type, scopes, user_id):
         if self.unique_token:
             if user_id is None:
                 raise UserIdentifierMissingError
 
             try:
-                access_token = self.access_token_store.fetch_existing_token_of_user(client_id, grant_type, user_id)
+                access_token = await maybe_await(
+                    self.access_token_store.fetch_existing_token_of_user(client_id, grant_type, user_id))
 
                 if (access_token.scopes == scopes and access_token.is_expired() is False):
                     token_data = {"access_token": access_token.token, "token_type": "Bearer"}
@@ -335,21 +666,10 @@ class AccessTokenMixin(object):
 
         token_data = self.token_generator.create_access_token_data(data, scopes, grant_type, user_id, client_id)
 
-        access_token = AccessToken(client_id=client_id, data=data,
-                                   grant_type=grant_type,
-                                   token=token_data["access_token"],
-                                   scopes=scopes,
-                                   user_id=user_id)
-
-        if "refresh_token" in token_data:
-            expires_at = int(time.time()) + token_data["expires_in"]
-            access_token.expires_at = expires_at
-            access_token.refresh_token = token_data["refresh_token"]
-            refresh_expires_in = self.token_generator.refresh_expires_in
-            refresh_expires_at = int(time.time()) + refresh_expires_in if refresh_expires_in else refresh_expires_in
-            access_token.refresh_expires_at = refresh_expires_at
+        access_token = access_token_from_data(token_data, client_id, data, grant_type, scopes, user_id,
+                                              self.token_generator)
 
-        self.access_token_store.save_token(access_token)
+        await maybe_await(self.access_token_store.save_token(access_token))
 
         return token_data
 
@@ -378,6 +698,9 @@ class AuthorizationCodeAuthHandler(AuthorizeMixin, AuthRequestMixin, GrantHandle
     Implementation of the first step of the Authorization Code Grant (three-legged).
     """
 
+    __slots__ = ("auth_code_store", "client", "client_authenticator", "scope_handler", "site_adapter", "state",
+                 "token_generator")
+
     token_expiration = 600
 
     def __init__(self, auth_token_store, **kwargs):
@@ -390,7 +713,10 @@ class AuthorizationCodeAuthHandler(AuthorizeMixin, AuthRequestMixin, GrantHandle
 
         A form to authorize the access of the application can be displayed with the help of `oauth2.web.SiteAdapter`.
         """
-        data = self.authorize(request, response, environ, self.scope_handler.scopes)
+        return run_sync(self.process_async(request, response, environ))
+
+    async def process_async(self, request, response, environ):
+        data = await self.authorize_async(request, response, environ, self.scope_handler.scopes)
 
         if isinstance(data, Response):
             return data
@@ -404,9 +730,10 @@ class AuthorizationCodeAuthHandler(AuthorizeMixin, AuthRequestMixin, GrantHandle
                                       scopes=self.scope_handler.scopes,
                                       data=data[0], user_id=data[1])
 
-        self.auth_code_store.save_code(auth_code)
+        await maybe_await(self.auth_code_store.save_code(auth_code))
 
-        response.add_header("Location", self._generate_location(code))
+        # A store may replace the code, e.g. with a signed one.
+        response.add_header("Location", self._generate_location(auth_code.code))
         response.body = ""
         response.status_code = 302
 
@@ -437,11 +764,14 @@ class AuthorizationCodeAuthHandler(AuthorizeMixin, AuthRequestMixin, GrantHandle
         return "%s?%s" % (self.client.redirect_uri, query)
 
 
-class AuthorizationCodeTokenHandler(AccessTokenMixin, GrantHandler):
+class AuthorizationCodeTokenHandler(CheckParamsMixin, AccessTokenMixin, GrantHandler):
     """
     Implementation of the second step of the Authorization Code Grant (three-legged).
     """
 
+    __slots__ = ("access_token_store", "auth_code_store", "client", "client_authenticator", "code", "data",
+                 "redirect_uri", "scopes", "token_generator", "unique_token", "user_id")
+
     def __init__(self, auth_token_store, client_authenticator, **kwargs):
         self.client = None
         self.code = None
@@ -455,7 +785,7 @@ class AuthorizationCodeTokenHandler(AccessTokenMixin, GrantHandler):
 
         super().__init__(**kwargs)
 
-    def read_validate_params(self, request):
+    async def _check_params_async(self, request):
         """
         Reads and validates the data from the incoming request.
 
@@ -466,8 +796,11 @@ class AuthorizationCodeTokenHandler(AccessTokenMixin, GrantHandler):
         code - Authorization code acquired in the Authorization Request (required)
         redirect_uri - URI that the OAuth2 server should redirect to (optional)
         """
-        self._read_params(request)
-        self._validate_code()
+        error = await self._read_params(request)
+        if error is not None:
+            return error
+
+        await self._validate_code()
 
         return True
 
@@ -479,15 +812,22 @@ class AuthorizationCodeTokenHandler(AccessTokenMixin, GrantHandler):
 
         Calls `oauth2.store.AccessTokenStore` to persist the token.
         """
-        token_data = self.create_token(
+        return run_sync(self.process_async(request, response, environ))
+
+    async def process_async(self, request, response, environ):
+        # Stores that claim codes on deletion reject a code that was redeemed concurrently.
+        try:
+            await maybe_await(self.auth_code_store.delete_code(self.code))
+        except AuthCodeNotFound:
+            raise OAuthInvalidError(error="invalid_request", explanation="Invalid authorization code parameter")
+
+        token_data = await self.create_token_async(
             client_id=self.client.identifier,
             data=self.data,
             grant_type=AuthorizationCodeGrant.grant_type,
             scopes=self.scopes,
             user_id=self.user_id)
 
-        self.auth_code_store.delete_code(self.code)
-
         if self.scopes:
             token_data["scope"] = encode_scopes(self.scopes)
 
@@ -498,28 +838,34 @@ class AuthorizationCodeTokenHandler(AccessTokenMixin, GrantHandler):
     def handle_error(self, error, response):
         return json_error_response(error, response)
 
-    def _read_params(self, request):
-        self.client = self.client_authenticator.by_identifier_secret(request)
+    async def _read_params(self, request):
+        self.client, error = await maybe_await(self.client_authenticator.check_identifier_secret(request))
+        if error is not None:
+            return error
+
         self.code = request.post_param("code")
         self.redirect_uri = request.post_param("redirect_uri")
 
         if self.code is None or self.redirect_uri is None:
-            raise OAuthInvalidError(error="invalid_request", explanation="Missing required parameter in request")
+            return OAuthInvalidError(error="invalid_request", explanation="Missing required parameter in request")
 
         try:
             self.client.redirect_uri = self.redirect_uri
         except RedirectUriUnknown:
             raise OAuthInvalidError(error="invalid_request", explanation="Invalid redirect_uri parameter")
 
-    def _validate_code(self):
+    async def _validate_code(self):
         try:
-            stored_code = self.auth_code_store.fetch_by_code(self.code)
+            stored_code = await maybe_await(self.auth_code_store.fetch_by_code(self.code))
         except AuthCodeNotFound:
             raise OAuthInvalidError(error="invalid_request", explanation="Invalid authorization code parameter")
 
         if stored_code.code != self.code:
             raise OAuthInvalidError(error="invalid_grant", explanation="Invalid code parameter in request")
 
+        if stored_code.client_id != self.client.identifier:
+            raise OAuthInvalidError(error="invalid_grant", explanation="Invalid code parameter in request")
+
         if stored_code.redirect_uri != self.redirect_uri:
             raise OAuthInvalidError(error="invalid_request", explanation="Invalid redirect_uri parameter")
 
@@ -554,36 +900,27 @@ class AuthorizationCodeGrant(GrantHandlerFactory, ScopeGrant, SiteAdapterMixin):
 
         super().__init__(**kwargs)
 
-    def __call__(self, request, server):
-        """
-        :param request: Incoming request
-        :type request: oauth2.web.Request
-
-        :param server: The OAuth2 provider instance
-        """
-        if (request.method == "POST"
-            and request.post_param("grant_type") == "authorization_code"
-            and request.path == server.token_path):
-            return AuthorizationCodeTokenHandler(
-                access_token_store=server.access_token_store,
-                auth_token_store=server.auth_code_store,
-                client_authenticator=server.client_authenticator,
-                token_generator=server.token_generator,
-                unique_token=self.unique_token)
-
-        if (request.method == "GET"
-            and request.get_param("response_type") == "code"
-            and request.path == server.authorize_path):
-            scope_handler = self._create_scope_handler()
-
-            return AuthorizationCodeAuthHandler(
-                auth_token_store=server.auth_code_store,
-                client_authenticator=server.client_authenticator,
-                scope_handler=scope_handler,
-                site_adapter=self.site_adapter,
-                token_generator=server.token_generator)
+    def routes(self):
+        return [Route("POST", "token_path", "body", "grant_type", self.grant_type, self._create_token_handler),
+                Route("GET", "authorize_path", "query", "response_type", "code", self._create_auth_handler)]
 
-        return None
+    def _create_token_handler(self, request, server):
+        return AuthorizationCodeTokenHandler(
+            access_token_store=server.access_token_store,
+            auth_token_store=server.auth_code_store,
+            client_authenticator=server.client_authenticator,
+            token_generator=server.token_generator,
+            unique_token=self.unique_token)
+
+    def _create_auth_handler(self, request, server):
+        scope_handler = self._create_scope_handler()
+
+        return AuthorizationCodeAuthHandler(
+            auth_token_store=server.auth_code_store,
+            client_authenticator=server.client_authenticator,
+            scope_handler=scope_handler,
+            site_adapter=self.site_adapter,
+            token_generator=server.token_generator)
 
 
 class ImplicitGrant(GrantHandlerFactory, ScopeGrant, SiteAdapterMixin):
@@ -603,26 +940,31 @@ class ImplicitGrant(GrantHandlerFactory, ScopeGrant, SiteAdapterMixin):
 
     site_adapter_class = ImplicitGrantSiteAdapter
 
-    def __call__(self, request, server):
-        response_type = request.get_param("response_type")
+    def routes(self):
+        return [Route(None, "authorize_path", "query", "response_type", "token", self._create_handler)]
 
-        if (response_type == "token" and request.path == server.authorize_path):
-            return ImplicitGrantHandler(
-                access_token_store=server.access_token_store,
-                client_authenticator=server.client_authenticator,
-                scope_handler=self._create_scope_handler(),
-                site_adapter=self.site_adapter,
-                token_generator=server.token_generator)
-        return None
+    def _create_handler(self, request, server):
+        return ImplicitGrantHandler(
+            access_token_store=server.access_token_store,
+            client_authenticator=server.client_authenticator,
+            scope_handler=self._create_scope_handler(),
+            site_adapter=self.site_adapter,
+            token_generator=server.token_generator)
 
 
 class ImplicitGrantHandler(AuthorizeMixin, AuthRequestMixin, GrantHandler):
+    __slots__ = ("access_token_store", "client", "client_authenticator", "scope_handler", "site_adapter", "state",
+                 "token_generator")
+
     def __init__(self, access_token_store, **kwargs):
         self.access_token_store = access_token_store
         super().__init__(**kwargs)
 
     def process(self, request, response, environ):
-        data = self.authorize(request, response, environ, self.scope_handler.scopes)
+        return run_sync(self.process_async(request, response, environ))
+
+    async def process_async(self, request, response, environ):
+        data = await self.authorize_async(request, response, environ, self.scope_handler.scopes)
 
         if isinstance(data, Response):
             return data
@@ -632,9 +974,9 @@ class ImplicitGrantHandler(AuthorizeMixin, AuthRequestMixin, GrantHandler):
         access_token = AccessToken(client_id=self.client.identifier,
                                    grant_type=ImplicitGrant.grant_type,
                                    token=token, data=data[0],
-                                   scopes=self.scope_handler.scopes)
+                                   scopes=self.scope_handler.token_scopes())
 
-        self.access_token_store.save_token(access_token)
+        await maybe_await(self.access_token_store.save_token(access_token))
 
         return self._redirect_access_token(response, token)
 
@@ -687,14 +1029,13 @@ class ResourceOwnerGrant(GrantHandlerFactory, ScopeGrant, SiteAdapterMixin):
         self.expires_in = expires_in
         super().__init__(**kwargs)
 
-    def __call__(self, request, server):
+    def routes(self):
         """
-        Checks if the incoming request can be handled by the
-        ResourceOwnerGrantHandler and returns an instance of it.
+        Requests with ``grant_type=password`` are handled by the ResourceOwnerGrantHandler.
         """
-        if request.post_param("grant_type") != self.grant_type:
-            return None
+        return [Route(None, None, "body", "grant_type", self.grant_type, self._create_handler)]
 
+    def _create_handler(self, request, server):
         return ResourceOwnerGrantHandler(
             access_token_store=server.access_token_store,
             client_authenticator=server.client_authenticator,
@@ -704,13 +1045,16 @@ class ResourceOwnerGrant(GrantHandlerFactory, ScopeGrant, SiteAdapterMixin):
             unique_token=self.unique_token)
 
 
-class ResourceOwnerGrantHandler(GrantHandler, AccessTokenMixin):
+class ResourceOwnerGrantHandler(CheckParamsMixin, GrantHandler, AccessTokenMixin):
     """
     Class for handling Resource Owner authorization requests.
 
     See http://tools.ietf.org/html/rfc6749#section-4.3
     """
 
+    __slots__ = ("access_token_store", "client", "client_authenticator", "password", "scope_handler", "site_adapter",
+                 "token_generator", "unique_token", "username")
+
     OWNER_NOT_AUTHENTICATED = "Unable to authenticate resource owner"
 
     def __init__(self, client_authenticator, scope_handler, site_adapter, **kwargs):
@@ -739,8 +1083,12 @@ class ResourceOwnerGrantHandler(GrantHandler, AccessTokenMixin):
         Takes the incoming request, asks the concrete SiteAdapter to validate
         it and issues a new access token that is returned to the client on successful validation.
         """
+        return run_sync(self.process_async(request, response, environ))
+
+    async def process_async(self, request, response, environ):
         try:
-            data = self.site_adapter.authenticate(request, environ, self.scope_handler.scopes, self.client)
+            data = await maybe_await(self.site_adapter.authenticate(request, environ, self.scope_handler.scopes,
+                                                                    self.client))
             data = AuthorizeMixin.sanitize_return_value(data)
         except UserNotAuthenticated:
             raise OAuthInvalidError(error="invalid_client", explanation=self.OWNER_NOT_AUTHENTICATED)
@@ -748,11 +1096,11 @@ class ResourceOwnerGrantHandler(GrantHandler, AccessTokenMixin):
         if isinstance(data, Response):
             return data
 
-        token_data = self.create_token(
+        token_data = await self.create_token_async(
             client_id=self.client.identifier,
             data=data[0],
             grant_type=ResourceOwnerGrant.grant_type,
-            scopes=self.scope_handler.scopes,
+            scopes=self.scope_handler.token_scopes(),
             user_id=data[1])
 
         if self.scope_handler.send_back:
@@ -762,11 +1110,13 @@ class ResourceOwnerGrantHandler(GrantHandler, AccessTokenMixin):
 
         return response
 
-    def read_validate_params(self, request):
+    async def _check_params_async(self, request):
         """
         Checks if all incoming parameters meet the expected values.
         """
-        self.client = self.client_authenticator.by_identifier_secret(request)
+        self.client, error = await maybe_await(self.client_authenticator.check_identifier_secret(request))
+        if error is not None:
+            return error
 
         self.password = request.post_param("password")
         self.username = request.post_param("username")
@@ -808,18 +1158,13 @@ class RefreshToken(GrantHandlerFactory, ScopeGrant):
         self.reissue_refresh_tokens = reissue_refresh_tokens if expires_in else True
         super().__init__(**kwargs)
 
-    def __call__(self, request, server):
+    def routes(self):
         """
-        Determines if the current request requests a refresh token.
-
-        :return: An instance of :class:`RefreshTokenHandler`.
+        Requests for a refresh token are handled by :class:`RefreshTokenHandler`.
         """
-        if request.path != server.token_path:
-            return None
-
-        if request.post_param("grant_type") != "refresh_token":
-            return None
+        return [Route(None, "token_path", "body", "grant_type", self.grant_type, self._create_handler)]
 
+    def _create_handler(self, request, server):
         return RefreshTokenHandler(
             access_token_store=server.access_token_store,
             client_authenticator=server.client_authenticator,
@@ -829,11 +1174,14 @@ class RefreshToken(GrantHandlerFactory, ScopeGrant):
         )
 
 
-class RefreshTokenHandler(GrantHandler):
+class RefreshTokenHandler(CheckParamsMixin, GrantHandler):
     """
     Validates an incoming request and issues a new access token.
     """
 
+    __slots__ = ("access_token_store", "client", "client_authenticator", "data", "refresh_grant_type", "refresh_token",
+                 "reissue_refresh_tokens", "scope_handler", "token_generator", "user_id")
+
     def __init__(self, access_token_store, client_authenticator, scope_handler, token_generator,
                  reissue_refresh_tokens=False):
         self.access_token_store = access_token_store
@@ -859,10 +1207,12 @@ class RefreshTokenHandler(GrantHandler):
 
         :return: :class:`oauth2.web.Response`
         """
+        return run_sync(self.process_async(request, response, environ))
 
-        token_data = self.token_generator.create_access_token_data(self.data, self.scope_handler.scopes,
-                                                                   self.refresh_grant_type, self.user_id,
-                                                                   self.client.identifier)
+    async def process_async(self, request, response, environ):
+        scopes = self.scope_handler.token_scopes()
+        token_data = self.token_generator.create_access_token_data(self.data, scopes, self.refresh_grant_type,
+                                                                   self.user_id, self.client.identifier)
         expires_at = int(time.time()) + token_data["expires_in"]
 
         access_token = AccessToken(client_id=self.client.identifier,
@@ -870,11 +1220,11 @@ class RefreshTokenHandler(GrantHandler):
                                    grant_type=self.refresh_grant_type,
                                    data=self.data,
                                    expires_at=expires_at,
-                                   scopes=self.scope_handler.scopes,
+                                   scopes=scopes,
                                    user_id=self.user_id)
 
         if self.reissue_refresh_tokens:
-            self.access_token_store.delete_refresh_token(self.refresh_token)
+            await maybe_await(self.access_token_store.delete_refresh_token(self.refresh_token))
             access_token.refresh_token = token_data["refresh_token"]
             refresh_expires_in = self.token_generator.refresh_expires_in
             refresh_expires_at = int(time.time()) + refresh_expires_in
@@ -882,32 +1232,27 @@ class RefreshTokenHandler(GrantHandler):
         else:
             del token_data["refresh_token"]
 
-        self.access_token_store.save_token(access_token)
+        await maybe_await(self.access_token_store.save_token(access_token))
 
         json_success_response(data=token_data, response=response)
 
         return response
 
-    def read_validate_params(self, request):
+    async def _check_params_async(self, request):
         """
         Validate the incoming request.
-
-        :param request: The incoming :class:`oauth2.web.Request`.
-
-        :return: Returns ``True`` if data is valid.
-
-        :raises: :class:`oauth2.error.OAuthInvalidError`
         """
-
         self.refresh_token = request.post_param("refresh_token")
 
         if self.refresh_token is None:
-            raise OAuthInvalidError(error="invalid_request", explanation="Missing refresh_token in request body")
+            return OAuthInvalidError(error="invalid_request", explanation="Missing refresh_token in request body")
 
-        self.client = self.client_authenticator.by_identifier_secret(request)
+        self.client, error = await maybe_await(self.client_authenticator.check_identifier_secret(request))
+        if error is not None:
+            return error
 
         try:
-            access_token = self.access_token_store.fetch_by_refresh_token(self.refresh_token)
+            access_token = await maybe_await(self.access_token_store.fetch_by_refresh_token(self.refresh_token))
         except AccessTokenNotFound:
             raise OAuthInvalidError(error="invalid_request", explanation="Invalid refresh token")
 
@@ -917,6 +1262,10 @@ class RefreshTokenHandler(GrantHandler):
         if refresh_token_expires_at != 0 and refresh_token_expires_at < int(time.time()):
             raise OAuthInvalidError(error="invalid_request", explanation="Invalid refresh token")
 
+        # A refresh token is bound to the client it was issued to.
+        if access_token.client_id is not None and access_token.client_id != self.client.identifier:
+            raise OAuthInvalidError(error="invalid_request", explanation="Invalid refresh token")
+
         self.data = access_token.data
         self.user_id = access_token.user_id
 
@@ -932,21 +1281,20 @@ class RefreshTokenHandler(GrantHandler):
 class ClientCredentialsGrant(GrantHandlerFactory, ScopeGrant):
     grant_type = "client_credentials"
 
-    def __call__(self, request, server):
-        if request.path != server.token_path:
-            return None
+    def routes(self):
+        return [Route(None, "token_path", "body", "grant_type", self.grant_type, self._create_handler)]
 
-        if request.post_param("grant_type") == self.grant_type:
-            return ClientCredentialsHandler(
-                access_token_store=server.access_token_store,
-                client_authenticator=server.client_authenticator,
-                scope_handler=self._create_scope_handler(),
-                token_generator=server.token_generator)
+    def _create_handler(self, request, server):
+        return ClientCredentialsHandler(
+            access_token_store=server.access_token_store,
+            client_authenticator=server.client_authenticator,
+            scope_handler=self._create_scope_handler(),
+            token_generator=server.token_generator)
 
-        return None
 
+class ClientCredentialsHandler(CheckParamsMixin, GrantHandler):
+    __slots__ = ("access_token_store", "client", "client_authenticator", "scope_handler", "token_generator")
 
-class ClientCredentialsHandler(GrantHandler):
     def __init__(self, access_token_store, client_authenticator, scope_handler, token_generator):
         self.access_token_store = access_token_store
         self.client_authenticator = client_authenticator
@@ -956,6 +1304,9 @@ class ClientCredentialsHandler(GrantHandler):
         self.client = None
 
     def process(self, request, response, environ):
+        return run_sync(self.process_async(request, response, environ))
+
+    async def process_async(self, request, response, environ):
         body = {"token_type": "Bearer"}
 
         token = self.token_generator.generate()
@@ -967,8 +1318,8 @@ class ClientCredentialsHandler(GrantHandler):
             grant_type=ClientCredentialsGrant.grant_type,
             token=token,
             expires_at=expires_at,
-            scopes=self.scope_handler.scopes)
-        self.access_token_store.save_token(access_token)
+            scopes=self.scope_handler.token_scopes())
+        await maybe_await(self.access_token_store.save_token(access_token))
 
         body["access_token"] = token
 
@@ -982,8 +1333,11 @@ class ClientCredentialsHandler(GrantHandler):
 
         return response
 
-    def read_validate_params(self, request):
-        self.client = self.client_authenticator.by_identifier_secret(request)
+    async def _check_params_async(self, request):
+        self.client, error = await maybe_await(self.client_authenticator.check_identifier_secret(request))
+        if error is not None:
+            return error
+
         self.scope_handler.parse(request=request, source="body")
 
     def handle_error(self, error, response):
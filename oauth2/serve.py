@@ -0,0 +1,300 @@
+"""
+Serves :class:`oauth2.web.wsgi.Application` with a pool of forked worker processes::
+
+    python -m oauth2.serve myservice.oauth_config --host 0.0.0.0 --port 8080 --workers 4
+
+The config module creates the provider that all workers serve:
+
+.. code-block:: python
+
+    # myservice/oauth_config.py
+
+    def create_provider():
+        provider = Provider(...)
+        provider.add_grant(ClientCredentialsGrant())
+        return provider
+
+    # Optional: clients fetched by every worker before it accepts connections.
+    WARM_UP_CLIENT_IDS = ["service-a", "service-b"]
+
+    # Optional: keyword arguments of oauth2.web.wsgi.Application.
+    APPLICATION_OPTIONS = {"token_uri": "/oauth/token"}
+
+The provider is created once in the main process and inherited by the workers. Each worker calls
+:meth:`oauth2.Provider.warm_up` before it accepts connections. Where ``SO_REUSEPORT`` is available each worker binds
+its own listening socket to the same address and the kernel balances connections between them, otherwise the workers
+share one listening socket.
+
+The main process restarts workers that exit and logs the number of requests served by each worker every
+``--report-interval`` seconds and on ``SIGUSR1``. ``SIGTERM`` or ``SIGINT`` stop the workers after their current
+request.
+
+Forking requires a POSIX system. Stores should open their connections lazily or reconnect in a forked process.
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from multiprocessing.sharedctypes import RawArray
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from oauth2.log import app_log, gen_log
+from oauth2.web.wsgi import Application
+
+#: Workers that exit sooner after their start are restarted with a delay.
+MIN_WORKER_LIFETIME = 1.0
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """
+    Does not write a line to stderr for every request.
+    """
+
+    def log_message(self, format, *args):
+        gen_log.debug("%s - %s", self.address_string(), format % args)
+
+
+class WorkerServer(WSGIServer):
+    """
+    WSGI server of a single worker that binds with ``SO_REUSEPORT`` or serves an inherited listening socket.
+    """
+
+    def __init__(self, address, listener=None):
+        self.listener = listener
+        WSGIServer.__init__(self, address, QuietRequestHandler, bind_and_activate=listener is None)
+
+        if listener is not None:
+            # Workers that lose the race for a connection must not block in accept().
+            listener.setblocking(False)
+            self.socket.close()
+            self.socket = listener
+            self.server_address = listener.getsockname()
+            self.server_name = socket.getfqdn(self.server_address[0])
+            self.server_port = self.server_address[1]
+            self.setup_environ()
+
+    def server_bind(self):
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        WSGIServer.server_bind(self)
+
+
+class CountingApplication(object):
+    """
+    Counts the requests of a worker in a slot of a counter array shared with the main process.
+    """
+
+    def __init__(self, application, counts, index):
+        self.application = application
+        self.counts = counts
+        self.index = index
+
+    def __call__(self, env, start_response):
+        self.counts[self.index] += 1
+        return self.application(env, start_response)
+
+
+class PreforkServer(object):
+    """
+    Serves a WSGI application with ``workers`` forked processes.
+
+    :param application: The WSGI application, e.g. :class:`oauth2.web.wsgi.Application`.
+    :param host: Address to listen on.
+    :param port: Port to listen on.
+    :param workers: Number of worker processes.
+    :param warm_up: Called in every worker before it accepts connections. (optional)
+    :param report_interval: Seconds between two logs of the request counts. ``0`` disables the periodic report.
+    :param reuse_port: Whether every worker binds its own socket with ``SO_REUSEPORT``. Defaults to whether the
+                       platform supports it.
+    """
+
+    def __init__(self, application, host="127.0.0.1", port=8080, workers=None, warm_up=None, report_interval=60,
+                 reuse_port=None):
+        self.application = application
+        self.address = (host, port)
+        self.workers = workers or os.cpu_count() or 1
+        self.warm_up = warm_up
+        self.report_interval = report_interval
+        self.reuse_port = hasattr(socket, "SO_REUSEPORT") if reuse_port is None else reuse_port
+
+        self.counts = RawArray("Q", self.workers)
+        self.listener = None
+        self.pids = {}
+        self.started = {}
+        self.running = False
+
+    def serve(self):
+        """
+        Forks the workers and supervises them until ``SIGTERM`` or ``SIGINT`` is received.
+        """
+        if not self.reuse_port:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind(self.address)
+            self.listener.listen(128)
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.report())
+
+        for index in range(self.workers):
+            self._spawn(index)
+
+        gen_log.info("Serving on %s:%d with %d workers", self.address[0], self.address[1], self.workers)
+
+        last_report = time.monotonic()
+        while self.running:
+            self._reap()
+
+            if self.report_interval and time.monotonic() - last_report >= self.report_interval:
+                self.report()
+                last_report = time.monotonic()
+
+            time.sleep(0.1)
+
+        self._shutdown()
+
+    def report(self):
+        """
+        Logs the number of requests served by each worker.
+        """
+        for pid, index in sorted(self.pids.items(), key=lambda item: item[1]):
+            gen_log.info("Worker %d (pid %d) served %d requests", index, pid, self.counts[index])
+
+    def request_counts(self):
+        """
+        :return: Number of requests served by each worker, including workers that were replaced.
+        :rtype: list
+        """
+        return list(self.counts)
+
+    def _spawn(self, index):
+        parent = os.getpid()
+        pid = os.fork()
+
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker(index, parent)
+            except BaseException:
+                app_log.error("Worker %d failed", index, exc_info=True)
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)
+
+        self.pids[pid] = index
+        self.started[index] = time.monotonic()
+
+    def _run_worker(self, index, parent):
+        running = [True]
+
+        def stop(signum, frame):
+            running[0] = False
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+
+        if self.warm_up is not None:
+            self.warm_up()
+
+        server = WorkerServer(self.address, listener=self.listener)
+        server.set_app(CountingApplication(self.application, self.counts, index))
+        server.timeout = 0.5
+
+        try:
+            # Workers stop as well if the main process died.
+            while running[0] and os.getppid() == parent:
+                server.handle_request()
+        finally:
+            server.server_close()
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+
+            if pid == 0:
+                return
+
+            index = self.pids.pop(pid, None)
+            if index is None or not self.running:
+                continue
+
+            gen_log.warning("Worker %d (pid %d) exited with status %d, restarting", index, pid, status)
+
+            if time.monotonic() - self.started[index] < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+
+            self._spawn(index)
+
+    def _stop(self, signum, frame):
+        self.running = False
+
+    def _shutdown(self):
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        for pid in list(self.pids):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+
+        self.report()
+        self.pids.clear()
+
+        if self.listener is not None:
+            self.listener.close()
+
+
+def load_config(name):
+    """
+    Imports a config module and creates the application it describes.
+
+    :param name: Dotted name of a module with a ``create_provider()`` function.
+
+    :return: The application and a callable that warms up a worker.
+    """
+    config = importlib.import_module(name)
+
+    provider = config.create_provider()
+    application = Application(provider, **getattr(config, "APPLICATION_OPTIONS", {}))
+    client_ids = getattr(config, "WARM_UP_CLIENT_IDS", ())
+
+    return application, lambda: provider.warm_up(client_ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m oauth2.serve",
+                                     description="Serve an OAuth 2.0 provider with forked worker processes.")
+    parser.add_argument("config", help="Module with a create_provider() function")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="Defaults to the number of CPUs")
+    parser.add_argument("--report-interval", type=float, default=60,
+                        help="Seconds between two logs of the request counts per worker")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    sys.path.insert(0, os.getcwd())
+
+    application, warm_up = load_config(args.config)
+
+    PreforkServer(application, host=args.host, port=args.port, workers=args.workers, warm_up=warm_up,
+                  report_interval=args.report_interval).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,18 @@ class AccessTokenStore(object):
         """
         raise NotImplementedError
 
+    def save_tokens(self, access_tokens):
+        """
+        Stores many access tokens at once.
+
+        The default implementation calls :meth:`save_token` for every token.
+        Stores override it to persist all tokens in a single round trip.
+
+        :param access_tokens: A ``list`` of :class:`oauth2.datatype.AccessToken`.
+        """
+        for access_token in access_tokens:
+            self.save_token(access_token)
+
     def fetch_existing_token_of_user(self, client_id, grant_type, user_id):
         """
         Fetches an access token identified by its client id, type of grant and user id.
@@ -101,3 +113,56 @@ class ClientStore(object):
         :raises: :class:`oauth2.error.ClientNotFoundError` if no data could be retrieved for given client_id.
         """
         raise NotImplementedError
+
+
+class AsyncAccessTokenStore(AccessTokenStore):
+    """
+    Base class of access token stores that implement every method as a coroutine.
+
+    Used by :meth:`oauth2.Provider.dispatch_async`, so a store that waits for the network does not block the
+    event loop. See :class:`AccessTokenStore` for the meaning of each method.
+    """
+
+    async def save_token(self, access_token):
+        raise NotImplementedError
+
+    async def save_tokens(self, access_tokens):
+        for access_token in access_tokens:
+            await self.save_token(access_token)
+
+    async def fetch_existing_token_of_user(self, client_id, grant_type, user_id):
+        raise NotImplementedError
+
+    async def fetch_by_refresh_token(self, refresh_token):
+        raise NotImplementedError
+
+    async def delete_refresh_token(self, refresh_token):
+        raise NotImplementedError
+
+
+class AsyncAuthCodeStore(AuthCodeStore):
+    """
+    Base class of auth code stores that implement every method as a coroutine.
+
+    See :class:`AuthCodeStore` for the meaning of each method.
+    """
+
+    async def fetch_by_code(self, code):
+        raise NotImplementedError
+
+    async def save_code(self, authorization_code):
+        raise NotImplementedError
+
+    async def delete_code(self, code):
+        raise NotImplementedError
+
+
+class AsyncClientStore(ClientStore):
+    """
+    Base class of client stores that implement every method as a coroutine.
+
+    See :class:`ClientStore` for the meaning of each method.
+    """
+
+    async def fetch_by_client_id(self, client_id):
+        raise NotImplementedError
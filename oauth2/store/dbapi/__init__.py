@@ -171,6 +171,49 @@ class DbApiAccessTokenStore(DatabaseStore, AccessTokenStore):
 
         return True
 
+    def save_tokens(self, access_tokens):
+        """
+        Creates entries for many access tokens in one transaction.
+
+        Each access token is inserted on its own to learn its row id. All data
+        and scopes are inserted afterwards with one ``executemany()`` call each.
+
+        :param access_tokens: A `list` of :class:`oauth2.datatype.AccessToken`.
+        :return: `True`.
+        """
+        if not access_tokens:
+            return True
+
+        data_rows = []
+        scope_rows = []
+        cursor = self.connection.cursor()
+
+        try:
+            for access_token in access_tokens:
+                cursor.execute(self.create_access_token_query,
+                               (access_token.client_id,
+                                access_token.grant_type,
+                                access_token.token,
+                                access_token.expires_at,
+                                access_token.refresh_token,
+                                access_token.refresh_expires_at,
+                                access_token.user_id))
+                access_token_id = cursor.lastrowid
+
+                data_rows.extend((key, value, access_token_id) for key, value in access_token.data.items())
+                scope_rows.extend((scope, access_token_id) for scope in access_token.scopes)
+
+            if data_rows:
+                cursor.executemany(self.create_data_query, data_rows)
+            if scope_rows:
+                cursor.executemany(self.create_scope_query, scope_rows)
+
+            self.connection.commit()
+        finally:
+            cursor.close()
+
+        return True
+
     def _fetch_data(self, access_token_id):
         result = self.fetchall(self.fetch_data_by_access_token_query,
                                access_token_id)
@@ -37,11 +37,16 @@ class TokenStore(AccessTokenStore, DynamodbStore):
         Stores the access token and additional data in redis.
         See :class:`oauth2.store.AccessTokenStore`.
         """
-        unique_token_key = self._unique_token_key(access_token.client_id, access_token.grant_type, access_token.user_id)
+        self.connect.put_item(**self._token_to_item(access_token))
 
-        storing_unique_token = access_token.__dict__
-        storing_unique_token.update({'token_key': unique_token_key})
-        self.connect.put_item(**storing_unique_token)
+    def save_tokens(self, access_tokens):
+        """
+        Stores many access tokens with one batch write of the table.
+        See :meth:`oauth2.store.AccessTokenStore.save_tokens`.
+        """
+        with self.connect.batch_write() as batch:
+            for access_token in access_tokens:
+                batch.put_item(data=self._token_to_item(access_token))
 
     def delete_refresh_token(self, refresh_token):
         """
@@ -78,6 +83,14 @@ class TokenStore(AccessTokenStore, DynamodbStore):
             raise error.AccessTokenNotFound
         return datatype.AccessToken(**token_data)
 
+    @classmethod
+    def _token_to_item(cls, access_token):
+        unique_token_key = cls._unique_token_key(access_token.client_id, access_token.grant_type, access_token.user_id)
+
+        storing_unique_token = access_token.__dict__
+        storing_unique_token.update({'token_key': unique_token_key})
+        return storing_unique_token
+
     @classmethod
     def _unique_token_key(cls, client_id, grant_type, user_id):
         return "{0}_{1}_{2}".format(client_id, grant_type, user_id)
@@ -88,6 +88,27 @@ class TokenStore(AccessTokenStore, AuthCodeStore):
             rft_key = self._generate_cache_key(access_token.refresh_token)
             self.mc.set(rft_key, access_token.__dict__)
 
+    def save_tokens(self, access_tokens):
+        """
+        Stores many access tokens with a single ``set_multi`` call.
+
+        See :class:`oauth2.store.AccessTokenStore`.
+        """
+        mapping = {}
+
+        for access_token in access_tokens:
+            mapping[access_token.token] = access_token.__dict__
+
+            unique_token_key = self._unique_token_key(access_token.client_id,
+                                                      access_token.grant_type,
+                                                      access_token.user_id)
+            mapping[unique_token_key] = access_token.__dict__
+
+            if access_token.refresh_token is not None:
+                mapping[access_token.refresh_token] = access_token.__dict__
+
+        self.mc.set_multi(mapping, key_prefix=self.prefix + "_")
+
     def delete_refresh_token(self, refresh_token):
         """
         Deletes a refresh token after use
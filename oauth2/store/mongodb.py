@@ -74,7 +74,22 @@ class AccessTokenStore(AccessTokenStore, MongodbStore):
                            user_id=data.get("user_id"))
 
     def save_token(self, access_token):
-        self.collection.insert({
+        self.collection.insert(self._token_to_document(access_token))
+
+        return True
+
+    def save_tokens(self, access_tokens):
+        """
+        Stores many access tokens with a single ``insert_many`` call.
+        """
+        if access_tokens:
+            self.collection.insert_many([self._token_to_document(access_token) for access_token in access_tokens])
+
+        return True
+
+    @staticmethod
+    def _token_to_document(access_token):
+        return {
             "client_id": access_token.client_id,
             "grant_type": access_token.grant_type,
             "token": access_token.token,
@@ -83,9 +98,7 @@ class AccessTokenStore(AccessTokenStore, MongodbStore):
             "refresh_token": access_token.refresh_token,
             "refresh_expires_at": access_token.refresh_expires_at,
             "scopes": access_token.scopes,
-            "user_id": access_token.user_id})
-
-        return True
+            "user_id": access_token.user_id}
 
 
 class AuthCodeStore(AuthCodeStore, MongodbStore):
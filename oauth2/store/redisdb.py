@@ -1,11 +1,154 @@
 # -*- coding: utf-8 -*-
 import time
+import zlib
 
 import redis
+import redis.asyncio
 from oauth2.compatibility import json
 from oauth2.datatype import AccessToken, AuthorizationCode, Client
 from oauth2.error import AccessTokenNotFound, AuthCodeNotFound, ClientNotFoundError
-from oauth2.store import AccessTokenStore, AuthCodeStore, ClientStore
+from oauth2.store import (AccessTokenStore, AsyncAccessTokenStore,
+                          AsyncAuthCodeStore, AsyncClientStore,
+                          AuthCodeStore, ClientStore)
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+# Leading bytes that record the encoding of a value. Values without one are JSON.
+MSGPACK_MARKER = b"\x01"
+ZLIB_MARKER = b"\x02"
+
+# Reads a value of any codec: hashes are returned as a flat list of fields and values, all others as a string.
+_READ_VALUE = """
+local function value(key)
+    if redis.call("TYPE", key)["ok"] == "hash" then
+        return redis.call("HGETALL", key)
+    end
+    return redis.call("GET", key)
+end
+"""
+
+# Returns the value of KEYS[1]. Scripts only touch keys passed in KEYS, so a Redis Cluster routes them to the slot
+# of their keys.
+READ_SCRIPT = _READ_VALUE + """
+return value(KEYS[1])
+"""
+
+# Values of unique token keys written before they became pointers start with the JSON of the token data.
+LEGACY_RECORD_PREFIX = b'{"'
+
+
+def decode_value(payload):
+    """
+    Decodes a string value written by any of the codecs.
+
+    The codec is recognized by the first byte of the value, so values written by different codecs can be read
+    side by side, e.g. while a new codec is rolled out.
+
+    :param payload: The value as read from redis.
+    :type payload: bytes
+
+    :return: The decoded data.
+    """
+    marker = payload[:1]
+
+    if marker == ZLIB_MARKER:
+        return decode_value(zlib.decompress(payload[1:]))
+
+    if marker == MSGPACK_MARKER:
+        if msgpack is None:  # pragma: no cover
+            raise ImportError("Reading msgpack encoded values requires the 'msgpack' package")
+        return msgpack.unpackb(payload[1:], raw=False)
+
+    return json.loads(payload.decode("utf-8"))
+
+
+def decode_hash(fields):
+    """
+    Decodes the flat list of fields and values of a hash written by :class:`HashCodec`.
+
+    :param fields: Field names and values as returned by ``HGETALL`` from a script.
+    :type fields: list
+
+    :return: The decoded data.
+    :rtype: dict
+    """
+    return dict((fields[index].decode("utf-8"), decode_value(fields[index + 1]))
+                for index in range(0, len(fields), 2))
+
+
+class JsonCodec(object):
+    """
+    Stores a value as JSON text. Values longer than ``compress_threshold`` bytes are compressed with zlib.
+
+    :param compress_threshold: Size in bytes above which values are compressed. ``None`` disables compression.
+    :param compress_level: zlib compression level.
+    """
+    is_hash = False
+
+    def __init__(self, compress_threshold=None, compress_level=6):
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def encode(self, data):
+        """
+        :return: The value to store.
+        """
+        return self.compress(self.serialize(data))
+
+    def serialize(self, data):
+        return json.dumps(data)
+
+    def compress(self, payload):
+        if self.compress_threshold is None or len(payload) <= self.compress_threshold:
+            return payload
+
+        if not isinstance(payload, bytes):
+            payload = payload.encode("utf-8")
+
+        compressed = ZLIB_MARKER + zlib.compress(payload, self.compress_level)
+
+        return compressed if len(compressed) < len(payload) else payload
+
+
+class MsgpackCodec(JsonCodec):
+    """
+    Stores a value as msgpack, which is smaller and faster to decode than JSON. Requires the ``msgpack`` package.
+
+    :param compress_threshold: Size in bytes above which values are compressed. ``None`` disables compression.
+    :param compress_level: zlib compression level.
+    """
+
+    def __init__(self, compress_threshold=None, compress_level=6):
+        if msgpack is None:  # pragma: no cover
+            raise ImportError("MsgpackCodec requires the 'msgpack' package")
+
+        super().__init__(compress_threshold, compress_level)
+
+    def serialize(self, data):
+        return MSGPACK_MARKER + msgpack.packb(data, use_bin_type=True)
+
+
+class HashCodec(JsonCodec):
+    """
+    Stores a value as a redis hash with one field per attribute. Field values are JSON and compressed above
+    ``compress_threshold`` bytes.
+
+    Redis keeps small hashes in its compact listpack encoding. A hash only stays compact while all of its values are
+    shorter than the ``hash-max-listpack-value`` setting of the server.
+
+    :param compress_threshold: Size in bytes above which field values are compressed. ``None`` disables compression.
+    :param compress_level: zlib compression level.
+    """
+    is_hash = True
+
+    def encode(self, data):
+        """
+        :return: ``dict`` of field name to field value.
+        """
+        return dict((name, self.compress(json.dumps(value))) for name, value in data.items())
 
 
 class RedisStore(object):
@@ -20,45 +163,215 @@ class RedisStore(object):
         import redisdb
 
         token_store = TokenStore(host="127.0.0.1", port=6379, db=0)
+
+    Pass ``cluster=True`` or an instance of ``redis.RedisCluster`` as ``rs`` to store data in a Redis Cluster::
+
+        token_store = TokenStore(cluster=True, host="127.0.0.1", port=7000)
     """
-    def __init__(self, rs=None, prefix="oauth2", *args, **kwargs):
+    cluster_client_class = redis.RedisCluster
+
+    def __init__(self, rs=None, prefix="oauth2", *args, codec=None, cluster=None, **kwargs):
         self.prefix = prefix
+        self.codec = codec or JsonCodec()
+        self._scripts = {}
 
         if rs is not None:
             self.rs = rs
         else:
-            self.rs = redis.StrictRedis(*args, **kwargs)
+            self.rs = self._create_client(cluster, *args, **kwargs)
+
+        self.cluster = isinstance(self.rs, self.cluster_client_class) if cluster is None else cluster
+
+        if self.cluster and "{" in prefix:
+            raise ValueError("The prefix of keys in a Redis Cluster must not contain a hash tag")
 
     def delete(self, name):
         cache_key = self._generate_cache_key(name)
         self.rs.delete(cache_key)
 
-    def write(self, name, data):
+    def write(self, name, data, pipe=None):
         """It makes no sense to hold the key after the expiration time"""
+        self.write_serialized(name, self.codec.encode(data), self._ttl(data), pipe)
+
+    def write_serialized(self, name, payload, ttl=None, pipe=None):
+        """
+        Stores an already serialized value, so a value written to several keys is only serialized once.
 
-        expires_at = data.get('expires_at')
+        :param name: Name of the key without prefix.
+        :param payload: The serialized value. A ``dict`` is stored as a hash.
+        :param ttl: Seconds until the key expires or ``None`` to keep it.
+        :param pipe: A pipeline to queue the command in instead of sending it at once.
+        """
         cache_key = self._generate_cache_key(name)
 
-        if expires_at:
-            token_ttl = int(expires_at) - int(time.time())
-            self.rs.set(cache_key, json.dumps(data), ex=token_ttl)
+        if isinstance(payload, dict):
+            # The key may hold a string written by another codec, which HSET cannot update.
+            rs = self.rs.pipeline(transaction=True) if pipe is None else pipe
+            rs.delete(cache_key)
+            rs.hset(cache_key, mapping=payload)
+            if ttl:
+                rs.expire(cache_key, ttl)
+            if pipe is None:
+                rs.execute()
+            return
+
+        rs = self.rs if pipe is None else pipe
+
+        if ttl:
+            rs.set(cache_key, payload, ex=ttl)
         else:
-            self.rs.set(cache_key, json.dumps(data))
+            rs.set(cache_key, payload)
 
     def read(self, name):
-        cache_key = self._generate_cache_key(name)
-        data = self.rs.get(cache_key)
+        return self.decode(self.run_script(READ_SCRIPT, keys=[self._generate_cache_key(name)], args=[]))
+
+    @staticmethod
+    def decode(value):
+        """
+        Decodes a value read by a script, whatever codec wrote it.
 
-        if data is None:
+        :return: The decoded data or ``None`` if the key did not exist.
+        """
+        if value is None:
             return None
 
-        return json.loads(data.decode("utf-8"))
+        if isinstance(value, list):
+            return decode_hash(value)
+
+        return decode_value(value)
 
     def _generate_cache_key(self, identifier):
         return self.prefix + "_" + identifier
 
+    @staticmethod
+    def _create_client(cluster, *args, **kwargs):
+        if cluster:
+            return redis.RedisCluster(*args, **kwargs)
+
+        return redis.StrictRedis(*args, **kwargs)
+
+    def run_script(self, source, keys, args):
+        """
+        Runs a Lua script. Scripts are registered once and sent by their SHA1 digest afterwards.
+        """
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self.rs.register_script(source)
+
+        return script(keys=keys, args=args)
+
+    @classmethod
+    def _ttl(cls, data):
+        return cls._ttl_until(data.get("expires_at"))
+
+    @staticmethod
+    def _ttl_until(expires_at):
+        """
+        :return: Seconds until ``expires_at``, at least ``1``, or ``None`` if it never expires.
+        """
+        if not expires_at:
+            return None
+
+        return max(int(expires_at) - int(time.time()), 1)
+
+
+class ReplayCache(RedisStore):
+    """
+    Remembers single-use values in redis until they expire.
+
+    Shares used authorization codes of :class:`oauth2.store.stateless.TokenStore`
+    between processes. Each value takes one ``SET NX`` command.
+
+    Initialization::
+
+        from oauth2.store.redisdb import ReplayCache
+        from oauth2.store.stateless import TokenStore
+
+        token_store = TokenStore(stateless_token, replay_cache=ReplayCache(host="127.0.0.1", port=6379, db=0))
+    """
+
+    def add(self, key, expires_at):
+        """
+        See :meth:`oauth2.store.stateless.ReplayCache.add`.
+        """
+        ttl = max(int(expires_at) - int(time.time()), 1)
+        return bool(self.rs.set(self._generate_cache_key("replay_" + key), 1, nx=True, ex=ttl))
+
+
+class PubSubChannel(RedisStore):
+    """
+    Shares revocations of :class:`oauth2.store.stateless.RevocationList` between nodes
+    through redis pub/sub.
+
+    Revocations are also kept in a sorted set scored by their expiration time, so a node
+    that subscribes later receives all revocations that did not expire yet. Messages are
+    received by a daemon thread of the redis client.
+
+    Initialization::
+
+        from oauth2.store.redisdb import PubSubChannel
+        from oauth2.store.stateless import RevocationList
+
+        revocation_list = RevocationList(channel=PubSubChannel(host="127.0.0.1", port=6379, db=0))
+    """
+
+    # Seconds the receiving thread waits for a message.
+    poll_interval = 1.0
+
+    def __init__(self, rs=None, prefix="oauth2", *args, **kwargs):
+        super().__init__(rs, prefix, *args, **kwargs)
+        self.name = self._generate_cache_key("revocations")
+        self.thread = None
+
+    def publish(self, token_id, expires_at):
+        """
+        See :meth:`oauth2.store.stateless.InProcessChannel.publish`.
+        """
+        pipe = self.rs.pipeline(transaction=False)
+        pipe.zadd(self.name, {token_id: expires_at or "+inf"})
+        pipe.zremrangebyscore(self.name, 0, int(time.time()) - 1)
+        pipe.publish(self.name, json.dumps([token_id, expires_at]))
+        pipe.execute()
+
+    def subscribe(self, callback):
+        """
+        Calls ``callback(token_id, expires_at)`` for all revocations that did not expire yet
+        and for every revocation published afterwards.
+
+        See :meth:`oauth2.store.stateless.InProcessChannel.subscribe`.
+        """
+        def receive(message):
+            token_id, expires_at = json.loads(message["data"].decode("utf-8"))
+            callback(token_id, expires_at)
+
+        pubsub = self.rs.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.name: receive})
+
+        for token_id, score in self.rs.zrangebyscore(self.name, int(time.time()), "+inf", withscores=True):
+            callback(token_id.decode("utf-8"), 0 if score == float("inf") else int(score))
+
+        self.thread = pubsub.run_in_thread(sleep_time=self.poll_interval, daemon=True)
+
 
 class TokenStore(AccessTokenStore, AuthCodeStore, RedisStore):
+    """
+    Stores access tokens and authorization codes in redis.
+
+    The data of an access token is stored under the token and expires with it. A refresh token holds the same
+    serialized data until the refresh token expires, and the unique token key is a small key holding the name of the
+    access token. Unique token keys written by previous versions, which hold a copy of the data, are still read and
+    are converted by :meth:`migrate_layout`.
+
+    In a Redis Cluster the token and its refresh token are stored with the hash tag ``{refresh_token}``, or
+    ``{token}`` for tokens without a refresh token, so they are written and deleted atomically in one slot. The unique
+    token key of a user cannot share the slot, as it is looked up by client, grant and user only.
+
+    The hash tag changes the key names: the access token is stored under ``{refresh_token}_token`` or ``{token}``
+    instead of ``token`` and the refresh token under ``{refresh_token}``. Tokens written without ``cluster=True`` are
+    not found by a store in cluster mode and the other way round, so switching a store to a Redis Cluster requires
+    its tokens to be issued again.
+    """
+
     def fetch_by_code(self, code):
         """
         Returns data belonging to an authorization code from redis or ``None`` if no data was found.
@@ -99,28 +412,82 @@ class TokenStore(AccessTokenStore, AuthCodeStore, RedisStore):
         """
         Stores the access token and additional data in redis.
 
+        The token, its unique token key and its refresh token are written in one ``MULTI`` block, so they are
+        sent in a single round trip and either all or none of them are stored.
+
+        In a Redis Cluster the unique token key lives in another slot than the token and its refresh token. It is
+        written after the ``MULTI`` block of the other two keys.
+
         See :class:`oauth2.store.AccessTokenStore`.
         """
-        self.write(access_token.token, access_token.__dict__)
+        pipe = self.rs.pipeline(transaction=True)
 
-        unique_token_key = self._unique_token_key(access_token.client_id, access_token.grant_type, access_token.user_id)
-        self.write(unique_token_key, access_token.__dict__)
+        if not self.cluster:
+            self._save_token(access_token, pipe)
+            pipe.execute()
+            return
+
+        unique_token_pipe = self.rs.pipeline(transaction=False)
+        self._save_token(access_token, pipe, unique_token_pipe)
+        pipe.execute()
+        unique_token_pipe.execute()
+
+    def save_tokens(self, access_tokens):
+        """
+        Stores many access tokens in a single pipelined round trip.
+
+        In a Redis Cluster the keys of different tokens live on different nodes. The commands are sent without
+        ``MULTI`` and the cluster client sends the commands of each node as one batch. A refresh token is always
+        written after its access token on the same connection.
+
+        See :class:`oauth2.store.AccessTokenStore`.
+        """
+        pipe = self.rs.pipeline(transaction=not self.cluster)
+
+        for access_token in access_tokens:
+            self._save_token(access_token, pipe)
+
+        pipe.execute()
+
+    def _save_token(self, access_token, pipe, unique_token_pipe=None):
+        # The record expires with the access token and the refresh token keeps its own copy of the serialized
+        # record. The unique token key only holds the name of the record.
+        record_name = self._record_name(access_token)
+        payload = self.codec.encode(access_token.__dict__)
+        self.write_serialized(record_name, payload, self._ttl_until(access_token.expires_at), pipe)
 
         if access_token.refresh_token is not None:
-            self.write(access_token.refresh_token, access_token.__dict__)
+            self.write_serialized(self._refresh_token_name(access_token.refresh_token), payload,
+                                  self._ttl_until(access_token.refresh_expires_at), pipe)
+
+        unique_token_key = self._unique_token_key(access_token.client_id, access_token.grant_type, access_token.user_id)
+        self.write_serialized(unique_token_key, record_name, self._ttl_until(access_token.expires_at),
+                              unique_token_pipe or pipe)
 
     def delete_refresh_token(self, refresh_token):
         """
-        Deletes a refresh token after use
+        Deletes a refresh token and its access token after use.
+
+        The refresh token is read to learn its access token, then both keys are deleted in one ``MULTI`` block.
+        Only one of several concurrent calls for the same refresh token succeeds.
 
         :param refresh_token: The refresh token to delete.
+        :raises: :class:`oauth2.error.AccessTokenNotFound` if the refresh token does not exist.
         """
-        access_token = self.fetch_by_refresh_token(refresh_token)
+        refresh_token_name = self._refresh_token_name(refresh_token)
+        token_data = self.read(refresh_token_name)
+
+        if token_data is None:
+            raise AccessTokenNotFound
 
-        self.delete(access_token.token)
+        pipe = self.rs.pipeline(transaction=True)
+        self._queue_delete_refresh_token(refresh_token_name, token_data, pipe)
+
+        if not pipe.execute()[0]:
+            raise AccessTokenNotFound
 
     def fetch_by_refresh_token(self, refresh_token):
-        token_data = self.read(refresh_token)
+        token_data = self.read(self._refresh_token_name(refresh_token))
 
         if token_data is None:
             raise AccessTokenNotFound
@@ -129,13 +496,114 @@ class TokenStore(AccessTokenStore, AuthCodeStore, RedisStore):
 
     def fetch_existing_token_of_user(self, client_id, grant_type, user_id):
         unique_token_key = self._unique_token_key(client_id=client_id, grant_type=grant_type, user_id=user_id)
-        token_data = self.read(unique_token_key)
+        pointer = self.rs.get(self._generate_cache_key(unique_token_key))
+
+        if pointer is None:
+            raise AccessTokenNotFound
+
+        token_data = self._legacy_record(pointer)
+        if token_data is None:
+            token_data = self.read(pointer.decode("utf-8"))
 
         if token_data is None:
             raise AccessTokenNotFound
 
         return AccessToken(**token_data)
 
+    def migrate_layout(self, batch_size=500):
+        """
+        Converts tokens written by previous versions, which stored a copy of the token data under the access token,
+        the unique token key and the refresh token. The copy under the unique token key is replaced by a pointer and
+        the refresh token key gets the lifetime of the refresh token instead of the one of the access token.
+
+        Keys are scanned with ``SCAN`` in batches of ``batch_size`` and can be migrated while the store is in use.
+        Running the migration again does not change migrated tokens. Stores in a Redis Cluster are not supported.
+
+        :return: The number of unique token keys that were converted to pointers.
+        :rtype: int
+        :raises ValueError: If the store uses a Redis Cluster.
+        """
+        if self.cluster:
+            raise ValueError("migrate_layout() does not support Redis Cluster")
+
+        migrated = 0
+        keys = []
+
+        for key in self.rs.scan_iter(match=self._generate_cache_key("*"), count=batch_size):
+            keys.append(key)
+            if len(keys) >= batch_size:
+                migrated += self._migrate_keys(keys)
+                keys = []
+
+        if keys:
+            migrated += self._migrate_keys(keys)
+
+        return migrated
+
+    def _migrate_keys(self, keys):
+        pipe = self.rs.pipeline(transaction=False)
+        migrated = self._queue_migration(keys, self.rs.mget(keys), pipe)
+        pipe.execute()
+
+        return migrated
+
+    def _queue_migration(self, keys, values, pipe):
+        migrated = 0
+
+        for key, value in zip(keys, values):
+            # Pointers, other types and values that are not token data are left alone.
+            if value is None or not value.startswith(b"{"):
+                continue
+
+            try:
+                data = json.loads(value.decode("utf-8"))
+                access_token = AccessToken(**data)
+            except (TypeError, ValueError):
+                continue
+
+            name = key.decode("utf-8")[len(self.prefix) + 1:]
+            if name == access_token.token:
+                continue
+
+            if name == access_token.refresh_token:
+                ttl = self._ttl_until(access_token.refresh_expires_at)
+                if ttl:
+                    pipe.expire(key, ttl)
+                else:
+                    pipe.persist(key)
+                continue
+
+            self.write_serialized(name, access_token.token, self._ttl_until(access_token.expires_at), pipe)
+            migrated += 1
+
+        return migrated
+
+    def _queue_delete_refresh_token(self, refresh_token_name, token_data, pipe):
+        pipe.delete(self._generate_cache_key(refresh_token_name))
+        pipe.delete(self._generate_cache_key(self._record_name(AccessToken(**token_data))))
+
+    @staticmethod
+    def _legacy_record(pointer):
+        """
+        :return: The token data if a unique token key still holds a copy of it instead of a pointer, else ``None``.
+        """
+        return decode_value(pointer) if pointer.startswith(LEGACY_RECORD_PREFIX) else None
+
+    def _record_name(self, access_token):
+        """
+        In a Redis Cluster the record carries the hash tag of its refresh token, so both keys share a slot.
+        """
+        if not self.cluster:
+            return access_token.token
+
+        if access_token.refresh_token is None:
+            return "{" + access_token.token + "}"
+
+        return "{" + access_token.refresh_token + "}_" + access_token.token
+
+    def _refresh_token_name(self, refresh_token):
+        return "{" + refresh_token + "}" if self.cluster else refresh_token
+
     def _unique_token_key(self, client_id, grant_type, user_id):
         return "{0}_{1}_{2}".format(client_id, grant_type, user_id)
 
@@ -170,3 +638,198 @@ class ClientStore(ClientStore, RedisStore):
                       redirect_uris=client_data["redirect_uris"],
                       authorized_grants=client_data["authorized_grants"],
                       authorized_response_types=client_data["authorized_response_types"])
+
+
+class AsyncRedisStore(RedisStore):
+    """
+    Base class of the stores that talk to redis with ``redis.asyncio`` and do not block the event loop.
+
+    Arguments are passed to ``redis.asyncio.Redis``, or ``redis.asyncio.RedisCluster`` with ``cluster=True``,
+    which keep a pool of connections. Limit its size with ``max_connections``::
+
+        from oauth2.store.redisdb import AsyncTokenStore
+
+        token_store = AsyncTokenStore(host="127.0.0.1", port=6379, db=0, max_connections=50)
+    """
+    cluster_client_class = redis.asyncio.RedisCluster
+
+    async def delete(self, name):
+        await self.rs.delete(self._generate_cache_key(name))
+
+    async def write(self, name, data):
+        pipe = self.rs.pipeline(transaction=True)
+        self.write_serialized(name, self.codec.encode(data), self._ttl(data), pipe)
+        await pipe.execute()
+
+    async def read(self, name):
+        return self.decode(await self.run_script(READ_SCRIPT, keys=[self._generate_cache_key(name)], args=[]))
+
+    async def close(self):
+        """
+        Closes the connections of the pool.
+        """
+        await self.rs.aclose()
+
+    @staticmethod
+    def _create_client(cluster, *args, **kwargs):
+        if cluster:
+            return redis.asyncio.RedisCluster(*args, **kwargs)
+
+        return redis.asyncio.Redis(*args, **kwargs)
+
+
+class AsyncTokenStore(AsyncAccessTokenStore, AsyncAuthCodeStore, AsyncRedisStore, TokenStore):
+    """
+    Stores access tokens and authorization codes in redis like :class:`TokenStore` with coroutines.
+
+    Use it with :meth:`oauth2.Provider.dispatch_async`, e.g. through the aiohttp or ASGI adapter.
+    Keys and values are the same as those of :class:`TokenStore`, so both stores can share data.
+    """
+
+    async def fetch_by_code(self, code):
+        code_data = await self.read(code)
+
+        if code_data is None:
+            raise AuthCodeNotFound
+
+        return AuthorizationCode(**code_data)
+
+    async def save_code(self, authorization_code):
+        await self.write(authorization_code.code,
+                         {"client_id": authorization_code.client_id,
+                          "code": authorization_code.code,
+                          "expires_at": authorization_code.expires_at,
+                          "redirect_uri": authorization_code.redirect_uri,
+                          "scopes": authorization_code.scopes,
+                          "data": authorization_code.data,
+                          "user_id": authorization_code.user_id})
+
+    async def delete_code(self, code):
+        await self.delete(code)
+
+    async def save_token(self, access_token):
+        """
+        See :meth:`TokenStore.save_token`.
+        """
+        pipe = self.rs.pipeline(transaction=True)
+
+        if not self.cluster:
+            self._save_token(access_token, pipe)
+            await pipe.execute()
+            return
+
+        unique_token_pipe = self.rs.pipeline(transaction=False)
+        self._save_token(access_token, pipe, unique_token_pipe)
+        await pipe.execute()
+        await unique_token_pipe.execute()
+
+    async def save_tokens(self, access_tokens):
+        """
+        See :meth:`TokenStore.save_tokens`.
+        """
+        pipe = self.rs.pipeline(transaction=not self.cluster)
+
+        for access_token in access_tokens:
+            self._save_token(access_token, pipe)
+
+        await pipe.execute()
+
+    async def delete_refresh_token(self, refresh_token):
+        """
+        See :meth:`TokenStore.delete_refresh_token`.
+        """
+        refresh_token_name = self._refresh_token_name(refresh_token)
+        token_data = await self.read(refresh_token_name)
+
+        if token_data is None:
+            raise AccessTokenNotFound
+
+        pipe = self.rs.pipeline(transaction=True)
+        self._queue_delete_refresh_token(refresh_token_name, token_data, pipe)
+
+        if not (await pipe.execute())[0]:
+            raise AccessTokenNotFound
+
+    async def fetch_by_refresh_token(self, refresh_token):
+        token_data = await self.read(self._refresh_token_name(refresh_token))
+
+        if token_data is None:
+            raise AccessTokenNotFound
+
+        return AccessToken(**token_data)
+
+    async def fetch_existing_token_of_user(self, client_id, grant_type, user_id):
+        unique_token_key = self._unique_token_key(client_id=client_id, grant_type=grant_type, user_id=user_id)
+        pointer = await self.rs.get(self._generate_cache_key(unique_token_key))
+
+        if pointer is None:
+            raise AccessTokenNotFound
+
+        token_data = self._legacy_record(pointer)
+        if token_data is None:
+            token_data = await self.read(pointer.decode("utf-8"))
+
+        if token_data is None:
+            raise AccessTokenNotFound
+
+        return AccessToken(**token_data)
+
+    async def migrate_layout(self, batch_size=500):
+        """
+        See :meth:`TokenStore.migrate_layout`.
+        """
+        if self.cluster:
+            raise ValueError("migrate_layout() does not support Redis Cluster")
+
+        migrated = 0
+        keys = []
+
+        async for key in self.rs.scan_iter(match=self._generate_cache_key("*"), count=batch_size):
+            keys.append(key)
+            if len(keys) >= batch_size:
+                migrated += await self._migrate_keys(keys)
+                keys = []
+
+        if keys:
+            migrated += await self._migrate_keys(keys)
+
+        return migrated
+
+    async def _migrate_keys(self, keys):
+        pipe = self.rs.pipeline(transaction=False)
+        migrated = self._queue_migration(keys, await self.rs.mget(keys), pipe)
+        await pipe.execute()
+
+        return migrated
+
+
+class AsyncClientStore(AsyncClientStore, AsyncRedisStore, ClientStore):
+    """
+    Stores clients in redis like :class:`ClientStore` with coroutines.
+    """
+
+    async def add_client(self, client_id, client_secret, redirect_uris,
+                         authorized_grants=None, authorized_response_types=None):
+        """
+        See :meth:`ClientStore.add_client`.
+        """
+        await self.write(client_id,
+                         {"identifier": client_id,
+                          "secret": client_secret,
+                          "redirect_uris": redirect_uris,
+                          "authorized_grants": authorized_grants,
+                          "authorized_response_types": authorized_response_types})
+
+        return True
+
+    async def fetch_by_client_id(self, client_id):
+        client_data = await self.read(client_id)
+
+        if client_data is None:
+            raise ClientNotFoundError
+
+        return Client(identifier=client_data["identifier"],
+                      secret=client_data["secret"],
+                      redirect_uris=client_data["redirect_uris"],
+                      authorized_grants=client_data["authorized_grants"],
+                      authorized_response_types=client_data["authorized_response_types"])
@@ -1,16 +1,149 @@
 # -*- coding: utf-8 -*-
+import threading
+import time
 
-from oauth2.datatype import AccessToken
-from oauth2.error import AccessTokenNotFound
-from oauth2.store import AccessTokenStore
+from oauth2.datatype import AccessToken, AuthorizationCode
+from oauth2.error import AccessTokenNotFound, AuthCodeNotFound
+from oauth2.store import AccessTokenStore, AuthCodeStore
 from oauth2.tokengenerator import StatelessTokenGenerator
 
 
-class TokenStore(AccessTokenStore):
+class ReplayCache(object):
+    """
+    Remembers single-use values, e.g. authorization codes, until they expire.
+
+    The cache lives in the memory of the current process. Use
+    :class:`oauth2.store.redisdb.ReplayCache` if several processes redeem codes.
+    """
+
+    # Seconds between two scans for expired entries.
+    purge_interval = 60
+
+    def __init__(self):
+        self._expires_at = {}
+        self._lock = threading.Lock()
+        self._next_purge = 0
+
+    def add(self, key, expires_at):
+        """
+        Marks ``key`` as used.
+
+        :param key: The value to remember.
+        :type key: str
+        :param expires_at: Time in seconds since the epoch after which ``key`` can be forgotten.
+        :type expires_at: int
+
+        :return: ``False`` if ``key`` has already been added and did not expire yet, else ``True``.
+        :rtype: bool
+        """
+        now = int(time.time())
+
+        with self._lock:
+            if now >= self._next_purge:
+                self._expires_at = dict((k, v) for k, v in self._expires_at.items() if v == 0 or v >= now)
+                self._next_purge = now + self.purge_interval
+
+            if key in self:
+                return False
+
+            self._expires_at[key] = expires_at
+            return True
+
+    def __contains__(self, key):
+        expires_at = self._expires_at.get(key)
+        return expires_at is not None and (expires_at == 0 or expires_at >= time.time())
+
+    def __len__(self):
+        return len(self._expires_at)
+
+
+class InProcessChannel(object):
+    """
+    Delivers revocations to the :class:`RevocationList` objects of the current process.
+
+    Useful in tests and if a single process validates tokens.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+
+    def publish(self, token_id, expires_at):
+        """
+        Sends a revocation to all subscribers.
+
+        :param token_id: Id of the revoked token.
+        :param expires_at: Time after which the token would have expired anyway, ``0`` if never.
+        """
+        for callback in list(self.subscribers):
+            callback(token_id, expires_at)
+
+    def subscribe(self, callback):
+        """
+        Calls ``callback(token_id, expires_at)`` for every published revocation.
+        """
+        self.subscribers.append(callback)
+
+
+class RevocationList(ReplayCache):
+    """
+    Ids of revoked stateless tokens, held in memory.
+
+    Pass it to :class:`oauth2.tokengenerator.StatelessTokenGenerator`, which then rejects
+    revoked tokens with a dictionary lookup and without any network call. An id is
+    forgotten once its token would have expired anyway.
+
+    Revocations are shared between nodes through a ``channel``, an object with the methods
+    ``publish(token_id, expires_at)`` and ``subscribe(callback)``, like :class:`InProcessChannel`
+    or :class:`oauth2.store.redisdb.PubSubChannel`.
+
+    Initialization::
+
+        from oauth2.store.redisdb import PubSubChannel
+        from oauth2.store.stateless import RevocationList, TokenStore
+        from oauth2.tokengenerator import StatelessTokenGenerator
+
+        revocation_list = RevocationList(channel=PubSubChannel(host="127.0.0.1", port=6379, db=0))
+        stateless_token = StatelessTokenGenerator(secret_key='xxx', revocation_list=revocation_list)
+        token_store = TokenStore(stateless_token)
+
+    :param channel: Channel to publish and receive revocations. (optional)
+    """
+
+    def __init__(self, channel=None):
+        super().__init__()
+        self.channel = channel
+
+        if channel is not None:
+            channel.subscribe(self.add)
+
+    def revoke(self, token_id, expires_at):
+        """
+        Revokes a token on this node and publishes the revocation to the other nodes.
+
+        :param token_id: Id of the token as returned by
+                         :meth:`oauth2.tokengenerator.StatelessTokenGenerator.token_id`.
+        :type token_id: str
+        :param expires_at: Time in seconds since the epoch after which the token would have
+                           expired anyway, ``0`` if it never expires.
+        :type expires_at: int
+        """
+        self.add(token_id, expires_at)
+
+        if self.channel is not None:
+            self.channel.publish(token_id, expires_at)
+
+
+class TokenStore(AccessTokenStore, AuthCodeStore):
     """Uses stateless token to validate access tokens and auth tokens.
 
     This Dummy store for supports ``stateless``. Arguments are passed to the underlying client implementation.
 
+    Authorization codes are stateless too: :meth:`save_code` replaces the random code with
+    a signed one that contains all data of the code. A code can be redeemed once,
+    :meth:`delete_code` claims it in a replay cache that only holds codes until they expire.
+    The grant calls it after the code was validated, so a rejected request does not use up a code.
+    The data is signed, not encrypted, so it can be read by anyone who sees the code.
+
     Initialization::
 
         from oauth2.store.stateless import TokenStore
@@ -18,14 +151,22 @@ class TokenStore(AccessTokenStore):
 
         stateless_token = StatelessTokenGenerator(secret_key='xxx')
         token_store = TokenStore(stateless_token)
+
+    :param stateless_token: Generator that signs and validates tokens and codes.
+    :type stateless_token: oauth2.tokengenerator.StatelessTokenGenerator
+    :param replay_cache: Object with an ``add(key, expires_at)`` method like :class:`ReplayCache`.
+                         A new :class:`ReplayCache` if not set.
     """
 
-    def __init__(self, stateless_token):
+    code_type = "authorization_code"
+
+    def __init__(self, stateless_token, replay_cache=None):
         if isinstance(stateless_token, StatelessTokenGenerator) is False:
             raise AccessTokenNotFound(
-                "Token store adapter must inherit from class '{0}'".format(self.site_adapter_class.__name__)
+                "Token store adapter must inherit from class '{0}'".format(StatelessTokenGenerator.__name__)
             )
         self.stateless_token = stateless_token
+        self.replay_cache = ReplayCache() if replay_cache is None else replay_cache
 
     def save_token(self, access_token):
         """
@@ -34,23 +175,102 @@ class TokenStore(AccessTokenStore):
         """
         pass
 
+    def save_tokens(self, access_tokens):
+        """
+        Just dummy interface who imulate store tokens.
+        See :class:`oauth2.store.AccessTokenStore`.
+        """
+        pass
+
     def delete_refresh_token(self, refresh_token):
         """
-        Just dummy interface who imulate delete tokens.
+        Revokes the refresh token if the token generator has a :class:`RevocationList`.
+        Otherwise a stateless refresh token stays valid until it expires.
 
         :param refresh_token: The refresh token to delete.
         """
-        pass
+        if self.stateless_token.revocation_list is None:
+            return
+
+        try:
+            self.stateless_token.revoke(refresh_token)
+        except AccessTokenNotFound:
+            pass
 
     def fetch_by_refresh_token(self, refresh_token):
         """
         Stateless token can generate oauth new tokens by refresh token.
+
+        Everything is read from the signed refresh token itself. The expiration time is
+        the time the token was issued at plus ``refresh_expires_in`` of the token generator,
+        or ``0`` if refresh tokens never expire.
+
+        :param refresh_token: The refresh token sent by the client.
+        :return: An instance of :class:`oauth2.datatype.AccessToken`.
+        :raises: :class:`oauth2.error.AccessTokenNotFound` if the refresh token is invalid.
         """
-        data = self.stateless_token.validate_token(token, 'refresh_token')
-        return datatype.AccessToken(**data)
+        data, issued_at = self.stateless_token.validate_token(refresh_token, 'refresh_token',
+                                                              return_timestamp=True)
+
+        refresh_expires_in = self.stateless_token.refresh_expires_in
+        refresh_expires_at = issued_at + refresh_expires_in if refresh_expires_in else 0
+
+        return AccessToken(client_id=data.get("client_id"),
+                           grant_type=data.get("grant_type"),
+                           token=None,
+                           data=data.get("data", {}),
+                           refresh_token=refresh_token,
+                           refresh_expires_at=refresh_expires_at,
+                           scopes=data.get("scopes", []),
+                           user_id=data.get("user_id"))
 
     def fetch_existing_token_of_user(self, client_id, grant_type, user_id):
         """
         Stateless implementation can't fitch token.
         """
         pass
+
+    def fetch_by_code(self, code):
+        """
+        Validates a signed code.
+
+        See :class:`oauth2.store.AuthCodeStore`.
+
+        :raises: :class:`oauth2.error.AuthCodeNotFound` if the code is invalid.
+        """
+        data = self._validate_code(code)
+
+        return AuthorizationCode(client_id=data.get("client_id"), code=code, expires_at=data["expires_at"],
+                                 redirect_uri=data.get("redirect_uri"), scopes=data.get("scopes", []),
+                                 data=data.get("data"), user_id=data.get("user_id"))
+
+    def save_code(self, authorization_code):
+        """
+        Replaces ``authorization_code.code`` with a code that contains all data of ``authorization_code``.
+
+        See :class:`oauth2.store.AuthCodeStore`.
+        """
+        authorization_code.code = self.stateless_token.json_serialize(dict(
+            type=self.code_type, client_id=authorization_code.client_id,
+            expires_at=authorization_code.expires_at, redirect_uri=authorization_code.redirect_uri,
+            scopes=authorization_code.scopes, data=authorization_code.data, user_id=authorization_code.user_id))
+
+    def delete_code(self, code):
+        """
+        Marks a signed code as used in the replay cache.
+
+        See :class:`oauth2.store.AuthCodeStore`.
+
+        :raises: :class:`oauth2.error.AuthCodeNotFound` if the code is invalid or has already been used.
+        """
+        data = self._validate_code(code)
+
+        # The signature identifies a code and is much shorter.
+        if not self.replay_cache.add(self.stateless_token.token_id(code), data["expires_at"]):
+            raise AuthCodeNotFound
+
+    def _validate_code(self, code):
+        try:
+            return self.stateless_token.validate_token(code, self.code_type)
+        except AccessTokenNotFound:
+            raise AuthCodeNotFound
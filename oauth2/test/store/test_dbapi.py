@@ -258,6 +258,49 @@ class AccessTokenStoreTestCase(StoreTestCase):
             assert_called_with(store_class.create_scope_query, ("bar", 1))
         fourth_cursor.close.assert_called_with()
 
+    @with_classes(access_token_stores)
+    def test_save_tokens(self, store_class):
+        cursor_mock = Mock(spec=["close", "execute", "executemany"])
+
+        def execute(query, params):
+            cursor_mock.lastrowid = params[2]
+
+        cursor_mock.execute.side_effect = execute
+
+        connection_mock = Mock(spec=["commit", "cursor"])
+        connection_mock.cursor.return_value = cursor_mock
+
+        access_tokens = [AccessToken(client_id="abc", grant_type="test", token=1, data={"test": "data"},
+                                     expires_at=1000, scopes=["foo", "bar"]),
+                         AccessToken(client_id="abc", grant_type="test", token=2, expires_at=1000,
+                                     scopes=["foo"])]
+
+        store = store_class(connection=connection_mock)
+        result = store.save_tokens(access_tokens)
+
+        self.assertTrue(result)
+        self.assertEqual(connection_mock.cursor.call_count, 1)
+        self.assertEqual(connection_mock.commit.call_count, 1)
+        cursor_mock.close.assert_called_once_with()
+
+        cursor_mock.execute.assert_has_calls([
+            call(store_class.create_access_token_query, ("abc", "test", 1, 1000, None, None, None)),
+            call(store_class.create_access_token_query, ("abc", "test", 2, 1000, None, None, None))
+        ])
+        cursor_mock.executemany.assert_has_calls([
+            call(store_class.create_data_query, [("test", "data", 1)]),
+            call(store_class.create_scope_query, [("foo", 1), ("bar", 1), ("foo", 2)])
+        ])
+
+    @with_classes(access_token_stores)
+    def test_save_tokens_empty(self, store_class):
+        connection_mock = Mock(spec=["commit", "cursor"])
+
+        store = store_class(connection=connection_mock)
+
+        self.assertTrue(store.save_tokens([]))
+        self.assertEqual(connection_mock.cursor.call_count, 0)
+
 
 class AuthCodeStoreTestCase(StoreTestCase):
     @with_classes(auth_code_stores)
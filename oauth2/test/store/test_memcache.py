@@ -90,6 +90,25 @@ class MemcacheTokenStoreTestCase(unittest.TestCase):
                                       call(unique_token_key, data),
                                       call(refresh_token_key, data)])
 
+    def test_save_tokens(self):
+        data = {"client_id": "myclient", "token": "xyz",
+                "data": None, "scopes": [],
+                "expires_at": None, "refresh_token": "mno",
+                "refresh_expires_at": None,
+                "grant_type": "authorization_code",
+                "user_id": 123}
+
+        mc_mock = Mock(spec=["set_multi"])
+
+        store = TokenStore(mc=mc_mock, prefix=self.cache_prefix)
+
+        store.save_tokens([AccessToken(**data)])
+
+        mc_mock.set_multi.assert_called_once_with({"xyz": data,
+                                                   "myclient_authorization_code_123": data,
+                                                   "mno": data},
+                                                  key_prefix=self.cache_prefix + "_")
+
     def test_fetch_existing_token_of_user(self):
         data = {"client_id": "myclient", "token": "xyz",
                 "data": {"name": "test"}, "scopes": ["foo_read", "foo_write"],
@@ -1,22 +1,610 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from mock import Mock
+import asyncio
+
+from mock import AsyncMock, Mock, patch
 from oauth2.compatibility import json
-from oauth2.datatype import AccessToken
-from oauth2.store.redisdb import TokenStore
+from oauth2.datatype import AccessToken, AuthorizationCode
+from oauth2.error import AccessTokenNotFound, AuthCodeNotFound, ClientNotFoundError
+from oauth2.store.redisdb import (READ_SCRIPT, ZLIB_MARKER,
+                                  AsyncClientStore,
+                                  AsyncTokenStore, ClientStore, HashCodec,
+                                  JsonCodec, MsgpackCodec, PubSubChannel,
+                                  ReplayCache, TokenStore, decode_hash,
+                                  decode_value, msgpack)
 from oauth2.test import unittest
 
 
 class TokenStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.access_token = AccessToken(client_id="abc", grant_type="token", token="xyz", refresh_token="def",
+                                        expires_at=1600, refresh_expires_at=4600, user_id=1)
+        self.record = json.dumps(self.access_token.__dict__).encode("utf-8")
+
     def test_delete_refresh_token(self):
-        refresh_token_id = "def"
-        access_token = AccessToken(client_id="abc", grant_type="token", token="xyz")
+        pipeline_mock = Mock(spec=["delete", "execute"])
+        pipeline_mock.execute.return_value = [1, 1]
+        redisdb_mock = Mock(spec=["pipeline", "register_script"])
+        redisdb_mock.pipeline.return_value = pipeline_mock
+        redisdb_mock.register_script.return_value = Mock(return_value=self.record)
+
+        store = TokenStore(rs=redisdb_mock, prefix="test")
+        store.delete_refresh_token("def")
 
-        redisdb_mock = Mock(spec=["delete", "get"])
-        redisdb_mock.get.return_value = bytes(json.dumps(access_token.__dict__).encode('utf-8'))
+        redisdb_mock.register_script.assert_called_once_with(READ_SCRIPT)
+        redisdb_mock.register_script.return_value.assert_called_once_with(keys=["test_def"], args=[])
+        redisdb_mock.pipeline.assert_called_once_with(transaction=True)
+        pipeline_mock.delete.assert_any_call("test_def")
+        pipeline_mock.delete.assert_called_with("test_xyz")
+        self.assertEqual(1, pipeline_mock.execute.call_count)
+
+    def test_delete_refresh_token_not_found(self):
+        pipeline_mock = Mock(spec=["delete", "execute"])
+        pipeline_mock.execute.return_value = [0, 0]
+        redisdb_mock = Mock(spec=["pipeline", "register_script"])
+        redisdb_mock.pipeline.return_value = pipeline_mock
+        redisdb_mock.register_script.return_value = Mock(return_value=None)
 
         store = TokenStore(rs=redisdb_mock)
-        store.delete_refresh_token(refresh_token_id)
 
-        self.assertEqual(1, redisdb_mock.delete.call_count)
+        with self.assertRaises(AccessTokenNotFound):
+            store.delete_refresh_token("def")
+        self.assertEqual(0, redisdb_mock.pipeline.call_count)
+
+        # Deleted by a concurrent call between the read and the transaction.
+        redisdb_mock.register_script.return_value.return_value = self.record
+        with self.assertRaises(AccessTokenNotFound):
+            store.delete_refresh_token("def")
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_save_token(self):
+        access_token = AccessToken(client_id="abc", grant_type="token", token="xyz", refresh_token="def",
+                                   expires_at=1600, refresh_expires_at=4600, user_id=1)
+
+        pipeline_mock = Mock(spec=["set", "execute"])
+        redisdb_mock = Mock(spec=["pipeline", "set"])
+        redisdb_mock.pipeline.return_value = pipeline_mock
+
+        store = TokenStore(rs=redisdb_mock, prefix="test")
+        store.save_token(access_token)
+
+        redisdb_mock.pipeline.assert_called_once_with(transaction=True)
+        pipeline_mock.set.assert_any_call("test_xyz", json.dumps(access_token.__dict__), ex=600)
+        pipeline_mock.set.assert_any_call("test_abc_token_1", "xyz", ex=600)
+        pipeline_mock.set.assert_any_call("test_def", json.dumps(access_token.__dict__), ex=3600)
+        self.assertEqual(3, pipeline_mock.set.call_count)
+        self.assertEqual(1, pipeline_mock.execute.call_count)
+        self.assertEqual(0, redisdb_mock.set.call_count)
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_save_token_without_expiration(self):
+        access_token = AccessToken(client_id="abc", grant_type="token", token="xyz", refresh_token="def",
+                                   expires_at=1600, user_id=1)
+
+        pipeline_mock = Mock(spec=["set", "execute"])
+        redisdb_mock = Mock(spec=["pipeline"])
+        redisdb_mock.pipeline.return_value = pipeline_mock
+
+        store = TokenStore(rs=redisdb_mock, prefix="test")
+        store.save_token(access_token)
+
+        pipeline_mock.set.assert_any_call("test_xyz", json.dumps(access_token.__dict__), ex=600)
+        pipeline_mock.set.assert_any_call("test_abc_token_1", "xyz", ex=600)
+        pipeline_mock.set.assert_any_call("test_def", json.dumps(access_token.__dict__))
+
+    def test_fetch_by_refresh_token(self):
+        script_mock = Mock(return_value=self.record)
+        redisdb_mock = Mock(spec=["register_script"])
+        redisdb_mock.register_script.return_value = script_mock
+
+        store = TokenStore(rs=redisdb_mock, prefix="test")
+        result = store.fetch_by_refresh_token("def")
+
+        redisdb_mock.register_script.assert_called_once_with(READ_SCRIPT)
+        script_mock.assert_called_with(keys=["test_def"], args=[])
+        self.assertEqual(result.token, "xyz")
+
+        script_mock.return_value = None
+        with self.assertRaises(AccessTokenNotFound):
+            store.fetch_by_refresh_token("def")
+
+    def test_fetch_existing_token_of_user(self):
+        script_mock = Mock(return_value=self.record)
+        redisdb_mock = Mock(spec=["register_script", "get"])
+        redisdb_mock.register_script.return_value = script_mock
+        redisdb_mock.get.return_value = b"xyz"
+
+        store = TokenStore(rs=redisdb_mock, prefix="test")
+
+        self.assertEqual(store.fetch_existing_token_of_user("abc", "token", 1).token, "xyz")
+        redisdb_mock.get.assert_called_with("test_abc_token_1")
+        script_mock.assert_called_once_with(keys=["test_xyz"], args=[])
+
+        # The access token expired after the pointer was read.
+        script_mock.return_value = None
+        with self.assertRaises(AccessTokenNotFound):
+            store.fetch_existing_token_of_user("abc", "token", 1)
+
+        redisdb_mock.get.return_value = None
+        with self.assertRaises(AccessTokenNotFound):
+            store.fetch_existing_token_of_user("abc", "token", 1)
+
+    def test_fetch_existing_token_of_user_previous_layout(self):
+        redisdb_mock = Mock(spec=["register_script", "get"])
+        redisdb_mock.get.return_value = self.record
+
+        store = TokenStore(rs=redisdb_mock, prefix="test")
+
+        self.assertEqual(store.fetch_existing_token_of_user("abc", "token", 1).token, "xyz")
+        self.assertEqual(0, redisdb_mock.register_script.call_count)
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_migrate_layout(self):
+        other_token = AccessToken(client_id="abc", grant_type="token", token="uvw", refresh_token="rst",
+                                  expires_at=1600, user_id=2)
+        other_record = json.dumps(other_token.__dict__).encode("utf-8")
+        values = {b"test_xyz": self.record, b"test_abc_token_1": self.record, b"test_def": self.record,
+                  b"test_uvw": other_record, b"test_abc_token_2": other_record, b"test_rst": other_record,
+                  b"test_pointer": b"xyz", b"test_client": json.dumps({"identifier": "client"}).encode("utf-8")}
+
+        pipeline_mock = Mock(spec=["set", "expire", "persist", "execute"])
+        redisdb_mock = Mock(spec=["scan_iter", "mget", "pipeline"])
+        redisdb_mock.scan_iter.return_value = iter(list(values))
+        redisdb_mock.mget.side_effect = lambda keys: [values[key] for key in keys]
+        redisdb_mock.pipeline.return_value = pipeline_mock
+
+        store = TokenStore(rs=redisdb_mock, prefix="test")
+
+        self.assertEqual(store.migrate_layout(batch_size=3), 2)
+        redisdb_mock.scan_iter.assert_called_with(match="test_*", count=3)
+        pipeline_mock.set.assert_any_call("test_abc_token_1", "xyz", ex=600)
+        pipeline_mock.set.assert_any_call("test_abc_token_2", "uvw", ex=600)
+        self.assertEqual(2, pipeline_mock.set.call_count)
+        pipeline_mock.expire.assert_called_once_with(b"test_def", 3600)
+        pipeline_mock.persist.assert_called_once_with(b"test_rst")
+        self.assertEqual(3, pipeline_mock.execute.call_count)
+
+    def test_save_tokens(self):
+        access_tokens = [AccessToken(client_id="abc", grant_type="token", token="xyz", refresh_token="def"),
+                         AccessToken(client_id="abc", grant_type="token", token="uvw")]
+
+        pipeline_mock = Mock(spec=["set", "execute"])
+        redisdb_mock = Mock(spec=["pipeline", "set"])
+        redisdb_mock.pipeline.return_value = pipeline_mock
+
+        store = TokenStore(rs=redisdb_mock)
+        store.save_tokens(access_tokens)
+
+        redisdb_mock.pipeline.assert_called_once_with(transaction=True)
+        self.assertEqual(5, pipeline_mock.set.call_count)
+        self.assertEqual(1, pipeline_mock.execute.call_count)
+        self.assertEqual(0, redisdb_mock.set.call_count)
+
+
+class ClusterTokenStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.access_token = AccessToken(client_id="abc", grant_type="token", token="xyz", refresh_token="def",
+                                        expires_at=1600, refresh_expires_at=4600, user_id=1)
+        self.pipelines = []
+
+        def pipeline(transaction=None):
+            pipeline_mock = Mock(spec=["set", "delete", "execute"])
+            pipeline_mock.execute.return_value = [1, 1]
+            pipeline_mock.transaction = transaction
+            self.pipelines.append(pipeline_mock)
+            return pipeline_mock
+
+        self.redisdb_mock = Mock(spec=["pipeline", "register_script", "get"])
+        self.redisdb_mock.pipeline.side_effect = pipeline
+        self.store = TokenStore(rs=self.redisdb_mock, prefix="test", cluster=True)
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_save_token(self):
+        self.store.save_token(self.access_token)
+
+        record, unique = self.pipelines
+
+        self.assertTrue(record.transaction)
+        record.set.assert_any_call("test_{def}_xyz", json.dumps(self.access_token.__dict__), ex=600)
+        record.set.assert_any_call("test_{def}", json.dumps(self.access_token.__dict__), ex=3600)
+        self.assertEqual(2, record.set.call_count)
+
+        self.assertFalse(unique.transaction)
+        unique.set.assert_called_once_with("test_abc_token_1", "{def}_xyz", ex=600)
+        self.assertEqual(1, record.execute.call_count)
+        self.assertEqual(1, unique.execute.call_count)
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_save_tokens(self):
+        access_token = AccessToken(client_id="abc", grant_type="token", token="uvw", expires_at=1600, user_id=2)
+
+        self.store.save_tokens([self.access_token, access_token])
+
+        pipe, = self.pipelines
+
+        self.assertFalse(pipe.transaction)
+        pipe.set.assert_any_call("test_{uvw}", json.dumps(access_token.__dict__), ex=600)
+        pipe.set.assert_any_call("test_abc_token_2", "{uvw}", ex=600)
+        self.assertEqual(5, pipe.set.call_count)
+        self.assertEqual(1, pipe.execute.call_count)
+
+    def test_delete_refresh_token(self):
+        script_mock = Mock(return_value=json.dumps(self.access_token.__dict__).encode("utf-8"))
+        self.redisdb_mock.register_script.return_value = script_mock
+
+        self.store.delete_refresh_token("def")
+
+        pipe, = self.pipelines
+
+        script_mock.assert_called_with(keys=["test_{def}"], args=[])
+        self.assertTrue(pipe.transaction)
+        pipe.delete.assert_any_call("test_{def}")
+        pipe.delete.assert_called_with("test_{def}_xyz")
+
+    def test_fetch_existing_token_of_user(self):
+        script_mock = Mock(return_value=json.dumps(self.access_token.__dict__).encode("utf-8"))
+        self.redisdb_mock.register_script.return_value = script_mock
+        self.redisdb_mock.get.return_value = b"{def}_xyz"
+
+        access_token = self.store.fetch_existing_token_of_user("abc", "token", 1)
+
+        self.redisdb_mock.get.assert_called_with("test_abc_token_1")
+        self.redisdb_mock.register_script.assert_called_with(READ_SCRIPT)
+        script_mock.assert_called_with(keys=["test_{def}_xyz"], args=[])
+        self.assertEqual(access_token.token, "xyz")
+
+        self.redisdb_mock.get.return_value = None
+        with self.assertRaises(AccessTokenNotFound):
+            self.store.fetch_existing_token_of_user("abc", "token", 1)
+
+    def test_migrate_layout(self):
+        with self.assertRaises(ValueError):
+            self.store.migrate_layout()
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_key_names(self):
+        access_token = AccessToken(client_id="abc", grant_type="token", token="uvw", expires_at=1600, user_id=2)
+        script_mock = Mock(return_value=None)
+        self.redisdb_mock.register_script.return_value = script_mock
+
+        self.store.save_token(self.access_token)
+        self.store.save_token(access_token)
+        TokenStore(rs=self.redisdb_mock, prefix="test").save_token(self.access_token)
+
+        names = [[call[0][0] for call in pipe.set.call_args_list] for pipe in self.pipelines]
+        self.assertEqual(names, [["test_{def}_xyz", "test_{def}"], ["test_abc_token_1"],
+                                 ["test_{uvw}"], ["test_abc_token_2"],
+                                 ["test_xyz", "test_def", "test_abc_token_1"]])
+
+        with self.assertRaises(AccessTokenNotFound):
+            self.store.fetch_by_refresh_token("def")
+        script_mock.assert_called_with(keys=["test_{def}"], args=[])
+
+
+class AsyncTokenStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.access_token = AccessToken(client_id="abc", grant_type="token", token="xyz", refresh_token="def",
+                                        expires_at=1600, refresh_expires_at=4600, user_id=1)
+        self.pipelines = []
+        self.script_mock = AsyncMock()
+
+        def pipeline(transaction=None):
+            pipeline_mock = Mock(spec=["set", "delete", "hset", "expire", "persist", "execute"])
+            pipeline_mock.execute = AsyncMock(return_value=[1, 1])
+            pipeline_mock.transaction = transaction
+            self.pipelines.append(pipeline_mock)
+            return pipeline_mock
+
+        self.redisdb_mock = Mock(spec=["pipeline", "register_script", "get", "delete", "aclose", "scan_iter", "mget"])
+        self.redisdb_mock.pipeline.side_effect = pipeline
+        self.redisdb_mock.register_script.return_value = self.script_mock
+        self.redisdb_mock.get = AsyncMock()
+        self.redisdb_mock.delete = AsyncMock()
+        self.redisdb_mock.aclose = AsyncMock()
+        self.store = AsyncTokenStore(rs=self.redisdb_mock, prefix="test")
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_save_token(self):
+        asyncio.run(self.store.save_token(self.access_token))
+
+        pipe, = self.pipelines
+
+        self.assertTrue(pipe.transaction)
+        pipe.set.assert_any_call("test_xyz", json.dumps(self.access_token.__dict__), ex=600)
+        pipe.set.assert_any_call("test_abc_token_1", "xyz", ex=600)
+        pipe.set.assert_any_call("test_def", json.dumps(self.access_token.__dict__), ex=3600)
+        pipe.execute.assert_awaited_once_with()
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_save_token_cluster(self):
+        store = AsyncTokenStore(rs=self.redisdb_mock, prefix="test", cluster=True)
+
+        asyncio.run(store.save_token(self.access_token))
+
+        record, unique = self.pipelines
+
+        self.assertTrue(record.transaction)
+        self.assertEqual(2, record.set.call_count)
+        self.assertFalse(unique.transaction)
+        unique.set.assert_called_once_with("test_abc_token_1", "{def}_xyz", ex=600)
+        record.execute.assert_awaited_once_with()
+        unique.execute.assert_awaited_once_with()
+
+    def test_save_tokens(self):
+        access_token = AccessToken(client_id="abc", grant_type="token", token="uvw")
+
+        asyncio.run(self.store.save_tokens([self.access_token, access_token]))
+
+        pipe, = self.pipelines
+
+        self.assertTrue(pipe.transaction)
+        self.assertEqual(5, pipe.set.call_count)
+        pipe.execute.assert_awaited_once_with()
+
+    def test_delete_refresh_token(self):
+        self.script_mock.return_value = json.dumps(self.access_token.__dict__).encode("utf-8")
+
+        asyncio.run(self.store.delete_refresh_token("def"))
+
+        pipe, = self.pipelines
+
+        self.redisdb_mock.register_script.assert_called_once_with(READ_SCRIPT)
+        self.script_mock.assert_awaited_with(keys=["test_def"], args=[])
+        self.assertTrue(pipe.transaction)
+        pipe.delete.assert_any_call("test_def")
+        pipe.delete.assert_called_with("test_xyz")
+        pipe.execute.assert_awaited_once_with()
+
+        self.script_mock.return_value = None
+        with self.assertRaises(AccessTokenNotFound):
+            asyncio.run(self.store.delete_refresh_token("def"))
+
+    def test_fetch_by_refresh_token(self):
+        self.script_mock.return_value = json.dumps(self.access_token.__dict__).encode("utf-8")
+
+        access_token = asyncio.run(self.store.fetch_by_refresh_token("def"))
+
+        self.redisdb_mock.register_script.assert_called_once_with(READ_SCRIPT)
+        self.script_mock.assert_awaited_with(keys=["test_def"], args=[])
+        self.assertEqual(access_token.token, "xyz")
+
+        self.script_mock.return_value = None
+        with self.assertRaises(AccessTokenNotFound):
+            asyncio.run(self.store.fetch_by_refresh_token("def"))
+
+    def test_fetch_existing_token_of_user_previous_layout(self):
+        self.redisdb_mock.get.return_value = json.dumps(self.access_token.__dict__).encode("utf-8")
+
+        access_token = asyncio.run(self.store.fetch_existing_token_of_user("abc", "token", 1))
+
+        self.redisdb_mock.get.assert_awaited_with("test_abc_token_1")
+        self.assertEqual(access_token.token, "xyz")
+        self.script_mock.assert_not_awaited()
+
+    def test_fetch_existing_token_of_user_cluster(self):
+        store = AsyncTokenStore(rs=self.redisdb_mock, prefix="test", cluster=True)
+        self.script_mock.return_value = json.dumps(self.access_token.__dict__).encode("utf-8")
+        self.redisdb_mock.get.return_value = b"{def}_xyz"
+
+        access_token = asyncio.run(store.fetch_existing_token_of_user("abc", "token", 1))
+
+        self.redisdb_mock.get.assert_awaited_with("test_abc_token_1")
+        self.script_mock.assert_awaited_with(keys=["test_{def}_xyz"], args=[])
+        self.assertEqual(access_token.token, "xyz")
+
+        self.redisdb_mock.get.return_value = None
+        with self.assertRaises(AccessTokenNotFound):
+            asyncio.run(store.fetch_existing_token_of_user("abc", "token", 1))
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_save_fetch_delete_code(self):
+        auth_code = AuthorizationCode(client_id="abc", code="ghi", expires_at=1600, redirect_uri="http://callback",
+                                      scopes=["read"], data={}, user_id=1)
+
+        asyncio.run(self.store.save_code(auth_code))
+
+        pipe, = self.pipelines
+        self.assertTrue(pipe.transaction)
+        pipe.set.assert_called_once_with("test_ghi", json.dumps({"client_id": "abc", "code": "ghi",
+                                                                 "expires_at": 1600,
+                                                                 "redirect_uri": "http://callback",
+                                                                 "scopes": ["read"], "data": {}, "user_id": 1}),
+                                         ex=600)
+        pipe.execute.assert_awaited_once_with()
+
+        self.script_mock.return_value = pipe.set.call_args[0][1].encode("utf-8")
+        self.assertEqual(asyncio.run(self.store.fetch_by_code("ghi")).code, "ghi")
+        self.redisdb_mock.register_script.assert_called_once_with(READ_SCRIPT)
+
+        self.script_mock.return_value = None
+        with self.assertRaises(AuthCodeNotFound):
+            asyncio.run(self.store.fetch_by_code("ghi"))
+
+        asyncio.run(self.store.delete_code("ghi"))
+        self.redisdb_mock.delete.assert_awaited_once_with("test_ghi")
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_migrate_layout(self):
+        record = json.dumps(self.access_token.__dict__).encode("utf-8")
+        values = {b"test_xyz": record, b"test_abc_token_1": record, b"test_def": record, b"test_pointer": b"xyz"}
+
+        async def scan_iter(match, count):
+            for key in values:
+                yield key
+
+        self.redisdb_mock.scan_iter = Mock(side_effect=scan_iter)
+        self.redisdb_mock.mget = AsyncMock(side_effect=lambda keys: [values[key] for key in keys])
+
+        self.assertEqual(asyncio.run(self.store.migrate_layout(batch_size=3)), 1)
+
+        self.redisdb_mock.scan_iter.assert_called_with(match="test_*", count=3)
+        self.assertEqual(2, len(self.pipelines))
+        first, second = self.pipelines
+        first.set.assert_called_once_with("test_abc_token_1", "xyz", ex=600)
+        first.expire.assert_called_once_with(b"test_def", 3600)
+        self.assertEqual(0, second.set.call_count)
+        first.execute.assert_awaited_once_with()
+        second.execute.assert_awaited_once_with()
+
+    def test_close(self):
+        asyncio.run(self.store.close())
+
+        self.redisdb_mock.aclose.assert_awaited_once_with()
+
+    def test_create_client(self):
+        store = AsyncTokenStore(host="127.0.0.1", port=6379, max_connections=10)
+
+        self.assertFalse(store.cluster)
+        self.assertEqual(store.rs.connection_pool.max_connections, 10)
+
+
+class AsyncClientStoreTestCase(unittest.TestCase):
+    def test_add_fetch_client(self):
+        pipeline_mock = Mock(spec=["set", "execute"])
+        pipeline_mock.execute = AsyncMock()
+        script_mock = AsyncMock(return_value=None)
+        redisdb_mock = Mock(spec=["pipeline", "register_script"])
+        redisdb_mock.pipeline.return_value = pipeline_mock
+        redisdb_mock.register_script.return_value = script_mock
+
+        store = AsyncClientStore(rs=redisdb_mock, prefix="test")
+
+        self.assertTrue(asyncio.run(store.add_client("abc", "secret", ["http://callback"])))
+        pipeline_mock.execute.assert_awaited_once_with()
+
+        with self.assertRaises(ClientNotFoundError):
+            asyncio.run(store.fetch_by_client_id("abc"))
+
+        script_mock.return_value = pipeline_mock.set.call_args[0][1].encode("utf-8")
+        client = asyncio.run(store.fetch_by_client_id("abc"))
+
+        script_mock.assert_awaited_with(keys=["test_abc"], args=[])
+        self.assertEqual(client.identifier, "abc")
+        self.assertEqual(client.redirect_uris, ["http://callback"])
+
+
+class CodecTestCase(unittest.TestCase):
+    data = {"client_id": "abc", "scopes": ["read", "write"], "data": {"name": "John" * 50}, "expires_at": None,
+            "user_id": 1}
+
+    def test_json_codec(self):
+        payload = JsonCodec().encode(self.data)
+
+        self.assertEqual(payload, json.dumps(self.data))
+        self.assertEqual(decode_value(payload.encode("utf-8")), self.data)
+
+    def test_json_codec_compress(self):
+        codec = JsonCodec(compress_threshold=100)
+
+        compressed = codec.encode(self.data)
+
+        self.assertTrue(compressed.startswith(ZLIB_MARKER))
+        self.assertLess(len(compressed), len(json.dumps(self.data)))
+        self.assertEqual(decode_value(compressed), self.data)
+        self.assertEqual(codec.encode({"user_id": 1}), json.dumps({"user_id": 1}))
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_codec(self):
+        payload = MsgpackCodec().encode(self.data)
+
+        self.assertLess(len(payload), len(json.dumps(self.data)))
+        self.assertEqual(decode_value(payload), self.data)
+        self.assertEqual(decode_value(MsgpackCodec(compress_threshold=100).encode(self.data)), self.data)
+
+    def test_hash_codec(self):
+        fields = HashCodec(compress_threshold=100).encode(self.data)
+
+        self.assertEqual(fields["client_id"], '"abc"')
+        self.assertEqual(fields["user_id"], "1")
+        self.assertTrue(fields["data"].startswith(ZLIB_MARKER))
+
+        flat = []
+        for name, value in fields.items():
+            flat.extend([name.encode("utf-8"), value if isinstance(value, bytes) else value.encode("utf-8")])
+
+        self.assertEqual(decode_hash(flat), self.data)
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_write_hash(self):
+        pipeline_mock = Mock(spec=["delete", "hset", "expire", "execute"])
+        redisdb_mock = Mock(spec=["pipeline"])
+        redisdb_mock.pipeline.return_value = pipeline_mock
+
+        store = TokenStore(rs=redisdb_mock, prefix="test", codec=HashCodec())
+        store.write("abc", {"code": "abc", "expires_at": 1600})
+
+        redisdb_mock.pipeline.assert_called_once_with(transaction=True)
+        pipeline_mock.delete.assert_called_with("test_abc")
+        pipeline_mock.hset.assert_called_with("test_abc", mapping={"code": '"abc"', "expires_at": "1600"})
+        pipeline_mock.expire.assert_called_with("test_abc", 600)
+        self.assertEqual(1, pipeline_mock.execute.call_count)
+
+    def test_read_any_codec(self):
+        script_mock = Mock()
+        redisdb_mock = Mock(spec=["register_script"])
+        redisdb_mock.register_script.return_value = script_mock
+        store = ClientStore(rs=redisdb_mock, prefix="test", codec=HashCodec())
+
+        script_mock.return_value = json.dumps({"identifier": "abc"}).encode("utf-8")
+        self.assertEqual(store.read("abc"), {"identifier": "abc"})
+
+        script_mock.return_value = [b"identifier", b'"abc"']
+        self.assertEqual(store.read("abc"), {"identifier": "abc"})
+
+        script_mock.return_value = None
+        self.assertIsNone(store.read("abc"))
+
+        redisdb_mock.register_script.assert_called_once_with(READ_SCRIPT)
+        script_mock.assert_called_with(keys=["test_abc"], args=[])
+
+
+class ReplayCacheTestCase(unittest.TestCase):
+    @patch("time.time", Mock(return_value=1000))
+    def test_add(self):
+        redisdb_mock = Mock(spec=["set"])
+        redisdb_mock.set.side_effect = [True, None]
+
+        cache = ReplayCache(rs=redisdb_mock, prefix="test")
+
+        self.assertTrue(cache.add("abc", 1600))
+        self.assertFalse(cache.add("abc", 1600))
+        redisdb_mock.set.assert_called_with("test_replay_abc", 1, nx=True, ex=600)
+
+
+class PubSubChannelTestCase(unittest.TestCase):
+    @patch("time.time", Mock(return_value=1000))
+    def test_publish(self):
+        pipeline_mock = Mock(spec=["zadd", "zremrangebyscore", "publish", "execute"])
+        redisdb_mock = Mock(spec=["pipeline"])
+        redisdb_mock.pipeline.return_value = pipeline_mock
+
+        channel = PubSubChannel(rs=redisdb_mock, prefix="test")
+        channel.publish("abc", 1600)
+        channel.publish("def", 0)
+
+        pipeline_mock.zadd.assert_any_call("test_revocations", {"abc": 1600})
+        pipeline_mock.zadd.assert_called_with("test_revocations", {"def": "+inf"})
+        pipeline_mock.zremrangebyscore.assert_called_with("test_revocations", 0, 999)
+        pipeline_mock.publish.assert_called_with("test_revocations", json.dumps(["def", 0]))
+        self.assertEqual(2, pipeline_mock.execute.call_count)
+
+    @patch("time.time", Mock(return_value=1000))
+    def test_subscribe(self):
+        pubsub_mock = Mock(spec=["subscribe", "run_in_thread"])
+        redisdb_mock = Mock(spec=["pubsub", "zrangebyscore"])
+        redisdb_mock.pubsub.return_value = pubsub_mock
+        redisdb_mock.zrangebyscore.return_value = [(b"abc", 1600.0), (b"def", float("inf"))]
+        callback = Mock()
+
+        channel = PubSubChannel(rs=redisdb_mock, prefix="test")
+        channel.subscribe(callback)
+
+        redisdb_mock.zrangebyscore.assert_called_with("test_revocations", 1000, "+inf", withscores=True)
+        callback.assert_any_call("abc", 1600)
+        callback.assert_called_with("def", 0)
+        self.assertEqual(channel.thread, pubsub_mock.run_in_thread.return_value)
+
+        receive = pubsub_mock.subscribe.call_args[1]["test_revocations"]
+        receive({"type": "message", "data": json.dumps(["ghi", 1700]).encode("utf-8")})
+        callback.assert_called_with("ghi", 1700)
@@ -0,0 +1,313 @@
+import time
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+
+from mock import Mock, patch
+
+from oauth2 import Provider
+from oauth2.compatibility import json, urlencode
+from oauth2.datatype import AuthorizationCode
+from oauth2.error import AccessTokenNotFound, AuthCodeNotFound
+from oauth2.grant import AuthorizationCodeGrant, RefreshToken, ResourceOwnerGrant
+from oauth2.store import AuthCodeStore
+from oauth2.store.memory import ClientStore
+from oauth2.store.stateless import InProcessChannel, ReplayCache, RevocationList, TokenStore
+from oauth2.test import unittest
+from oauth2.tokengenerator import StatelessTokenGenerator
+from oauth2.web import AuthorizationCodeGrantSiteAdapter, ResourceOwnerGrantSiteAdapter
+from oauth2.web.wsgi import Request
+
+
+class StatelessTokenStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.token_generator = StatelessTokenGenerator(secret_key="xxx")
+        self.token_generator.refresh_expires_in = 3600
+        self.store = TokenStore(self.token_generator)
+
+    def test_init_requires_stateless_token_generator(self):
+        with self.assertRaises(AccessTokenNotFound):
+            TokenStore(Mock())
+
+    @patch("time.time", Mock(return_value=1500000000))
+    def test_fetch_by_refresh_token(self):
+        refresh_token = self.token_generator.refresh_generate(grant_type="password", data={"name": "John"},
+                                                              scopes=["read"], user_id=123, client_id="abc")
+
+        access_token = self.store.fetch_by_refresh_token(refresh_token)
+
+        self.assertEqual(access_token.client_id, "abc")
+        self.assertEqual(access_token.grant_type, "password")
+        self.assertEqual(access_token.data, {"name": "John"})
+        self.assertEqual(access_token.scopes, ["read"])
+        self.assertEqual(access_token.user_id, 123)
+        self.assertEqual(access_token.refresh_token, refresh_token)
+        self.assertEqual(access_token.refresh_expires_at, 1500003600)
+
+    def test_fetch_by_refresh_token_never_expires(self):
+        self.token_generator.refresh_expires_in = 0
+        refresh_token = self.token_generator.refresh_generate(grant_type="password", client_id="abc")
+
+        self.assertEqual(self.store.fetch_by_refresh_token(refresh_token).refresh_expires_at, 0)
+
+    def test_fetch_by_refresh_token_invalid(self):
+        access_token = self.token_generator.generate(grant_type="password", client_id="abc")
+        other_token = StatelessTokenGenerator(secret_key="yyy").refresh_generate(grant_type="password")
+
+        for invalid in [access_token, other_token, "invalid"]:
+            with self.assertRaises(AccessTokenNotFound):
+                self.store.fetch_by_refresh_token(invalid)
+
+
+    @patch("time.time", Mock(return_value=1500000000))
+    def test_save_and_fetch_code(self):
+        auth_code = AuthorizationCode(client_id="abc", code="random", expires_at=1500000600,
+                                      redirect_uri="http://callback", scopes=["read"],
+                                      data={"name": "John"}, user_id=123)
+
+        self.store.save_code(auth_code)
+        code = auth_code.code
+
+        self.assertNotEqual(code, "random")
+
+        result = self.store.fetch_by_code(code)
+
+        self.assertEqual(result.client_id, "abc")
+        self.assertEqual(result.code, code)
+        self.assertEqual(result.expires_at, 1500000600)
+        self.assertEqual(result.redirect_uri, "http://callback")
+        self.assertEqual(result.scopes, ["read"])
+        self.assertEqual(result.data, {"name": "John"})
+        self.assertEqual(result.user_id, 123)
+
+        self.assertEqual(self.store.fetch_by_code(code).code, code)
+
+        self.store.delete_code(code)
+        with self.assertRaises(AuthCodeNotFound):
+            self.store.delete_code(code)
+
+    def test_fetch_by_code_invalid(self):
+        auth_code = AuthorizationCode(client_id="abc", code="random", expires_at=int(time.time()) + 600,
+                                      redirect_uri="http://callback", scopes=[])
+        self.store.save_code(auth_code)
+        refresh_token = self.token_generator.refresh_generate(grant_type="authorization_code", client_id="abc")
+
+        for invalid in [auth_code.code[:-1], refresh_token, "invalid"]:
+            with self.assertRaises(AuthCodeNotFound):
+                self.store.fetch_by_code(invalid)
+            with self.assertRaises(AuthCodeNotFound):
+                self.store.delete_code(invalid)
+
+
+class ReplayCacheTestCase(unittest.TestCase):
+    def test_add(self):
+        cache = ReplayCache()
+
+        with patch("time.time", Mock(return_value=1000)):
+            self.assertTrue(cache.add("a", 1100))
+            self.assertFalse(cache.add("a", 1100))
+            self.assertTrue(cache.add("b", 1100))
+
+        with patch("time.time", Mock(return_value=1101)):
+            self.assertTrue(cache.add("a", 1200))
+            self.assertFalse(cache.add("a", 1200))
+
+    def test_purge_expired(self):
+        cache = ReplayCache()
+
+        with patch("time.time", Mock(return_value=1000)):
+            for key in range(100):
+                cache.add(str(key), 1010)
+
+        with patch("time.time", Mock(return_value=1000 + cache.purge_interval)):
+            cache.add("a", 2000)
+
+        self.assertEqual(list(cache._expires_at), ["a"])
+
+
+class RevocationListTestCase(unittest.TestCase):
+    def setUp(self):
+        channel = InProcessChannel()
+        self.revocation_lists = [RevocationList(channel=channel), RevocationList(channel=channel)]
+        self.generators = [StatelessTokenGenerator(secret_key="xxx", revocation_list=revocation_list)
+                           for revocation_list in self.revocation_lists]
+        for generator in self.generators:
+            generator.expires_in = {"password": 600}
+            generator.refresh_expires_in = 0
+
+    def test_revoke_on_all_nodes(self):
+        access_token = self.generators[0].generate(grant_type="password", user_id=1)
+        other_token = self.generators[0].generate(grant_type="password", user_id=2)
+
+        self.generators[0].revoke(access_token)
+
+        for generator in self.generators:
+            with self.assertRaises(AccessTokenNotFound):
+                generator.validate_token(access_token, "access_token")
+            self.assertEqual(generator.validate_token(other_token, "access_token")["user_id"], 2)
+            self.assertEqual(generator.validate_many([access_token], "access_token")[0][0], None)
+
+        with self.assertRaises(AccessTokenNotFound):
+            self.generators[1].revoke(access_token)
+
+    def test_revoked_token_expires(self):
+        with patch("time.time", Mock(return_value=1500000000)):
+            access_token = self.generators[0].generate(grant_type="password")
+            refresh_token = self.generators[0].refresh_generate(grant_type="password")
+            self.generators[0].revoke(access_token)
+            self.generators[0].revoke(refresh_token)
+
+        token_id = self.generators[0].token_id(access_token)
+        self.assertEqual(self.revocation_lists[1]._expires_at[token_id], 1500000600)
+
+        with patch("time.time", Mock(return_value=1500000601)):
+            self.assertNotIn(token_id, self.revocation_lists[1])
+            self.revocation_lists[1].add("other", 1500001000)
+
+        self.assertEqual(len(self.revocation_lists[1]), 2)
+        self.assertIn(self.generators[0].token_id(refresh_token), self.revocation_lists[1])
+
+    def test_revoke_without_revocation_list(self):
+        generator = StatelessTokenGenerator(secret_key="xxx")
+
+        with self.assertRaises(ValueError):
+            generator.revoke(generator.generate())
+
+
+class StatelessAuthorizationCodeTestCase(unittest.TestCase):
+    def setUp(self):
+        site_adapter = Mock(spec=AuthorizationCodeGrantSiteAdapter)
+        site_adapter.authenticate.return_value = ({"name": "John"}, 123)
+        site_adapter.user_has_denied_access.return_value = False
+
+        client_store = ClientStore()
+        client_store.add_client(client_id="abc", client_secret="secret",
+                                redirect_uris=["http://callback", "http://other"])
+        client_store.add_client(client_id="def", client_secret="secret", redirect_uris=["http://callback"])
+
+        token_generator = StatelessTokenGenerator(secret_key="xxx")
+        token_store = TokenStore(token_generator)
+
+        self.provider = Provider(access_token_store=token_store,
+                                 auth_code_store=token_store,
+                                 client_store=client_store,
+                                 token_generator=token_generator)
+        self.provider.add_grant(AuthorizationCodeGrant(site_adapter=site_adapter, expires_in=600))
+
+    def authorize(self):
+        request = Request({"REQUEST_METHOD": "GET", "PATH_INFO": "/authorize",
+                           "QUERY_STRING": "response_type=code&client_id=abc&redirect_uri=http%3A%2F%2Fcallback"})
+        response = self.provider.dispatch(request, {})
+
+        self.assertEqual(response.status_code, 302)
+        return parse_qs(urlparse(response.headers["Location"]).query)["code"][0]
+
+    def redeem(self, code, client_id="abc", redirect_uri="http://callback"):
+        params = urlencode(dict(grant_type="authorization_code", client_id=client_id, client_secret="secret",
+                                code=code, redirect_uri=redirect_uri)).encode("utf-8")
+        request = Request({"REQUEST_METHOD": "POST", "QUERY_STRING": "", "PATH_INFO": "/token",
+                           "CONTENT_TYPE": "application/x-www-form-urlencoded",
+                           "CONTENT_LENGTH": str(len(params)), "wsgi.input": BytesIO(params)})
+        response = self.provider.dispatch(request, {})
+        return response.status_code, json.loads(response.body)
+
+    def test_code_is_single_use(self):
+        code = self.authorize()
+
+        results = [self.redeem(code) for _ in range(2)]
+
+        self.assertEqual(results[0][0], 200)
+        payload = self.provider.token_generator.validate_token(results[0][1]["access_token"], "access_token")
+        self.assertEqual(payload["user_id"], 123)
+        self.assertEqual(payload["data"], {"name": "John"})
+        self.assertEqual(results[1][0], 400)
+        self.assertEqual(results[1][1]["error_description"], "Invalid authorization code parameter")
+
+    def test_code_of_other_client(self):
+        code = self.authorize()
+
+        status_code, body = self.redeem(code, client_id="def")
+
+        self.assertEqual(status_code, 400)
+        self.assertEqual(body["error"], "invalid_grant")
+        self.assertEqual(self.redeem(code)[0], 200)
+
+    def test_rejected_request_does_not_use_up_code(self):
+        code = self.authorize()
+
+        self.assertEqual(self.redeem(code, redirect_uri="http://other")[0], 400)
+        self.assertEqual(self.redeem(code)[0], 200)
+
+
+class StatelessRefreshTokenTestCase(unittest.TestCase):
+    def setUp(self):
+        site_adapter = Mock(spec=ResourceOwnerGrantSiteAdapter)
+        site_adapter.authenticate.return_value = ({"name": "John"}, 123)
+
+        client_store = ClientStore()
+        client_store.add_client(client_id="abc", client_secret="secret", redirect_uris=[])
+        client_store.add_client(client_id="other", client_secret="secret", redirect_uris=[])
+
+        token_generator = StatelessTokenGenerator(secret_key="xxx", revocation_list=RevocationList())
+        self.provider = Provider(access_token_store=TokenStore(token_generator),
+                                 auth_code_store=Mock(spec=AuthCodeStore),
+                                 client_store=client_store,
+                                 token_generator=token_generator)
+        self.provider.add_grant(ResourceOwnerGrant(site_adapter=site_adapter, expires_in=600,
+                                                   scopes=["read", "write"]))
+        self.provider.add_grant(RefreshToken(expires_in=3600, scopes=["read", "write"], reissue_refresh_tokens=True))
+
+    def _token_request(self, **params):
+        body = urlencode(params).encode("utf-8")
+        request = Request({"REQUEST_METHOD": "POST", "QUERY_STRING": "", "PATH_INFO": "/token",
+                           "CONTENT_TYPE": "application/x-www-form-urlencoded",
+                           "CONTENT_LENGTH": str(len(body)), "wsgi.input": BytesIO(body)})
+        response = self.provider.dispatch(request, {})
+        return response.status_code, json.loads(response.body)
+
+    def _refresh_token(self):
+        _, body = self._token_request(grant_type="password", client_id="abc", client_secret="secret",
+                                      username="john", password="pass", scope="read")
+        return body["refresh_token"]
+
+    def test_refresh(self):
+        refresh_token = self._refresh_token()
+
+        # A refresh token issued in the same second would be identical to the old one.
+        with patch("time.time", Mock(return_value=time.time() + 10)):
+            status, body = self._token_request(grant_type="refresh_token", client_id="abc",
+                                               client_secret="secret", refresh_token=refresh_token, scope="read")
+
+            self.assertEqual(status, 200)
+            self.assertEqual(body["expires_in"], 600)
+            payload = self.provider.token_generator.validate_token(body["access_token"], "access_token")
+            self.assertEqual(payload["scopes"], ["read"])
+            self.assertEqual(payload["user_id"], 123)
+            self.assertEqual(payload["data"], {"name": "John"})
+            self.assertEqual(payload["client_id"], "abc")
+
+            # The old refresh token has been revoked.
+            for token, expected_status in [(refresh_token, 400), (body["refresh_token"], 200)]:
+                status, _ = self._token_request(grant_type="refresh_token", client_id="abc",
+                                                client_secret="secret", refresh_token=token, scope="read")
+                self.assertEqual(status, expected_status)
+
+    def test_refresh_invalid(self):
+        refresh_token = self._refresh_token()
+
+        for params in [dict(client_id="other", refresh_token=refresh_token),
+                       dict(client_id="abc", refresh_token=refresh_token, scope="read write"),
+                       dict(client_id="abc", refresh_token=refresh_token + "x")]:
+            status, body = self._token_request(grant_type="refresh_token", client_secret="secret", **params)
+
+            self.assertEqual(status, 400)
+            self.assertIn(body["error"], ["invalid_request", "invalid_scope"])
+
+    def test_refresh_expired(self):
+        refresh_token = self._refresh_token()
+
+        with patch("time.time", Mock(return_value=10 ** 10)):
+            status, body = self._token_request(grant_type="refresh_token", client_id="abc",
+                                               client_secret="secret", refresh_token=refresh_token)
+
+        self.assertEqual(status, 400)
+        self.assertEqual(body["error_description"], "Invalid refresh token")
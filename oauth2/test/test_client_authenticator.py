@@ -90,6 +90,29 @@ class ClientAuthenticatorTestCase(unittest.TestCase):
         self.authenticator.by_identifier_secret(request=request_mock)
         self.client_store_mock.fetch_by_client_id.assert_called_with(client_id)
 
+    def test_check_identifier_secret(self):
+        request_mock = Mock(spec=Request)
+        request_mock.post_param.return_value = "authorization_code"
+
+        self.source_mock.return_value = ("abc", "xyz")
+        self.client_store_mock.fetch_by_client_id.return_value = self.client
+
+        self.assertEqual(self.authenticator.check_identifier_secret(request_mock), (self.client, None))
+
+        self.source_mock.return_value = ("abc", "uvw")
+
+        client, error = self.authenticator.check_identifier_secret(request_mock)
+
+        self.assertIsNone(client)
+        self.assertEqual(error.error, "invalid_client")
+
+        self.source_mock.side_effect = OAuthInvalidError(error="invalid_request")
+
+        client, error = self.authenticator.check_identifier_secret(request_mock)
+
+        self.assertIsNone(client)
+        self.assertEqual(error.error, "invalid_request")
+
     def test_by_identifier_secret_unknown_client(self):
         client_id = "def"
         client_secret = "uvw"
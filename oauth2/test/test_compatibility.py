@@ -0,0 +1,32 @@
+from oauth2 import compatibility
+from oauth2.compatibility import json, json_dumps_bytes, use_json_backend
+from oauth2.test import unittest
+
+
+class JsonBackendTestCase(unittest.TestCase):
+    def setUp(self):
+        self.backend = compatibility.json_backend
+
+    def tearDown(self):
+        use_json_backend(self.backend)
+
+    def test_json_dumps_bytes(self):
+        data = {"access_token": "abc", "expires_in": 600, "scope": u"café"}
+
+        for backend in ["orjson", "ujson", "json"]:
+            try:
+                use_json_backend(backend)
+            except ImportError:
+                continue
+
+            result = json_dumps_bytes(data)
+
+            self.assertIsInstance(result, bytes)
+            self.assertEqual(json.loads(result.decode("utf-8")), data)
+            self.assertEqual(compatibility.json_backend, backend)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            use_json_backend("xml")
+
+        self.assertEqual(compatibility.json_backend, self.backend)
@@ -0,0 +1,77 @@
+import asyncio
+
+from oauth2.coroutines import maybe_await, resolve, run_sync
+from oauth2.test import unittest
+
+
+async def add(a, b):
+    return a + b
+
+
+async def add_later(a, b):
+    await asyncio.sleep(0)
+    return a + b
+
+
+async def sum_values(*values):
+    total = 0
+    for value in values:
+        total += await maybe_await(value)
+    return total
+
+
+class MaybeAwaitTestCase(unittest.TestCase):
+    def test_maybe_await(self):
+        self.assertEqual(run_sync(sum_values(1, add(1, 2))), 4)
+        self.assertEqual(asyncio.run(sum_values(1, add(1, 2), add_later(3, 4))), 11)
+
+
+class RunSyncTestCase(unittest.TestCase):
+    def test_run_sync(self):
+        self.assertEqual(run_sync(add(1, 2)), 3)
+
+    def test_run_sync_suspended(self):
+        with self.assertRaises(RuntimeError):
+            run_sync(add_later(1, 2))
+
+
+class ResolveTestCase(unittest.TestCase):
+    def test_resolve_finished(self):
+        self.assertEqual(resolve(add(1, 2)), 3)
+
+    def test_resolve_suspended(self):
+        result = resolve(add_later(1, 2))
+
+        self.assertEqual(asyncio.run(sum_values(result)), 3)
+
+    def test_resolve_exception(self):
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("failed")
+
+        async def run():
+            return await resolve(fail())
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+
+    def test_resolve_cancelled(self):
+        cancelled = []
+
+        async def wait():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            task = asyncio.ensure_future(sum_values(resolve(wait())))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        self.assertEqual(cancelled, [True])
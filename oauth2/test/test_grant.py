@@ -1,5 +1,6 @@
 from copy import copy
 
+from cryptography.hazmat.primitives.asymmetric import ed25519
 from mock import Mock, call, patch
 from oauth2 import Provider
 from oauth2.client_authenticator import ClientAuthenticator
@@ -14,10 +15,11 @@ from oauth2.grant import (AuthorizationCodeAuthHandler, AuthorizationCodeGrant,
                           ClientCredentialsHandler, ImplicitGrant,
                           ImplicitGrantHandler, RefreshToken,
                           RefreshTokenHandler, ResourceOwnerGrant,
-                          ResourceOwnerGrantHandler, Scope)
+                          ResourceOwnerGrantHandler, Scope, ScopePolicy,
+                          ScopeTable)
 from oauth2.store import AccessTokenStore, AuthCodeStore, ClientStore
 from oauth2.test import unittest
-from oauth2.tokengenerator import TokenGenerator
+from oauth2.tokengenerator import JwtTokenGenerator, TokenGenerator
 from oauth2.web import (AuthorizationCodeGrantSiteAdapter,
                         ImplicitGrantSiteAdapter,
                         ResourceOwnerGrantSiteAdapter, Response)
@@ -103,6 +105,16 @@ class AuthorizationCodeGrantTestCase(unittest.TestCase):
         self.assertEqual(result_class, None)
 
 
+class AuthRequest(AuthRequestMixin):
+    """
+    The mixins only declare empty ``__slots__``, a subclass holds the attributes.
+    """
+
+
+class Authorize(AuthorizeMixin):
+    pass
+
+
 class AuthRequestMixinTestCase(unittest.TestCase):
     def test_read_validate_params_all_valid(self):
         """
@@ -123,9 +135,9 @@ class AuthRequestMixinTestCase(unittest.TestCase):
         client_auth_mock = Mock(spec=ClientAuthenticator)
         client_auth_mock.by_identifier.return_value = client
 
-        handler = AuthRequestMixin(client_authenticator=client_auth_mock,
-                                   scope_handler=scope_handler_mock,
-                                   token_generator=Mock())
+        handler = AuthRequest(client_authenticator=client_auth_mock,
+                              scope_handler=scope_handler_mock,
+                              token_generator=Mock())
 
         result = handler.read_validate_params(request_mock)
 
@@ -144,7 +156,7 @@ class AuthorizeMixinTestCase(unittest.TestCase):
         site_adapter_mock = Mock(spec=ImplicitGrantSiteAdapter)
         site_adapter_mock.user_has_denied_access.return_value = True
 
-        auth_mixin = AuthorizeMixin(site_adapter=site_adapter_mock)
+        auth_mixin = Authorize(site_adapter=site_adapter_mock)
         with self.assertRaises(OAuthInvalidError):
             auth_mixin.authorize(Mock(spec=Request), Mock(spec=Response),
                                  environ={}, scopes=[])
@@ -161,7 +173,7 @@ class AuthorizeMixinTestCase(unittest.TestCase):
         site_adapter_mock.user_has_denied_access.return_value = False
         site_adapter_mock.authenticate.return_value = test_data
 
-        auth_mixin = AuthorizeMixin(site_adapter=site_adapter_mock)
+        auth_mixin = Authorize(site_adapter=site_adapter_mock)
         auth_mixin.client = client_mock
         result = auth_mixin.authorize(Mock(spec=Request), Mock(spec=Response),
                                       environ={}, scopes=[])
@@ -182,7 +194,7 @@ class AuthorizeMixinTestCase(unittest.TestCase):
         site_adapter_mock.user_has_denied_access.return_value = False
         site_adapter_mock.authenticate.return_value = test_data
 
-        auth_mixin = AuthorizeMixin(site_adapter=site_adapter_mock)
+        auth_mixin = Authorize(site_adapter=site_adapter_mock)
         auth_mixin.client = client_mock
         result = auth_mixin.authorize(Mock(spec=Request), Mock(spec=Response),
                                       environ={}, scopes=[])
@@ -201,7 +213,7 @@ class AuthorizeMixinTestCase(unittest.TestCase):
         site_adapter_mock.authenticate.side_effect = UserNotAuthenticated
         site_adapter_mock.render_auth_page.return_value = response_mock
 
-        auth_mixin = AuthorizeMixin(site_adapter=site_adapter_mock)
+        auth_mixin = Authorize(site_adapter=site_adapter_mock)
         auth_mixin.client = client_mock
         result = auth_mixin.authorize(Mock(spec=Request), response_mock,
                                       environ={}, scopes=[])
@@ -231,6 +243,7 @@ class AuthorizationCodeAuthHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
         scope_handler_mock.send_back = False
 
         site_adapter_mock = Mock(spec=AuthorizationCodeGrantSiteAdapter)
@@ -274,6 +287,7 @@ class AuthorizationCodeAuthHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
 
         site_adapter_mock = Mock(spec=AuthorizationCodeGrantSiteAdapter)
         site_adapter_mock.authenticate.side_effect = UserNotAuthenticated
@@ -330,6 +344,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
         user_id = 123
 
         auth_code = Mock(AuthorizationCode)
+        auth_code.client_id = client_id
         auth_code.code = code
         auth_code.data = data
         auth_code.is_expired.return_value = False
@@ -344,7 +359,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
                         redirect_uris=[redirect_uri])
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         request_mock = Mock(spec=Request)
         request_mock.post_param.side_effect = [code, redirect_uri]
@@ -368,6 +383,34 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
         self.assertEqual(handler.user_id, user_id)
         self.assertTrue(result)
 
+    def test_read_validate_params_code_of_other_client(self):
+        redirect_uri = "http://callback"
+
+        auth_code = AuthorizationCode(client_id="other", code="defg", expires_at=0, redirect_uri=redirect_uri,
+                                      scopes=[])
+
+        auth_code_store_mock = Mock(spec=AuthCodeStore)
+        auth_code_store_mock.fetch_by_code.return_value = auth_code
+
+        client_auth_mock = Mock(spec=ClientAuthenticator)
+        client_auth_mock.check_identifier_secret.return_value = (Client(identifier="abc", secret="t%gH",
+                                                                        redirect_uris=[redirect_uri]), None)
+
+        request_mock = Mock(spec=Request)
+        request_mock.post_param.side_effect = ["defg", redirect_uri]
+
+        handler = AuthorizationCodeTokenHandler(
+            access_token_store=Mock(spec=AccessTokenStore),
+            auth_token_store=auth_code_store_mock,
+            client_authenticator=client_auth_mock,
+            token_generator=Mock())
+
+        with self.assertRaises(OAuthInvalidError) as expected:
+            handler.read_validate_params(request_mock)
+
+        self.assertEqual(expected.exception.error, "invalid_grant")
+        self.assertEqual(auth_code_store_mock.delete_code.call_count, 0)
+
     def test_read_validate_params_missing_code(self):
         client_id = "abc"
         client_secret = "t%gH"
@@ -378,7 +421,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
                         redirect_uris=[redirect_uri])
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         request_mock = Mock(spec=Request)
         request_mock.post_param.side_effect = [code, redirect_uri]
@@ -415,7 +458,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
                         redirect_uris=[redirect_uri])
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         request_mock = Mock(spec=Request)
         request_mock.post_param.side_effect = [code_actual, redirect_uri]
@@ -448,7 +491,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
                         redirect_uris=[redirect_uri])
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         request_mock = Mock(spec=Request)
         request_mock.post_param.side_effect = [code, redirect_uri]
@@ -475,6 +518,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
         redirect_uri_expected = "http://callback"
 
         auth_code_mock = Mock(AuthorizationCode)
+        auth_code_mock.client_id = client_id
         auth_code_mock.code = code
         auth_code_mock.redirect_uri = redirect_uri_actual
 
@@ -485,7 +529,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
                         redirect_uris=[redirect_uri_expected])
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         request_mock = Mock(spec=Request)
         request_mock.post_param.side_effect = [code, redirect_uri_expected]
@@ -511,6 +555,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
         redirect_uri = "http://callback"
 
         auth_code_mock = Mock(AuthorizationCode)
+        auth_code_mock.client_id = client_id
         auth_code_mock.code = code
         auth_code_mock.redirect_uri = redirect_uri
         auth_code_mock.is_expired.return_value = True
@@ -522,7 +567,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
                         redirect_uris=[redirect_uri])
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         request_mock = Mock(spec=Request)
         request_mock.post_param.side_effect = [code, redirect_uri]
@@ -577,7 +622,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
         self.assertEqual(access_token.data, data)
         self.assertEqual(access_token.grant_type, "authorization_code")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.body, json.dumps(token_data))
+        self.assertEqual(json.loads(response.body), token_data)
         response_mock.add_header.assert_has_calls([call("Content-Type",
                                                         "application/json"),
                                                    call("Cache-Control",
@@ -623,7 +668,7 @@ class AuthorizationCodeTokenHandlerTestCase(unittest.TestCase):
         self.assertEqual(access_token.refresh_token,
                          token_data["refresh_token"])
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.body, json.dumps(token_data))
+        self.assertEqual(json.loads(response.body), token_data)
         response_mock.add_header.assert_has_calls([call("Content-Type",
                                                         "application/json"),
                                                    call("Cache-Control",
@@ -836,6 +881,7 @@ class ImplicitGrantHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
         scope_handler_mock.send_back = False
 
         site_adapter_mock = Mock(spec=ImplicitGrantSiteAdapter)
@@ -881,6 +927,7 @@ class ImplicitGrantHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = []
+        scope_handler_mock.token_scopes.return_value = []
         scope_handler_mock.send_back = False
 
         site_adapter_mock = Mock(spec=ImplicitGrantSiteAdapter)
@@ -919,6 +966,7 @@ class ImplicitGrantHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
         scope_handler_mock.send_back = True
 
         site_adapter_mock = Mock(spec=ImplicitGrantSiteAdapter)
@@ -954,6 +1002,7 @@ class ImplicitGrantHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
 
         site_adapter_mock = Mock(spec=ImplicitGrantSiteAdapter)
         site_adapter_mock.authenticate.side_effect = UserNotAuthenticated
@@ -979,6 +1028,7 @@ class ImplicitGrantHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(spec=Scope)
         scope_handler_mock.scopes = []
+        scope_handler_mock.token_scopes.return_value = []
 
         site_adapter_mock = Mock(spec=ImplicitGrantSiteAdapter)
         site_adapter_mock.user_has_denied_access.return_value = True
@@ -1078,6 +1128,7 @@ class ResourceOwnerGrantHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
         scope_handler_mock.send_back = False
 
         site_adapter_mock = Mock(spec=ResourceOwnerGrantSiteAdapter)
@@ -1131,6 +1182,7 @@ class ResourceOwnerGrantHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
         scope_handler_mock.send_back = False
 
         site_adapter_mock = Mock(spec=ResourceOwnerGrantSiteAdapter)
@@ -1184,6 +1236,7 @@ class ResourceOwnerGrantHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
         scope_handler_mock.send_back = True
 
         token_generator_mock = Mock(spec=TokenGenerator)
@@ -1214,6 +1267,7 @@ class ResourceOwnerGrantHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(Scope)
         scope_handler_mock.scopes = ["scopes"]
+        scope_handler_mock.token_scopes.return_value = ["scopes"]
         scope_handler_mock.send_back = False
 
         site_adapter_mock = Mock(spec=ResourceOwnerGrantSiteAdapter)
@@ -1243,7 +1297,7 @@ class ResourceOwnerGrantHandlerTestCase(unittest.TestCase):
         client = Client(identifier="abcd", secret="xyz")
 
         client_auth_mock = Mock(ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         request_mock = Mock(Request)
         request_mock.post_param.side_effect = [password, username]
@@ -1258,7 +1312,7 @@ class ResourceOwnerGrantHandlerTestCase(unittest.TestCase):
             token_generator=Mock())
         result = handler.read_validate_params(request_mock)
 
-        client_auth_mock.by_identifier_secret.assert_called_with(request_mock)
+        client_auth_mock.check_identifier_secret.assert_called_with(request_mock)
         scope_handler_mock.parse.assert_called_with(request=request_mock, source="body")
 
         self.assertEqual(handler.client, client)
@@ -1426,6 +1480,122 @@ class ScopeTestCase(unittest.TestCase):
 
         self.assertEqual(e.error, "invalid_scope")
 
+    def test_compare_mask(self):
+        """
+        Scope.compare should check the requested scopes against the integer mask of a token
+        """
+        policy = ScopePolicy(available=["a", "b", "c"])
+        scope = Scope(policy=policy)
+
+        scope.scopes = ["b", "c"]
+
+        self.assertTrue(scope.compare(policy.mask(["a", "b", "c"])))
+
+        with self.assertRaises(OAuthInvalidError):
+            scope.compare(policy.mask(["a", "b"]))
+
+    def test_parse_scope_limits(self):
+        """
+        Scope.parse should reject a scope parameter with too many or too long scopes
+        """
+        scope = Scope(policy=ScopePolicy(available=["a", "b"], max_scopes=3, max_scope_length=4))
+
+        for value in ["a b a b", "a bbbbb", "a" * 100]:
+            request_mock = Mock(Request)
+            request_mock.post_param.return_value = value
+
+            with self.assertRaises(OAuthInvalidError) as expected:
+                scope.parse(request_mock, source="body")
+
+            self.assertEqual(expected.exception.error, "invalid_scope")
+
+        request_mock = Mock(Request)
+        request_mock.post_param.return_value = "b c a"
+        scope.parse(request_mock, source="body")
+
+        self.assertListEqual(scope.scopes, ["b", "a"])
+
+    def test_token_scopes(self):
+        """
+        Scope.token_scopes should return a mask only if the policy issues masks and every scope has a bit
+        """
+        scope = Scope(available=["a", "b"])
+        scope.scopes = ["b"]
+
+        self.assertListEqual(scope.token_scopes(), ["b"])
+
+        scope = Scope(policy=ScopePolicy(available=["a", "b"], default="all", issue_masks=True))
+        scope.scopes = ["b"]
+
+        self.assertEqual(scope.token_scopes(), 2)
+
+        scope.scopes = ["all"]
+
+        self.assertListEqual(scope.token_scopes(), ["all"])
+
+
+class ScopePolicyTestCase(unittest.TestCase):
+    def test_mask_names(self):
+        policy = ScopePolicy(available=["a", "b", "c"])
+
+        self.assertEqual(policy.mask(["c", "a"]), 5)
+        self.assertIsNone(policy.mask(["a", "d"]))
+        self.assertListEqual(policy.names(5), ["a", "c"])
+
+    def test_use_table(self):
+        table = ScopeTable(["b"])
+        policy = ScopePolicy(available=["a", "b"])
+
+        policy.use_table(table)
+
+        self.assertEqual(table.bits, {"b": 1, "a": 2})
+        self.assertEqual(policy.mask(["a", "b"]), 3)
+        self.assertListEqual(policy.names(2), ["a"])
+
+    def test_provider_shares_bits_between_grants(self):
+        token_generator_mock = Mock(spec=TokenGenerator)
+        token_generator_mock.expires_in = {}
+        provider = Provider(access_token_store=Mock(), auth_code_store=Mock(), client_store=Mock(),
+                            token_generator=token_generator_mock)
+
+        resource_owner = ResourceOwnerGrant(scopes=["read", "write"], scope_masks=True,
+                                            site_adapter=Mock(spec=ResourceOwnerGrantSiteAdapter))
+        refresh = RefreshToken(scopes=["write", "read"], expires_in=600)
+        provider.add_grant(resource_owner)
+        provider.add_grant(refresh)
+
+        scope = resource_owner._create_scope_handler()
+        scope.scopes = ["read"]
+        issued = scope.token_scopes()
+
+        scope = refresh._create_scope_handler()
+        scope.scopes = ["write"]
+        with self.assertRaises(OAuthInvalidError):
+            scope.compare(issued)
+
+        scope.scopes = ["read"]
+        self.assertTrue(scope.compare(issued))
+
+    def test_provider_rejects_masks_for_jwt(self):
+        provider = Provider(access_token_store=Mock(), auth_code_store=Mock(), client_store=Mock(),
+                            token_generator=JwtTokenGenerator(ed25519.Ed25519PrivateKey.generate()))
+
+        provider.add_grant(ClientCredentialsGrant(scopes=["read"]))
+        with self.assertRaises(ValueError):
+            provider.add_grant(ClientCredentialsGrant(scopes=["read"], scope_masks=True))
+
+    def test_scope_grant_shares_policy(self):
+        grant = ClientCredentialsGrant(scopes=["a", "b"], default_scope="a", max_scopes=10, scope_masks=True)
+
+        first = grant._create_scope_handler()
+        second = grant._create_scope_handler()
+
+        self.assertIsNot(first, second)
+        self.assertIs(first.policy, grant.scope_policy)
+        self.assertIs(second.policy, grant.scope_policy)
+        self.assertEqual(grant.scope_policy.max_scopes, 10)
+        self.assertTrue(grant.scope_policy.issue_masks)
+
 
 class RefreshTokenTestCase(unittest.TestCase):
     def test_call(self):
@@ -1520,6 +1690,7 @@ class RefreshTokenHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(spec=Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
 
         token_data = {"access_token": token, "expires_in": expires_in, "token_type": "Bearer", "refresh_token": "gafc"}
         token_generator_mock = Mock(spec=TokenGenerator)
@@ -1547,7 +1718,7 @@ class RefreshTokenHandlerTestCase(unittest.TestCase):
 
         self.assertEqual(result, response)
         self.assertDictContainsSubset(expected_headers, result.headers)
-        self.assertEqual(json.dumps(expected_response_body), result.body)
+        self.assertEqual(expected_response_body, json.loads(result.body))
 
     @patch("time.time", mock_time)
     def test_process_with_reissue(self):
@@ -1570,6 +1741,7 @@ class RefreshTokenHandlerTestCase(unittest.TestCase):
 
         scope_handler_mock = Mock(spec=Scope)
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
 
         token_data = {"access_token": token, "expires_in": expires_in, "token_type": "Bearer",
                       "refresh_token": refresh_token}
@@ -1621,7 +1793,7 @@ class RefreshTokenHandlerTestCase(unittest.TestCase):
         client = Client(identifier=client_id, secret=client_secret, redirect_uris=[])
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         request_mock = Mock(spec=Request)
         request_mock.post_param.side_effect = [refresh_token]
@@ -1641,7 +1813,7 @@ class RefreshTokenHandlerTestCase(unittest.TestCase):
 
         request_mock.post_param.assert_called_with("refresh_token")
         access_token_store_mock.fetch_by_refresh_token.assert_called_with(refresh_token)
-        client_auth_mock.by_identifier_secret.assert_called_with(request_mock)
+        client_auth_mock.check_identifier_secret.assert_called_with(request_mock)
         scope_handler_mock.parse.assert_called_with(request_mock, "body")
         scope_handler_mock.compare.assert_called_with(scopes)
 
@@ -1679,7 +1851,7 @@ class RefreshTokenHandlerTestCase(unittest.TestCase):
         client = Client(identifier=client_id, secret=secret, redirect_uris=[])
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         handler = RefreshTokenHandler(access_token_store=access_token_store_mock,
                                       client_authenticator=client_auth_mock,
@@ -1712,7 +1884,7 @@ class RefreshTokenHandlerTestCase(unittest.TestCase):
         client = Client(identifier=client_id, secret=secret, redirect_uris=[])
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = client
+        client_auth_mock.check_identifier_secret.return_value = (client, None)
 
         handler = RefreshTokenHandler(
             access_token_store=access_token_store_mock,
@@ -1788,6 +1960,30 @@ class ClientCredentialsGrantTestCase(unittest.TestCase):
         self.assertEqual(handler, None)
 
 
+class GrantHandlerSlotsTestCase(unittest.TestCase):
+    def test_handlers_without_dict(self):
+        server_mock = Mock()
+        server_mock.token_path = "/token"
+
+        request_mock = Mock(spec=Request)
+        request_mock.path = "/token"
+        request_mock.method = "POST"
+
+        grants = {"authorization_code": AuthorizationCodeGrant(site_adapter=AuthorizationCodeGrantSiteAdapter()),
+                  "password": ResourceOwnerGrant(site_adapter=ResourceOwnerGrantSiteAdapter()),
+                  "refresh_token": RefreshToken(expires_in=600),
+                  "client_credentials": ClientCredentialsGrant()}
+
+        for grant_type, grant in grants.items():
+            request_mock.post_param.return_value = grant_type
+
+            handler = grant(request_mock, server_mock)
+
+            self.assertFalse(hasattr(handler, "__dict__"), grant_type)
+
+        self.assertFalse(hasattr(Scope(), "__dict__"))
+
+
 class ClientCredentialsHandlerTestCase(unittest.TestCase):
     def test_process(self):
         client_id = "abc"
@@ -1802,6 +1998,7 @@ class ClientCredentialsHandlerTestCase(unittest.TestCase):
         scope_handler_mock = Mock(spec=Scope)
         scope_handler_mock.send_back = False
         scope_handler_mock.scopes = []
+        scope_handler_mock.token_scopes.return_value = []
 
         token_generator_mock = Mock(spec=TokenGenerator)
         token_generator_mock.generate.return_value = token
@@ -1835,6 +2032,7 @@ class ClientCredentialsHandlerTestCase(unittest.TestCase):
         scope_handler_mock = Mock(spec=Scope)
         scope_handler_mock.send_back = True
         scope_handler_mock.scopes = scopes
+        scope_handler_mock.token_scopes.return_value = scopes
 
         token_generator_mock = Mock(spec=TokenGenerator)
         token_generator_mock.generate.return_value = token
@@ -1870,10 +2068,10 @@ class ClientCredentialsHandlerTestCase(unittest.TestCase):
         client_secret = "xyz"
 
         client_auth_mock = Mock(spec=ClientAuthenticator)
-        client_auth_mock.by_identifier_secret.return_value = Client(
+        client_auth_mock.check_identifier_secret.return_value = (Client(
             identifier=client_id,
             secret=client_secret,
-            redirect_uris=[])
+            redirect_uris=[]), None)
 
         scope_handler_mock = Mock(spec=Scope)
 
@@ -1886,7 +2084,7 @@ class ClientCredentialsHandlerTestCase(unittest.TestCase):
             token_generator=Mock())
         handler.read_validate_params(request_mock)
 
-        client_auth_mock.by_identifier_secret.assert_called_with(request_mock)
+        client_auth_mock.check_identifier_secret.assert_called_with(request_mock)
         scope_handler_mock.parse.assert_called_with(request=request_mock, source="body")
 
 
@@ -1,12 +1,24 @@
+import asyncio
+from io import BytesIO
+
 from mock import Mock
 from oauth2 import Provider
-from oauth2.compatibility import json
-from oauth2.error import OAuthInvalidError, OAuthInvalidNoRedirectError
-from oauth2.grant import (AuthorizationCodeGrant, GrantHandler, RefreshToken,
-                          ResourceOwnerGrant)
-from oauth2.store import ClientStore
+from oauth2.compatibility import json, urlencode
+from oauth2.error import (ClientNotFoundError, OAuthInvalidError,
+                          OAuthInvalidNoRedirectError, UnsupportedGrantError,
+                          UserNotAuthenticated)
+from oauth2.grant import (AuthorizationCodeGrant, ClientCredentialsGrant,
+                          ClientCredentialsHandler, GrantHandler,
+                          GrantHandlerFactory, ImplicitGrant, RefreshToken,
+                          RefreshTokenHandler, ResourceOwnerGrant, Route)
+from oauth2.store import AsyncAccessTokenStore, AsyncClientStore, ClientStore
+from oauth2.store.memory import ClientStore as MemoryClientStore
+from oauth2.store.memory import TokenStore as MemoryTokenStore
 from oauth2.test import unittest
-from oauth2.web import (AuthorizationCodeGrantSiteAdapter,
+from oauth2.tokengenerator import Uuid4TokenGenerator
+from oauth2.web import (AsyncResourceOwnerGrantSiteAdapter,
+                        AuthorizationCodeGrantSiteAdapter,
+                        ImplicitGrantSiteAdapter,
                         ResourceOwnerGrantSiteAdapter, Response)
 from oauth2.web.wsgi import Request
 
@@ -61,6 +73,37 @@ class ProviderTestCase(unittest.TestCase):
         self.assertEqual(self.token_generator_mock.refresh_expires_in, 0)
 
 
+    def test_issue_tokens(self):
+        self.token_generator_mock.refresh_expires_in = 3600
+        self.token_generator_mock.create_access_token_data_many.return_value = [
+            {"access_token": "abc", "token_type": "Bearer", "refresh_token": "def", "expires_in": 600},
+            {"access_token": "ghi", "token_type": "Bearer"}]
+        requests = [{"client_id": "client", "grant_type": "password", "user_id": 1},
+                    {"client_id": "client", "grant_type": "client_credentials", "scopes": ["read"]}]
+
+        result = self.auth_server.issue_tokens(requests)
+
+        self.token_generator_mock.create_access_token_data_many.assert_called_with(requests)
+        self.assertEqual(result, self.token_generator_mock.create_access_token_data_many.return_value)
+        self.assertEqual(self.auth_server.access_token_store.save_tokens.call_count, 1)
+
+        access_tokens = self.auth_server.access_token_store.save_tokens.call_args[0][0]
+        self.assertEqual([access_token.token for access_token in access_tokens], ["abc", "ghi"])
+        self.assertEqual(access_tokens[0].refresh_token, "def")
+        self.assertEqual(access_tokens[0].user_id, 1)
+        self.assertIsNotNone(access_tokens[0].refresh_expires_at)
+        self.assertIsNone(access_tokens[1].refresh_token)
+        self.assertEqual(access_tokens[1].scopes, ["read"])
+
+    def test_warm_up(self):
+        self.client_store_mock.fetch_by_client_id.side_effect = [Mock(), ClientNotFoundError]
+
+        self.auth_server.warm_up(client_ids=["abc", "missing"])
+
+        self.assertEqual(self.token_generator_mock.generate.call_count, 1)
+        self.assertEqual([call[0][0] for call in self.client_store_mock.fetch_by_client_id.call_args_list],
+                         ["abc", "missing"])
+
     def test_dispatch(self):
         environ = {"session": "data"}
         process_result = "response"
@@ -82,6 +125,95 @@ class ProviderTestCase(unittest.TestCase):
         grant_handler_mock.process.assert_called_with(request_mock, self.response_mock, environ)
         self.assertEqual(result, process_result)
 
+    def test_dispatch_routes(self):
+        self.auth_server.add_grant(ImplicitGrant(site_adapter=Mock(spec=ImplicitGrantSiteAdapter)))
+        self.auth_server.add_grant(ClientCredentialsGrant())
+        self.auth_server.add_grant(RefreshToken(expires_in=600))
+        grant_factory_mock = Mock(return_value=None)
+        self.auth_server.add_grant(grant_factory_mock)
+
+        request_mock = Mock(spec=Request)
+        request_mock.method = "POST"
+        request_mock.path = "/token"
+        request_mock.post_param.return_value = "refresh_token"
+        request_mock.get_param.return_value = None
+
+        self.assertIsInstance(self.auth_server._determine_grant_type(request_mock), RefreshTokenHandler)
+        request_mock.post_param.assert_called_once_with("grant_type")
+        grant_factory_mock.assert_not_called()
+
+        request_mock.post_param.return_value = "client_credentials"
+        self.assertIsInstance(self.auth_server._determine_grant_type(request_mock), ClientCredentialsHandler)
+
+        request_mock.path = "/authorize"
+        with self.assertRaises(UnsupportedGrantError):
+            self.auth_server._determine_grant_type(request_mock)
+        grant_factory_mock.assert_called_once_with(request_mock, self.auth_server)
+
+    def test_dispatch_custom_routes(self):
+        grant_handler_mock = Mock(spec=GrantHandler)
+
+        class CustomGrant(GrantHandlerFactory):
+            def routes(self):
+                return [Route("POST", "token_path", "body", "grant_type", "urn:custom", self.create)]
+
+            def create(self, request, server):
+                return grant_handler_mock
+
+        grant = CustomGrant()
+        self.auth_server.add_grant(grant)
+
+        request_mock = Mock(spec=Request)
+        request_mock.method = "POST"
+        request_mock.path = "/token"
+        request_mock.post_param.return_value = "urn:custom"
+
+        self.assertEqual(self.auth_server._determine_grant_type(request_mock), grant_handler_mock)
+        self.assertEqual(grant(request_mock, self.auth_server), grant_handler_mock)
+
+        request_mock.method = "GET"
+        self.assertIsNone(grant(request_mock, self.auth_server))
+        with self.assertRaises(UnsupportedGrantError):
+            self.auth_server._determine_grant_type(request_mock)
+
+    def test_dispatch_subclass_overriding_call(self):
+        class GatedGrant(ClientCredentialsGrant):
+            def __call__(self, request, server):
+                if request.header("x-gate") != "open":
+                    return None
+                return super().__call__(request, server)
+
+        self.auth_server.add_grant(GatedGrant())
+
+        request_mock = Mock(spec=Request)
+        request_mock.method = "POST"
+        request_mock.path = "/token"
+        request_mock.post_param.return_value = "client_credentials"
+        request_mock.header.return_value = None
+
+        with self.assertRaises(UnsupportedGrantError):
+            self.auth_server._determine_grant_type(request_mock)
+
+        request_mock.header.return_value = "open"
+        self.assertIsInstance(self.auth_server._determine_grant_type(request_mock), ClientCredentialsHandler)
+
+    def test_dispatch_keeps_order_of_grants(self):
+        grant_handler_mock = Mock(spec=GrantHandler)
+        grant_factory_mock = Mock(return_value=grant_handler_mock)
+        self.auth_server.add_grant(grant_factory_mock)
+        self.auth_server.add_grant(ClientCredentialsGrant())
+
+        request_mock = Mock(spec=Request)
+        request_mock.method = "POST"
+        request_mock.path = "/token"
+        request_mock.post_param.return_value = "client_credentials"
+        request_mock.get_param.return_value = None
+
+        self.assertEqual(self.auth_server._determine_grant_type(request_mock), grant_handler_mock)
+
+        grant_factory_mock.return_value = None
+        self.assertIsInstance(self.auth_server._determine_grant_type(request_mock), ClientCredentialsHandler)
+
     def test_dispatch_no_grant_type_found(self):
         error_body = {
             "error": "unsupported_response_type",
@@ -90,12 +222,13 @@ class ProviderTestCase(unittest.TestCase):
 
         request_mock = Mock(spec=Request)
 
-        result = self.auth_server.dispatch(request_mock, {})
+        auth_server = Provider(access_token_store=Mock(), auth_code_store=Mock(), client_store=Mock(),
+                               token_generator=self.token_generator_mock)
+        result = auth_server.dispatch(request_mock, {})
 
-        self.response_mock.add_header.assert_called_with("Content-Type", "application/json")
-        self.assertEqual(self.response_mock.status_code, 400)
-        self.assertEqual(self.response_mock.body, json.dumps(error_body))
-        self.assertEqual(result, self.response_mock)
+        self.assertEqual(result.headers["Content-Type"], "application/json")
+        self.assertEqual(result.status_code, 400)
+        self.assertEqual(json.loads(result.body), error_body)
 
     def test_dispatch_no_client_found(self):
         error_body = {
@@ -110,14 +243,74 @@ class ProviderTestCase(unittest.TestCase):
 
         grant_factory_mock = Mock(return_value=grant_handler_mock)
 
-        self.auth_server.add_grant(grant_factory_mock)
-        result = self.auth_server.dispatch(request_mock, {})
+        auth_server = Provider(access_token_store=Mock(), auth_code_store=Mock(), client_store=Mock(),
+                               token_generator=self.token_generator_mock)
+        auth_server.add_grant(grant_factory_mock)
+        result = auth_server.dispatch(request_mock, {})
+
+        self.assertEqual(result.headers["Content-Type"], "application/json")
+        self.assertEqual(result.status_code, 400)
+        self.assertEqual(json.loads(result.body), error_body)
+
+    def test_dispatch_copies_error_response(self):
+        response_class_mock = Mock(wraps=Response)
+        auth_server = Provider(access_token_store=Mock(), auth_code_store=Mock(), client_store=Mock(),
+                               token_generator=Mock(), response_class=response_class_mock)
+        request_mock = Mock(spec=Request)
+        response_class_mock.reset_mock()
+
+        first = auth_server.dispatch(request_mock, {})
+        first.add_header("X-Request-Id", "1")
+        second = auth_server.dispatch(request_mock, {})
+
+        self.assertIsNot(first, second)
+        self.assertIs(first.body_bytes, second.body_bytes)
+        self.assertEqual(second.status_code, 400)
+        self.assertEqual(second.headers, {"Content-Type": "application/json"})
+        response_class_mock.assert_not_called()
+
+    def test_dispatch_returned_error(self):
+        request_mock = Mock(spec=Request)
+        error = OAuthInvalidError(error="invalid_client")
+
+        client_authenticator_mock = Mock()
+        client_authenticator_mock.check_identifier_secret.return_value = (None, error)
+        grant_handler = ClientCredentialsHandler(access_token_store=Mock(),
+                                                 client_authenticator=client_authenticator_mock,
+                                                 scope_handler=Mock(), token_generator=Mock())
 
-        self.response_mock.add_header.assert_called_with("Content-Type", "application/json")
-        self.assertEqual(self.response_mock.status_code, 400)
-        self.assertEqual(self.response_mock.body, json.dumps(error_body))
+        self.auth_server.add_grant(Mock(return_value=grant_handler))
+        result = self.auth_server.dispatch(request_mock, {})
 
         self.assertEqual(result, self.response_mock)
+        self.assertEqual(json.loads(self.response_mock.body)["error"], "invalid_client")
+
+        with self.assertRaises(OAuthInvalidError):
+            grant_handler.read_validate_params(request_mock)
+
+    def test_dispatch_handler_overriding_read_validate_params(self):
+        class GatedHandler(ClientCredentialsHandler):
+            def read_validate_params(self, request):
+                raise OAuthInvalidError(error="access_denied")
+
+        client_authenticator_mock = Mock()
+        client_authenticator_mock.check_identifier_secret.return_value = (Mock(), None)
+        grant_handler = GatedHandler(access_token_store=Mock(), client_authenticator=client_authenticator_mock,
+                                     scope_handler=Mock(), token_generator=Mock())
+
+        self.auth_server.add_grant(Mock(return_value=grant_handler))
+        self.auth_server.dispatch(Mock(spec=Request), {})
+
+        self.assertEqual(json.loads(self.response_mock.body)["error"], "access_denied")
+
+    def test_dispatch_error_bodies_serialized_once(self):
+        request_mock = Mock(spec=Request)
+
+        self.auth_server.dispatch(request_mock, {})
+        first_body = self.response_mock.body
+        self.auth_server.dispatch(request_mock, {})
+
+        self.assertIs(self.response_mock.body, first_body)
 
     def test_dispatch_general_exception(self):
         request_mock = Mock(spec=Request)
@@ -131,3 +324,123 @@ class ProviderTestCase(unittest.TestCase):
         self.auth_server.dispatch(request_mock, {})
 
         self.assertTrue(grant_handler_mock.handle_error.called)
+
+
+class AsyncTokenStore(AsyncAccessTokenStore):
+    """
+    Keeps tokens in memory and gives control back to the event loop on every call.
+    """
+
+    def __init__(self):
+        self.store = MemoryTokenStore()
+
+    async def save_token(self, access_token):
+        await asyncio.sleep(0)
+        self.store.save_token(access_token)
+
+    async def fetch_by_refresh_token(self, refresh_token):
+        await asyncio.sleep(0)
+        return self.store.fetch_by_refresh_token(refresh_token)
+
+    async def delete_refresh_token(self, refresh_token):
+        await asyncio.sleep(0)
+        self.store.delete_refresh_token(refresh_token)
+
+
+class AsyncMemoryClientStore(AsyncClientStore):
+    def __init__(self):
+        self.store = MemoryClientStore()
+        self.store.add_client(client_id="abc", client_secret="xyz", redirect_uris=[])
+
+    async def fetch_by_client_id(self, client_id):
+        await asyncio.sleep(0)
+        return self.store.fetch_by_client_id(client_id)
+
+
+class AsyncSiteAdapter(AsyncResourceOwnerGrantSiteAdapter):
+    async def authenticate(self, request, environ, scopes, client):
+        await asyncio.sleep(0)
+        if request.post_param("password") != "secret":
+            raise UserNotAuthenticated
+        return {"name": "John"}, 123
+
+
+class ProviderDispatchAsyncTestCase(unittest.TestCase):
+    def setUp(self):
+        self.provider = Provider(access_token_store=AsyncTokenStore(), auth_code_store=None,
+                                 client_store=AsyncMemoryClientStore(), token_generator=Uuid4TokenGenerator())
+        self.provider.add_grant(ResourceOwnerGrant(site_adapter=AsyncSiteAdapter(), expires_in=600))
+        self.provider.add_grant(RefreshToken(expires_in=3600, reissue_refresh_tokens=True))
+
+    def dispatch(self, dispatch, **params):
+        params.setdefault("client_id", "abc")
+        params.setdefault("client_secret", "xyz")
+        body = urlencode(params).encode("utf-8")
+        request = Request({"REQUEST_METHOD": "POST", "QUERY_STRING": "", "PATH_INFO": "/token",
+                           "CONTENT_TYPE": "application/x-www-form-urlencoded",
+                           "CONTENT_LENGTH": str(len(body)), "wsgi.input": BytesIO(body)})
+        response = dispatch(request, {})
+        if asyncio.iscoroutine(response):
+            response = asyncio.run(response)
+        return response.status_code, json.loads(response.body)
+
+    def test_dispatch_async(self):
+        status_code, token = self.dispatch(self.provider.dispatch_async, grant_type="password", username="john",
+                                           password="secret")
+
+        self.assertEqual(status_code, 200)
+        self.assertIn("refresh_token", token)
+
+        status_code, refreshed = self.dispatch(self.provider.dispatch_async, grant_type="refresh_token",
+                                               refresh_token=token["refresh_token"])
+
+        self.assertEqual(status_code, 200)
+        self.assertNotEqual(refreshed["access_token"], token["access_token"])
+
+        status_code, error = self.dispatch(self.provider.dispatch_async, grant_type="refresh_token",
+                                           refresh_token=token["refresh_token"])
+
+        self.assertEqual(status_code, 400)
+        self.assertEqual(error["error"], "invalid_request")
+
+    def test_dispatch_async_errors(self):
+        status_code, error = self.dispatch(self.provider.dispatch_async, grant_type="password", username="john",
+                                           password="wrong")
+
+        self.assertEqual(status_code, 401)
+        self.assertEqual(error["error"], "invalid_client")
+
+        status_code, error = self.dispatch(self.provider.dispatch_async, grant_type="password", username="john",
+                                           password="secret", client_secret="wrong")
+
+        self.assertEqual(status_code, 400)
+        self.assertEqual(error["error"], "invalid_client")
+
+    def test_issue_tokens_async(self):
+        results = asyncio.run(self.provider.issue_tokens_async([{"client_id": "abc", "grant_type": "password",
+                                                                  "user_id": 1}]))
+
+        access_token = asyncio.run(self.provider.access_token_store.fetch_by_refresh_token(
+            results[0]["refresh_token"]))
+        self.assertEqual(access_token.token, results[0]["access_token"])
+
+        with self.assertRaises(RuntimeError):
+            self.provider.issue_tokens([{"client_id": "abc", "grant_type": "password", "user_id": 1}])
+
+    def test_warm_up_async(self):
+        self.provider.client_authenticator.client_store.fetch_by_client_id = Mock(
+            wraps=self.provider.client_authenticator.client_store.fetch_by_client_id)
+
+        asyncio.run(self.provider.warm_up_async(client_ids=["abc", "missing"]))
+
+        self.assertEqual(self.provider.client_authenticator.client_store.fetch_by_client_id.call_count, 2)
+
+        with self.assertRaises(RuntimeError):
+            self.provider.warm_up(client_ids=["abc"])
+
+    def test_dispatch_sync_with_async_store(self):
+        status_code, error = self.dispatch(self.provider.dispatch, grant_type="password", username="john",
+                                           password="secret")
+
+        self.assertEqual(status_code, 400)
+        self.assertEqual(error["error"], "server_error")
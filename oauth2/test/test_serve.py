@@ -0,0 +1,130 @@
+import os
+import signal
+import socket
+import sys
+import time
+import types
+from urllib.request import urlopen
+
+from mock import Mock
+from oauth2 import Provider
+from oauth2.compatibility import json, urlencode
+from oauth2.grant import ClientCredentialsGrant
+from oauth2.serve import CountingApplication, PreforkServer, load_config
+from oauth2.store.memory import ClientStore, TokenStore
+from oauth2.test import unittest
+from oauth2.tokengenerator import Uuid4TokenGenerator
+from oauth2.web.wsgi import Application
+
+
+def create_provider():
+    client_store = ClientStore()
+    client_store.add_client(client_id="abc", client_secret="xyz", redirect_uris=[])
+    token_store = TokenStore()
+
+    provider = Provider(access_token_store=token_store, auth_code_store=token_store, client_store=client_store,
+                        token_generator=Uuid4TokenGenerator())
+    provider.add_grant(ClientCredentialsGrant())
+    return provider
+
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class CountingApplicationTestCase(unittest.TestCase):
+    def test_call(self):
+        application = Mock(return_value=[b"body"])
+        counts = [0, 0]
+
+        result = CountingApplication(application, counts, 1)({}, Mock())
+
+        self.assertEqual(result, [b"body"])
+        self.assertEqual(counts, [0, 1])
+
+
+class LoadConfigTestCase(unittest.TestCase):
+    def tearDown(self):
+        sys.modules.pop("oauth2_serve_config", None)
+
+    def test_load_config(self):
+        provider = Mock(spec=Provider)
+        config = types.ModuleType("oauth2_serve_config")
+        config.create_provider = Mock(return_value=provider)
+        config.WARM_UP_CLIENT_IDS = ["abc"]
+        config.APPLICATION_OPTIONS = {"token_uri": "/oauth/token"}
+        sys.modules["oauth2_serve_config"] = config
+
+        application, warm_up = load_config("oauth2_serve_config")
+        warm_up()
+
+        self.assertIsInstance(application, Application)
+        self.assertIs(application.provider, provider)
+        self.assertEqual(application.token_uri, "/oauth/token")
+        provider.warm_up.assert_called_with(["abc"])
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "Forking is not supported")
+class PreforkServerTestCase(unittest.TestCase):
+    def serve(self, reuse_port):
+        port = free_port()
+        server = PreforkServer(Application(create_provider()), port=port, workers=2, report_interval=0,
+                               reuse_port=reuse_port)
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                server.serve()
+            finally:
+                os._exit(0)
+
+        self.addCleanup(self.stop, pid)
+        self.wait_until_listening(port)
+
+        return server, port, pid
+
+    def stop(self, pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        except OSError:
+            pass
+
+    def wait_until_listening(self, port):
+        for _ in range(50):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return
+            except socket.error:
+                time.sleep(0.1)
+
+    def request_token(self, port):
+        body = urlencode({"grant_type": "client_credentials", "client_id": "abc", "client_secret": "xyz"})
+        return json.loads(urlopen("http://127.0.0.1:{0}/token".format(port), data=body.encode("utf-8"),
+                                  timeout=5).read().decode("utf-8"))
+
+    def check_serve(self, reuse_port):
+        server, port, pid = self.serve(reuse_port)
+
+        for _ in range(10):
+            self.assertIn("access_token", self.request_token(port))
+
+        self.assertEqual(sum(server.request_counts()), 10)
+
+        os.kill(pid, signal.SIGTERM)
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(status, 0)
+
+    def test_serve_reuse_port(self):
+        if not hasattr(socket, "SO_REUSEPORT"):
+            self.skipTest("SO_REUSEPORT is not supported")
+
+        self.check_serve(reuse_port=True)
+
+    def test_serve_shared_listener(self):
+        self.check_serve(reuse_port=False)
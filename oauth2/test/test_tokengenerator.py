@@ -1,7 +1,19 @@
+import os
 import re
-
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import itsdangerous
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from mock import patch
+from oauth2.error import AccessTokenNotFound
 from oauth2.test import unittest
-from oauth2.tokengenerator import URandomTokenGenerator, Uuid4TokenGenerator, StatelessTokenGenerator
+from oauth2.tokengenerator import (EntropyPool, JwtTokenGenerator, JwtTokenVerifier, KeyRing,
+                                   StatelessTokenGenerator, URandomTokenGenerator, Uuid4TokenGenerator, b64encode)
 
 
 class StatelessTokenGeneratorTestCase(unittest.TestCase):
@@ -117,6 +129,326 @@ class StatelessTokenGeneratorTestCase(unittest.TestCase):
         self.assertEqual(refresh_data["scopes"], scopes1)
         self.assertEqual(refresh_data["type"], 'refresh_token')
 
+    def test_validate_token_issued_by_itsdangerous(self):
+        generator = StatelessTokenGenerator(self.sekret_key)
+        serializer = itsdangerous.URLSafeTimedSerializer(self.sekret_key)
+        payload = {"type": "access_token", "user_id": "user1", "scopes": ["xxx"] * 20}
+
+        # Long payloads are zlib compressed by itsdangerous.
+        token = serializer.dumps(payload)
+        self.assertTrue(token.startswith("."))
+
+        data = generator.validate_token(token, "access_token")
+
+        self.assertEqual(data["user_id"], "user1")
+        self.assertEqual(data["scopes"], ["xxx"] * 20)
+        self.assertEqual(data["refresh_expires_at"], serializer.loads(token, return_timestamp=True)[1])
+
+    def test_itsdangerous_loads_generated_token(self):
+        generator = StatelessTokenGenerator(self.sekret_key)
+        serializer = itsdangerous.URLSafeTimedSerializer(self.sekret_key)
+
+        token = generator.generate(grant_type="test_grant_type", data={"a": 1}, scopes=["xxx", "yyy"],
+                                   user_id="user1", client_id="client1")
+
+        self.assertEqual(serializer.loads(token), {"type": "access_token", "grant_type": "test_grant_type",
+                                                   "user_id": "user1", "data": {"a": 1}, "scopes": ["xxx", "yyy"],
+                                                   "client_id": "client1"})
+
+    def test_validate_token_tampered(self):
+        generator = StatelessTokenGenerator(self.sekret_key)
+        token = generator.generate(grant_type="test_grant_type", user_id="user1")
+
+        payload, timestamp, signature = token.rsplit(".", 2)
+
+        for tampered in [payload + "x." + timestamp + "." + signature,
+                         payload + "." + timestamp + "." + signature[:-1],
+                         "not a token", ""]:
+            with self.assertRaises(AccessTokenNotFound):
+                generator.validate_token(tampered, "access_token")
+
+    def test_validate_token_wrong_type(self):
+        generator = StatelessTokenGenerator(self.sekret_key)
+        token = generator.refresh_generate(grant_type="test_grant_type", user_id="user1")
+
+        with self.assertRaises(AccessTokenNotFound):
+            generator.validate_token(token, "access_token")
+
+
+class ValidateManyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.generator = StatelessTokenGenerator("xxx")
+        self.tokens = [self.generator.generate(grant_type="password", user_id="user{0}".format(i))
+                       for i in range(10)]
+
+    def test_validate_many(self):
+        refresh_token = self.generator.refresh_generate(grant_type="password", user_id="user1")
+        tokens = [self.tokens[0], self.tokens[1][:-1], refresh_token, None, self.tokens[0]]
+
+        results = self.generator.validate_many(tokens, "access_token")
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0][0]["user_id"], "user0")
+        self.assertIsNone(results[0][1])
+        for payload, error in results[1:4]:
+            self.assertIsNone(payload)
+            self.assertIsInstance(error, AccessTokenNotFound)
+        self.assertEqual(results[4], results[0])
+
+    def test_validate_many_with_executor(self):
+        tokens = self.tokens + [self.tokens[3][:-1]] + self.tokens
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = self.generator.validate_many(tokens, "access_token", executor=executor, chunk_size=3)
+
+        self.assertEqual([payload["user_id"] for payload, _ in results[:10]],
+                         ["user{0}".format(i) for i in range(10)])
+        self.assertIsInstance(results[10][1], AccessTokenNotFound)
+        self.assertEqual(results[11:], results[:10])
+
+    def test_create_access_token_data_many(self):
+        self.generator.expires_in = {"authorization_code": 600}
+        requests = [dict(grant_type="authorization_code", user_id=1, client_id="abc", scopes=["read"]),
+                    dict(grant_type="client_credentials", client_id="def")]
+
+        results = self.generator.create_access_token_data_many(requests)
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["expires_in"], 600)
+        self.assertEqual(self.generator.validate_token(results[0]["access_token"], "access_token")["user_id"], 1)
+        self.assertEqual(self.generator.validate_token(results[0]["refresh_token"], "refresh_token")["scopes"],
+                         ["read"])
+        self.assertNotIn("refresh_token", results[1])
+        self.assertEqual(self.generator.validate_token(results[1]["access_token"], "access_token")["client_id"],
+                         "def")
+
+    def test_validate_many_empty(self):
+        self.assertEqual(self.generator.validate_many([], "access_token"), [])
+
+
+class CompactStatelessTokenGeneratorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.scopes = ["profile_read", "profile_write"]
+        self.generator = StatelessTokenGenerator("xxx", token_format="compact", scopes=self.scopes)
+
+    def test_generate_validate_token(self):
+        data = {"name": "John", "age": -42, "ratio": 0.5, "tags": ["a", None, True, False], "nested": {"id": 1}}
+
+        token = self.generator.generate(grant_type="authorization_code", data=data,
+                                        scopes=["profile_read", "unknown_scope"], user_id="user1",
+                                        client_id="client1")
+
+        payload = self.generator.validate_token(token, "access_token")
+
+        self.assertEqual(payload["type"], "access_token")
+        self.assertEqual(payload["grant_type"], "authorization_code")
+        self.assertEqual(payload["data"], data)
+        self.assertEqual(payload["scopes"], ["profile_read", "unknown_scope"])
+        self.assertEqual(payload["user_id"], "user1")
+        self.assertEqual(payload["client_id"], "client1")
+
+    def test_generate_validate_scope_mask(self):
+        for generator in [self.generator, StatelessTokenGenerator("xxx")]:
+            token = generator.refresh_generate(grant_type="password", scopes=0b101, user_id="user1")
+
+            payload = generator.validate_token(token, "refresh_token")
+
+            self.assertEqual(payload["type"], "refresh_token")
+            self.assertEqual(payload["scopes"], 0b101)
+
+    def test_refresh_generate_custom_grant(self):
+        token = self.generator.refresh_generate(grant_type="custom_grant", user_id=123)
+
+        payload = self.generator.validate_token(token, "refresh_token")
+
+        self.assertEqual(payload, {"type": "refresh_token", "grant_type": "custom_grant", "user_id": 123,
+                                   "refresh_expires_at": payload["refresh_expires_at"]})
+
+    def test_generate_without_user_id(self):
+        payload = self.generator.unserialize(self.generator.generate())
+
+        self.assertRegex(payload["user_id"], r"^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$")
+
+    def test_compact_token_is_shorter(self):
+        json_generator = StatelessTokenGenerator("xxx", scopes=self.scopes)
+        args = dict(grant_type="authorization_code", data={"name": "John"}, scopes=self.scopes,
+                    user_id="user1", client_id="client1")
+
+        self.assertLess(len(self.generator.generate(**args)), len(json_generator.generate(**args)) / 2)
+
+    def test_formats_validate_side_by_side(self):
+        json_generator = StatelessTokenGenerator("xxx", scopes=self.scopes)
+        args = dict(grant_type="password", scopes=self.scopes, user_id="user1", client_id="client1")
+
+        compact_payload = json_generator.validate_token(self.generator.generate(**args), "access_token")
+        json_payload = self.generator.validate_token(json_generator.generate(**args), "access_token")
+
+        self.assertEqual(compact_payload, json_payload)
+
+    def test_validate_token_tampered(self):
+        token = self.generator.generate(grant_type="password", user_id="user1")
+        other_key = StatelessTokenGenerator("yyy", token_format="compact", scopes=self.scopes)
+
+        for tampered in [token[:-2], token[:10] + ("B" if token[10] != "B" else "C") + token[11:], "A", "AAAA"]:
+            with self.assertRaises(AccessTokenNotFound):
+                self.generator.validate_token(tampered, "access_token")
+
+        with self.assertRaises(AccessTokenNotFound):
+            other_key.validate_token(token, "access_token")
+
+    def test_unknown_token_format(self):
+        with self.assertRaises(ValueError):
+            StatelessTokenGenerator("xxx", token_format="xml")
+
+
+class KeyRingTestCase(unittest.TestCase):
+    def test_rotate_from_single_secret(self):
+        legacy_token = StatelessTokenGenerator("old").generate(grant_type="password", user_id="user1")
+
+        keyring = KeyRing({None: "old", "k2": "new"}, active_key_id="k2")
+        generator = StatelessTokenGenerator(keyring)
+        token = generator.generate(grant_type="password", user_id="user2")
+
+        self.assertTrue(token.startswith("k2~"))
+        self.assertEqual(generator.validate_token(legacy_token, "access_token")["user_id"], "user1")
+        self.assertEqual(generator.validate_token(token, "access_token")["user_id"], "user2")
+
+    def test_rotate_at_runtime(self):
+        keyring = KeyRing({"k1": "first"}, active_key_id="k1")
+        generator = StatelessTokenGenerator(keyring, token_format="compact")
+        old_token = generator.generate(user_id="user1")
+
+        keyring.add_key("k2", "second")
+        keyring.activate("k2")
+        new_token = generator.generate(user_id="user2")
+
+        self.assertTrue(new_token.startswith("k2~"))
+        self.assertEqual(generator.validate_token(old_token, "access_token")["user_id"], "user1")
+        self.assertEqual(generator.validate_token(new_token, "access_token")["user_id"], "user2")
+
+        keyring.remove_key("k1")
+
+        with self.assertRaises(AccessTokenNotFound):
+            generator.validate_token(old_token, "access_token")
+
+    def test_validate_token_unknown_or_forged_key_id(self):
+        generator = StatelessTokenGenerator(KeyRing({"k1": "first", "k2": "second"}, active_key_id="k1"))
+        token = generator.generate(user_id="user1")
+
+        for tampered in ["k3" + token[2:], "k2" + token[2:], token[3:]]:
+            with self.assertRaises(AccessTokenNotFound):
+                generator.validate_token(tampered, "access_token")
+
+    def test_invalid_keys(self):
+        keyring = KeyRing({"k1": "first"}, active_key_id="k1")
+
+        with self.assertRaises(ValueError):
+            keyring.add_key("a~b", "secret")
+
+        with self.assertRaises(ValueError):
+            keyring.remove_key("k1")
+
+        with self.assertRaises(KeyError):
+            keyring.activate("k2")
+
+
+class JwtTokenGeneratorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ed25519_key = ed25519.Ed25519PrivateKey.generate()
+        self.es256_key = ec.generate_private_key(ec.SECP256R1())
+
+    def test_generate_validate_token(self):
+        for private_key in [self.ed25519_key, self.es256_key]:
+            generator = JwtTokenGenerator(private_key, key_id="k1", issuer="https://auth.example.com")
+            generator.expires_in = {"password": 600}
+
+            token = generator.generate(grant_type="password", data={"name": "John"}, scopes=["read", "write"],
+                                       user_id=123, client_id="client1")
+
+            claims = generator.verifier().validate_token(token, "access_token")
+
+            self.assertEqual(claims["sub"], "123")
+            self.assertEqual(claims["client_id"], "client1")
+            self.assertEqual(claims["scope"], "read write")
+            self.assertEqual(claims["data"], {"name": "John"})
+            self.assertEqual(claims["exp"], claims["iat"] + 600)
+            self.assertEqual(claims["iss"], "https://auth.example.com")
+
+    def test_create_access_token_data(self):
+        generator = JwtTokenGenerator(self.ed25519_key)
+        generator.expires_in = {"password": 600}
+        generator.refresh_expires_in = 3600
+
+        result = generator.create_access_token_data(data=None, scopes=None, grant_type="password",
+                                                    user_id="user1", client_id="client1")
+        verifier = generator.verifier()
+
+        self.assertEqual(verifier.validate_token(result["access_token"], "access_token")["sub"], "user1")
+        self.assertEqual(verifier.validate_token(result["refresh_token"], "refresh_token")["sub"], "user1")
+        self.assertNotEqual(result["access_token"], generator.generate(grant_type="password", user_id="user1"))
+
+        with self.assertRaises(AccessTokenNotFound):
+            verifier.validate_token(result["refresh_token"], "access_token")
+
+    def test_pem_keys(self):
+        private_pem = self.ed25519_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                                     serialization.NoEncryption())
+        public_pem = self.ed25519_key.public_key().public_bytes(serialization.Encoding.PEM,
+                                                                serialization.PublicFormat.SubjectPublicKeyInfo)
+
+        token = JwtTokenGenerator(private_pem.decode("ascii")).generate(user_id="user1")
+
+        self.assertEqual(JwtTokenVerifier(keys={None: public_pem}).verify(token)["sub"], "user1")
+
+    def test_verifier_from_jwks(self):
+        ed25519_generator = JwtTokenGenerator(self.ed25519_key, key_id="ed")
+        es256_generator = JwtTokenGenerator(self.es256_key, key_id="es")
+        jwks = {"keys": [ed25519_generator.jwk(), es256_generator.jwk(), {"kty": "RSA", "kid": "rsa"}]}
+
+        verifier = JwtTokenVerifier.from_jwks(jwks)
+
+        self.assertEqual(jwks["keys"][0]["kty"], "OKP")
+        self.assertEqual(verifier.verify(ed25519_generator.generate(user_id="user1"))["sub"], "user1")
+        self.assertEqual(verifier.verify(es256_generator.generate(user_id="user2"))["sub"], "user2")
+
+    def test_verify_expired_token(self):
+        generator = JwtTokenGenerator(self.ed25519_key)
+        generator.expires_in = {"password": 60}
+        token = generator.generate(grant_type="password", user_id="user1")
+
+        with patch("oauth2.tokengenerator.time.time", return_value=time.time() + 120):
+            with self.assertRaises(AccessTokenNotFound):
+                generator.verifier().verify(token)
+
+            self.assertEqual(JwtTokenVerifier(keys={None: self.ed25519_key.public_key()}, leeway=120)
+                             .verify(token)["sub"], "user1")
+
+    def test_verify_invalid_token(self):
+        generator = JwtTokenGenerator(self.ed25519_key, key_id="k1", issuer="issuer")
+        token = generator.generate(user_id="user1")
+        header, claims, signature = token.split(".")
+
+        forged_header = b64encode(b'{"alg":"ES256","typ":"JWT","kid":"k1"}').decode("ascii")
+        none_header = b64encode(b'{"alg":"none","typ":"JWT","kid":"k1"}').decode("ascii")
+        other_claims = b64encode(b'{"type":"access_token","sub":"admin","iss":"issuer"}').decode("ascii")
+
+        verifier = generator.verifier()
+        other_verifier = JwtTokenVerifier(keys={"k1": ed25519.Ed25519PrivateKey.generate().public_key()})
+
+        for invalid in [header + "." + other_claims + "." + signature,
+                        forged_header + "." + claims + "." + signature,
+                        none_header + "." + claims + ".",
+                        header + "." + claims,
+                        "not a token", ""]:
+            with self.assertRaises(AccessTokenNotFound):
+                verifier.verify(invalid)
+
+        with self.assertRaises(AccessTokenNotFound):
+            other_verifier.verify(token)
+
+        with self.assertRaises(AccessTokenNotFound):
+            JwtTokenVerifier(keys={"k1": self.ed25519_key.public_key()}, issuer="other").verify(token)
+
 
 class URandomTokenGeneratorTestCase(unittest.TestCase):
     def test_generate(self):
@@ -128,6 +460,90 @@ class URandomTokenGeneratorTestCase(unittest.TestCase):
 
         self.assertTrue(isinstance(result, str))
         self.assertEqual(len(result), length)
+        self.assertRegex(result, r"^[a-f0-9]+$")
+
+    def test_generate_urlsafe(self):
+        generator = URandomTokenGenerator(length=43, urlsafe=True)
+
+        result = generator.generate()
+
+        self.assertEqual(len(result), 43)
+        self.assertRegex(result, r"^[A-Za-z0-9_\-]+$")
+        self.assertNotEqual(result, generator.generate())
+
+
+class EntropyPoolTestCase(unittest.TestCase):
+    def test_read(self):
+        pool = EntropyPool(block_size=64)
+
+        chunks = [pool.read(10) for _ in range(20)]
+
+        self.assertTrue(all(len(chunk) == 10 for chunk in chunks))
+        self.assertEqual(len(set(chunks)), 20)
+        self.assertEqual(len(pool.read(100)), 100)
+
+    def test_token_lengths(self):
+        pool = EntropyPool()
+
+        for length in [1, 7, 32, 65]:
+            self.assertEqual(len(pool.token_hex(length)), length)
+            self.assertEqual(len(pool.token_urlsafe(length)), length)
+
+    def test_reseed_after_fork(self):
+        pool = EntropyPool()
+        pool.read(8)
+
+        with patch("oauth2.tokengenerator.os.urandom", return_value=b"\x00" * pool.block_size) as urandom_mock:
+            with patch("oauth2.tokengenerator.os.getpid", return_value=-1):
+                self.assertEqual(pool.read(8), b"\x00" * 8)
+
+        urandom_mock.assert_called_once_with(pool.block_size)
+
+    @unittest.skipUnless(hasattr(os, "register_at_fork"), "os.register_at_fork() is not available")
+    def test_fork_while_locked(self):
+        pool = EntropyPool()
+        pool.read(8)
+
+        pool._lock.acquire()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                # The lock of the parent is held forever in the child, a deadlock is ended by the alarm.
+                signal.alarm(5)
+                os._exit(0 if len(pool.read(8)) == 8 else 1)
+        finally:
+            pool._lock.release()
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+
+    def test_threads_get_distinct_bytes(self):
+        pool = EntropyPool(block_size=256)
+        results = []
+
+        def issue():
+            results.extend(pool.token_hex(32) for _ in range(500))
+
+        threads = [threading.Thread(target=issue) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(results)), 2000)
+
+    def test_many(self):
+        pool = EntropyPool(block_size=64)
+
+        self.assertEqual(pool.token_hex_many(16, 0), [])
+        for tokens in [pool.token_hex_many(16, 50), pool.token_urlsafe_many(22, 50)]:
+            self.assertEqual(len(tokens), 50)
+            self.assertEqual(len(set(tokens)), 50)
+            self.assertTrue(all(len(token) for token in tokens))
+
+        uuids = pool.uuid4_many(10)
+        self.assertEqual(len(set(uuids)), 10)
+        self.assertTrue(all(uuid.UUID(value).version == 4 for value in uuids))
 
 
 class Uuid4TokenGeneratorTestCase(unittest.TestCase):
@@ -156,6 +572,18 @@ class Uuid4TokenGeneratorTestCase(unittest.TestCase):
         self.assertRegex(result["refresh_token"], self.uuid_regex)
         self.assertEqual(result["expires_in"], 600)
 
+    def test_create_access_token_data_many(self):
+        generator = Uuid4TokenGenerator()
+        generator.expires_in = {'test_grant_type': 600}
+
+        results = generator.create_access_token_data_many([dict(grant_type='test_grant_type'),
+                                                           dict(grant_type='other_grant_type')])
+
+        self.assertRegex(results[0]["access_token"], self.uuid_regex)
+        self.assertRegex(results[0]["refresh_token"], self.uuid_regex)
+        self.assertRegex(results[1]["access_token"], self.uuid_regex)
+        self.assertNotIn("refresh_token", results[1])
+
     def test_generate(self):
         generator = Uuid4TokenGenerator()
 
@@ -164,6 +592,8 @@ class Uuid4TokenGeneratorTestCase(unittest.TestCase):
         match = regex.match(result)
 
         self.assertEqual(result, match.group())
+        self.assertEqual(uuid.UUID(result).version, 4)
+        self.assertEqual(uuid.UUID(result).variant, uuid.RFC_4122)
 
 if __name__ == "__main__":
     unittest.main()
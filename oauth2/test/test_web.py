@@ -1,9 +1,16 @@
+import asyncio
+import threading
+from io import BytesIO
+
 from mock import Mock
 
 from oauth2 import Provider
+from oauth2.compatibility import json
 from oauth2.test import unittest
 from oauth2.web import Response
-from oauth2.web.wsgi import Application, Request
+from oauth2.web import asgi
+from oauth2.web.executor import DispatchExecutor
+from oauth2.web.wsgi import MAX_BODY_SIZE, Application, Request
 
 
 class RequestTestCase(unittest.TestCase):
@@ -40,11 +47,60 @@ class RequestTestCase(unittest.TestCase):
 
         request = Request(environment)
 
-        wsgi_input_mock.read.assert_called_with(int(content_length))
+        wsgi_input_mock.read.assert_not_called()
         self.assertEqual(request.method, request_method)
         self.assertEqual(request.query_params, {})
         self.assertEqual(request.query_string, query_string)
         self.assertEqual(request.post_params, {"foo": "bar", "baz": "buz"})
+        wsgi_input_mock.read.assert_called_with(int(content_length))
+
+    def test_params_decoded(self):
+        content = "redirect_uri=http%3A%2F%2Flocalhost%2Fcb&scope=a+b&empty=&scope=c".encode('utf-8')
+        environment = {"CONTENT_LENGTH": str(len(content)),
+                       "CONTENT_TYPE": "application/x-www-form-urlencoded",
+                       "REQUEST_METHOD": "POST",
+                       "QUERY_STRING": "state=%C3%A9t%C3%A9&client%5Fid=abc",
+                       "PATH_INFO": "/",
+                       "wsgi.input": BytesIO(content)}
+
+        request = Request(environment)
+
+        self.assertEqual(request.get_param("state"), u"\u00e9t\u00e9")
+        self.assertEqual(request.get_param("client_id"), "abc")
+        self.assertEqual(request.post_param("redirect_uri"), "http://localhost/cb")
+        self.assertEqual(request.post_param("scope"), "a b")
+        self.assertIsNone(request.post_param("empty"))
+
+    def test_body_not_read(self):
+        for content_length in [None, "abc", "-1", "101"]:
+            wsgi_input_mock = Mock(spec=["read"])
+            environment = {"CONTENT_TYPE": "application/x-www-form-urlencoded",
+                           "REQUEST_METHOD": "POST",
+                           "QUERY_STRING": "",
+                           "PATH_INFO": "/",
+                           "wsgi.input": wsgi_input_mock}
+            if content_length is not None:
+                environment["CONTENT_LENGTH"] = content_length
+
+            request = Request(environment, max_body_size=100)
+
+            self.assertIsNone(request.post_param("foo"))
+            wsgi_input_mock.read.assert_not_called()
+
+    def test_assign_params(self):
+        environment = {"REQUEST_METHOD": "GET",
+                       "QUERY_STRING": "foo=bar",
+                       "PATH_INFO": "/"}
+
+        request = Request(environment)
+        request.query_params = {"foo": "baz"}
+        request.post_params = {"grant_type": "password"}
+
+        self.assertEqual(request.get_param("foo"), "baz")
+        self.assertEqual(request.post_param("grant_type"), "password")
+
+        request.query_params["state"] = "xyz"
+        self.assertEqual(request.get_param("state"), "xyz")
 
     def test_get_param(self):
         request_method = "TEST"
@@ -105,6 +161,35 @@ class RequestTestCase(unittest.TestCase):
         self.assertEqual(request.header("unknown", default=0), 0)
 
 
+class ResponseTestCase(unittest.TestCase):
+    def test_body_str(self):
+        response = Response()
+        response.body = u"caf\u00e9"
+
+        self.assertEqual(response.body, u"caf\u00e9")
+        self.assertEqual(response.body_bytes, u"caf\u00e9".encode("utf-8"))
+
+    def test_body_bytes(self):
+        body = b'{"access_token":"abc"}'
+        response = Response()
+        response.body = body
+
+        self.assertIs(response.body_bytes, body)
+        self.assertEqual(response.body, '{"access_token":"abc"}')
+
+    def test_copy(self):
+        response = Response()
+        response.status_code = 400
+        response.body = b"{}"
+
+        copied = response.copy()
+        copied.add_header("Content-Type", "application/json")
+
+        self.assertEqual(copied.status_code, 400)
+        self.assertIs(copied.body_bytes, response.body_bytes)
+        self.assertEqual(response.headers, {"Content-Type": "text/html"})
+
+
 class ServerTestCase(unittest.TestCase):
     def test_call(self):
         body = "body"
@@ -119,7 +204,7 @@ class ServerTestCase(unittest.TestCase):
         request_class_mock = Mock(return_value=request_mock)
 
         response_mock = Mock(spec=Response)
-        response_mock.body = body
+        response_mock.body_bytes = body.encode('utf-8')
         response_mock.headers = headers
         response_mock.status_code = status_code
 
@@ -134,8 +219,286 @@ class ServerTestCase(unittest.TestCase):
         result = wsgi(environment, start_response_mock)
 
         request_class_mock.assert_called_with(environment)
+        self.assertEqual(request_mock.max_body_size, MAX_BODY_SIZE)
         provider_mock.dispatch.assert_called_with(request_mock,
                                                   {"myvar": "value"})
         start_response_mock.assert_called_with(http_code,
                                                list(headers.items()))
         self.assertEqual(result, [body.encode('utf-8')])
+
+    def test_call_body_above_default_size(self):
+        provider_mock = Mock(spec=Provider)
+        provider_mock.dispatch.return_value = Response()
+        wsgi = Application(provider=provider_mock, max_body_size=4 * MAX_BODY_SIZE)
+
+        body = ("grant_type=client_credentials&data=" + "x" * (2 * MAX_BODY_SIZE)).encode("utf-8")
+        environment = {"CONTENT_TYPE": "application/x-www-form-urlencoded",
+                       "CONTENT_LENGTH": str(len(body)),
+                       "REQUEST_METHOD": "POST",
+                       "QUERY_STRING": "",
+                       "PATH_INFO": "/token",
+                       "wsgi.input": BytesIO(body)}
+
+        wsgi(environment, Mock())
+
+        request = provider_mock.dispatch.call_args[0][0]
+        self.assertEqual(request.post_param("grant_type"), "client_credentials")
+
+    def test_call_request_class_without_max_body_size(self):
+        class EnvRequest(Request):
+            def __init__(self, env):
+                super().__init__(env)
+
+        provider_mock = Mock(spec=Provider)
+        provider_mock.dispatch.return_value = Response()
+        wsgi = Application(provider=provider_mock, request_class=EnvRequest, max_body_size=4 * MAX_BODY_SIZE)
+
+        wsgi({"REQUEST_METHOD": "GET", "QUERY_STRING": "", "PATH_INFO": "/token"}, Mock())
+
+        request = provider_mock.dispatch.call_args[0][0]
+        self.assertIsInstance(request, EnvRequest)
+        self.assertEqual(request.max_body_size, 4 * MAX_BODY_SIZE)
+
+    def test_call_empty_content_length(self):
+        provider_mock = Mock(spec=Provider)
+        provider_mock.dispatch.return_value = Response()
+        wsgi = Application(provider=provider_mock)
+
+        environment = {"CONTENT_TYPE": "application/x-www-form-urlencoded",
+                       "CONTENT_LENGTH": "",
+                       "REQUEST_METHOD": "POST",
+                       "QUERY_STRING": "",
+                       "PATH_INFO": "/token",
+                       "wsgi.input": BytesIO(b"")}
+        start_response_mock = Mock()
+
+        wsgi(environment, start_response_mock)
+
+        self.assertEqual(start_response_mock.call_args[0][0], "200 OK")
+        request = provider_mock.dispatch.call_args[0][0]
+        self.assertEqual(request.post_params, {})
+
+    def test_call_rejects_body(self):
+        provider_mock = Mock(spec=Provider)
+        wsgi = Application(provider=provider_mock, max_body_size=100)
+
+        for content_length, http_code in [(None, "411 Length Required"), ("abc", "400 Bad Request"),
+                                          ("101", "413 Payload Too Large")]:
+            environment = {"CONTENT_TYPE": "application/x-www-form-urlencoded",
+                           "REQUEST_METHOD": "POST",
+                           "QUERY_STRING": "",
+                           "PATH_INFO": "/token",
+                           "wsgi.input": Mock(spec=["read"])}
+            if content_length is not None:
+                environment["CONTENT_LENGTH"] = content_length
+            start_response_mock = Mock()
+
+            wsgi(environment, start_response_mock)
+
+            start_response_mock.assert_called_with(http_code, [("Content-type", "text/html")])
+            environment["wsgi.input"].read.assert_not_called()
+
+        provider_mock.dispatch.assert_not_called()
+
+
+class DispatchExecutorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.threads = []
+        self.timings = []
+
+        def dispatch(request, environ):
+            self.threads.append(threading.current_thread())
+            self.release.wait(5)
+            return Response()
+
+        self.provider = Mock(spec=Provider)
+        self.provider.dispatch.side_effect = dispatch
+        self.executor = DispatchExecutor(max_workers=1, max_queue=1,
+                                         on_timing=lambda *args: self.timings.append(args))
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown()
+
+    def test_dispatch(self):
+        self.release.set()
+        request = Mock()
+
+        response = asyncio.run(self.executor.dispatch(self.provider, request, {}))
+
+        self.assertEqual(response.status_code, 200)
+        self.provider.dispatch.assert_called_with(request, {})
+        self.assertNotEqual(self.threads, [threading.current_thread()])
+        self.assertEqual(len(self.timings), 1)
+        self.assertIs(self.timings[0][0], request)
+        self.assertIs(self.timings[0][1], response)
+        self.assertEqual(self.executor.pending, 0)
+
+    def test_dispatch_overloaded(self):
+        async def run():
+            running = asyncio.ensure_future(self.executor.dispatch(self.provider, Mock(), {}))
+            queued = asyncio.ensure_future(self.executor.dispatch(self.provider, Mock(), {}))
+            await asyncio.sleep(0)
+
+            rejected = await self.executor.dispatch(self.provider, Mock(), {})
+            self.release.set()
+
+            return rejected, await running, await queued
+
+        rejected, running, queued = asyncio.run(run())
+
+        self.assertEqual(rejected.status_code, 503)
+        self.assertEqual(rejected.headers["Retry-After"], "1")
+        self.assertEqual(json.loads(rejected.body)["error"], "temporarily_unavailable")
+        self.assertEqual(running.status_code, 200)
+        self.assertEqual(queued.status_code, 200)
+        self.assertEqual(self.provider.dispatch.call_count, 2)
+        self.assertEqual(self.executor.pending, 0)
+
+
+class AsgiClient(object):
+    """
+    Calls an ASGI application in process.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, path, query_string=b"", headers=(), chunks=()):
+        scope = {"type": "http", "method": method, "path": path, "query_string": query_string,
+                 "headers": list(headers)}
+        messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+        messages.append({"type": "http.request", "body": b"", "more_body": False})
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(0)
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(self.app(scope, receive, send))
+
+        return sent
+
+
+class AsgiRequestTestCase(unittest.TestCase):
+    def test_get_param(self):
+        request = asgi.Request({"method": "GET", "path": "/authorize", "query_string": b"foo=bar+baz&x=%3D",
+                                "headers": []})
+
+        self.assertEqual(request.get_param("foo"), "bar baz")
+        self.assertEqual(request.get_param("x"), "=")
+        self.assertEqual(request.get_param("missing", "default"), "default")
+
+    def test_post_param(self):
+        request = asgi.Request({"method": "POST", "path": "/token", "query_string": b"",
+                                "headers": [(b"content-type", b"application/x-www-form-urlencoded")]},
+                               body=b"foo=bar%21")
+
+        self.assertEqual(request.post_param("foo"), "bar!")
+        self.assertEqual(request.post_param("missing"), None)
+
+    def test_post_param_not_form(self):
+        request = asgi.Request({"method": "POST", "path": "/token", "query_string": b"",
+                                "headers": [(b"content-type", b"application/json")]}, body=b"foo=bar")
+
+        self.assertEqual(request.post_param("foo"), None)
+
+    def test_header(self):
+        request = asgi.Request({"method": "GET", "path": "/token", "headers": [(b"authorization", b"Basic abc"),
+                                                                                (b"authorization", b"Other")]})
+
+        self.assertEqual(request.header("authorization"), "Basic abc")
+        self.assertEqual(request.header("Authorization"), "Basic abc")
+        self.assertEqual(request.header("x-missing", "default"), "default")
+
+
+class AsgiApplicationTestCase(unittest.TestCase):
+    form_headers = [(b"content-type", b"application/x-www-form-urlencoded")]
+
+    def setUp(self):
+        self.response = Response()
+        self.response.status_code = 200
+        self.response.add_header("X-Test", "abc")
+        self.response.body = b'{"access_token": "abc"}'
+
+        async def dispatch_async(request, environ):
+            self.request = request
+            return self.response
+
+        self.provider = Mock(spec=Provider)
+        self.provider.dispatch_async.side_effect = dispatch_async
+        self.client = AsgiClient(asgi.Application(provider=self.provider, max_body_size=20))
+
+    def test_dispatch(self):
+        start, body = self.client.request("POST", "/token", headers=self.form_headers,
+                                          chunks=[b"grant_type=", b"password"])
+
+        self.assertEqual(start["type"], "http.response.start")
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"x-test", b"abc"), start["headers"])
+        self.assertIn((b"content-type", b"text/html"), start["headers"])
+        self.assertIn((b"content-length", b"23"), start["headers"])
+        self.assertEqual(body, {"type": "http.response.body", "body": b'{"access_token": "abc"}'})
+        self.assertEqual(self.request.post_param("grant_type"), "password")
+
+    def test_dispatch_get(self):
+        self.client.request("GET", "/authorize", query_string=b"response_type=code")
+
+        self.assertEqual(self.request.get_param("response_type"), "code")
+        self.assertEqual(self.provider.authorize_path, "/authorize")
+        self.assertEqual(self.provider.token_path, "/token")
+
+    def test_dispatch_executor(self):
+        self.provider.dispatch.return_value = self.response
+        executor = DispatchExecutor(max_workers=1)
+        client = AsgiClient(asgi.Application(provider=self.provider, executor=executor))
+
+        start, _ = client.request("POST", "/token", headers=self.form_headers, chunks=[b"grant_type=password"])
+        executor.shutdown()
+
+        self.assertEqual(start["status"], 200)
+        self.assertEqual(self.provider.dispatch.call_count, 1)
+        self.assertFalse(self.provider.dispatch_async.called)
+
+    def test_not_found(self):
+        start, body = self.client.request("GET", "/other")
+
+        self.assertEqual(start["status"], 404)
+        self.assertEqual(body["body"], b"Not Found")
+        self.assertFalse(self.provider.dispatch_async.called)
+
+    def test_content_length_too_big(self):
+        start, _ = self.client.request("POST", "/token", headers=self.form_headers + [(b"content-length", b"21")])
+
+        self.assertEqual(start["status"], 413)
+        self.assertFalse(self.provider.dispatch_async.called)
+
+    def test_content_length_invalid(self):
+        start, _ = self.client.request("POST", "/token", headers=self.form_headers + [(b"content-length", b"abc")])
+
+        self.assertEqual(start["status"], 400)
+
+    def test_streamed_body_too_big(self):
+        start, _ = self.client.request("POST", "/token", headers=self.form_headers,
+                                       chunks=[b"grant_type=", b"password&x=12"])
+
+        self.assertEqual(start["status"], 413)
+        self.assertFalse(self.provider.dispatch_async.called)
+
+    def test_lifespan(self):
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(self.client.app({"type": "lifespan"}, receive, send))
+
+        self.assertEqual(sent, [{"type": "lifespan.startup.complete"}, {"type": "lifespan.shutdown.complete"}])
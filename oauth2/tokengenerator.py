@@ -2,19 +2,58 @@
 Provides various implementations of algorithms to generate an Access Token or Refresh Token.
 """
 
+import binascii
 import hashlib
+import hmac
+import json
 import os
+import struct
+import threading
+import time
 import uuid
+import weakref
+import zlib
+from datetime import datetime, timezone
 
-import itsdangerous
 from oauth2.error import AccessTokenNotFound
 
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
+except ImportError:  # pragma: no cover
+    ed25519 = None
+
+# Timestamps of stateless tokens are counted from 2011/01/01 UTC, like itsdangerous 0.24 does.
+EPOCH = 1293840000
+
+_B64_TO_URLSAFE = bytes.maketrans(b"+/", b"-_")
+_URLSAFE_TO_B64 = bytes.maketrans(b"-_", b"+/")
+
+
+def b64encode(data):
+    """
+    URL-safe base64 encoding without padding.
+    """
+    return binascii.b2a_base64(data, newline=False).translate(_B64_TO_URLSAFE).rstrip(b"=")
+
+
+def b64decode(data):
+    """
+    Reverse of :func:`b64encode`.
+    """
+    return binascii.a2b_base64(data.translate(_URLSAFE_TO_B64) + b"=" * (-len(data) % 4))
+
 
 class TokenGenerator(object):
     """
     Base class of every token generator.
     """
 
+    #: Whether tokens can carry their scopes as the integer mask of a grant with ``scope_masks=True``.
+    supports_scope_masks = True
+
     def __init__(self):
         """
         Create a new instance of a token generator.
@@ -49,6 +88,58 @@ class TokenGenerator(object):
 
         return result
 
+    def create_access_token_data_many(self, requests):
+        """
+        Create data needed by many access tokens at once.
+
+        :param requests: ``dict`` objects with the arguments of :meth:`create_access_token_data`
+                         (``data``, ``scopes``, ``grant_type``, ``user_id``, ``client_id``).
+                         Missing arguments default to ``None``.
+        :type requests: list
+
+        :return: A ``list`` of ``dict`` as returned by :meth:`create_access_token_data`, in the order of ``requests``.
+        :rtype: list
+        """
+        requests = list(requests)
+        expires_in = [self.expires_in.get(request.get("grant_type")) for request in requests]
+
+        access_tokens = self.generate_many(requests)
+        refresh_tokens = iter(self.refresh_generate_many(
+            [request for request, grant_expires_in in zip(requests, expires_in) if grant_expires_in]))
+
+        results = []
+        for access_token, grant_type_expires_in in zip(access_tokens, expires_in):
+            result = {"access_token": access_token, "token_type": "Bearer"}
+
+            if grant_type_expires_in:
+                result["refresh_token"] = next(refresh_tokens)
+                result["expires_in"] = grant_type_expires_in
+
+            results.append(result)
+
+        return results
+
+    def generate_many(self, requests):
+        """
+        Generates a token for each of ``requests``.
+        Generators override this to share work between tokens.
+
+        :param requests: ``dict`` objects with the arguments of :meth:`generate`.
+        :type requests: list
+
+        :return: A ``list`` of tokens.
+        :rtype: list
+        """
+        return [self.generate(request.get("grant_type"), request.get("data"), request.get("scopes"),
+                              request.get("user_id"), request.get("client_id")) for request in requests]
+
+    def refresh_generate_many(self, requests):
+        """
+        Like :meth:`generate_many` for refresh tokens.
+        """
+        return [self.refresh_generate(request.get("grant_type"), request.get("data"), request.get("scopes"),
+                                      request.get("user_id"), request.get("client_id")) for request in requests]
+
     def generate(self, grant_type=None, data=None, scopes=None, user_id=None, client_id=None):
         """
         Implemented by generators extending this base class.
@@ -88,33 +179,604 @@ class TokenGenerator(object):
         raise NotImplementedError
 
 
+# Length of the truncated HMAC-SHA256 that authenticates compact tokens.
+COMPACT_TAG_SIZE = 16
+
+_CUSTOM_GRANT = 255
+
+# Set in the token type byte of compact tokens whose scopes are an integer mask.
+_SCOPE_MASK = 0x80
+
+_TAG_NONE, _TAG_FALSE, _TAG_TRUE, _TAG_INT, _TAG_FLOAT, _TAG_STR, _TAG_LIST, _TAG_DICT, _TAG_UUID = range(9)
+
+_double = struct.Struct(">d")
+
+_json_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _pack_varint(value, out):
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _unpack_varint(buf, pos):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _pack_str(value, out):
+    encoded = value.encode("utf-8")
+    _pack_varint(len(encoded), out)
+    out += encoded
+
+
+def _unpack_str(buf, pos):
+    length, pos = _unpack_varint(buf, pos)
+    end = pos + length
+    if end > len(buf):
+        raise IndexError
+    return buf[pos:end].decode("utf-8"), end
+
+
+def _pack_value(value, out):
+    """
+    Appends the tagged encoding of a JSON compatible value to ``out``.
+    """
+    if value is None:
+        out.append(_TAG_NONE)
+    elif value is True:
+        out.append(_TAG_TRUE)
+    elif value is False:
+        out.append(_TAG_FALSE)
+    elif isinstance(value, str):
+        out.append(_TAG_STR)
+        _pack_str(value, out)
+    elif isinstance(value, int):
+        out.append(_TAG_INT)
+        _pack_varint(value << 1 if value >= 0 else (-value << 1) - 1, out)  # zigzag
+    elif isinstance(value, float):
+        out.append(_TAG_FLOAT)
+        out += _double.pack(value)
+    elif isinstance(value, dict):
+        out.append(_TAG_DICT)
+        _pack_varint(len(value), out)
+        for key, item in value.items():
+            _pack_str(str(key), out)
+            _pack_value(item, out)
+    elif isinstance(value, (list, tuple)):
+        out.append(_TAG_LIST)
+        _pack_varint(len(value), out)
+        for item in value:
+            _pack_value(item, out)
+    elif isinstance(value, uuid.UUID):
+        out.append(_TAG_UUID)
+        out += value.bytes
+    else:
+        raise TypeError("Object of type '{0}' cannot be stored in a compact token".format(type(value).__name__))
+
+
+def _unpack_value(buf, pos):
+    tag = buf[pos]
+    pos += 1
+
+    if tag == _TAG_STR:
+        return _unpack_str(buf, pos)
+    elif tag == _TAG_INT:
+        value, pos = _unpack_varint(buf, pos)
+        return (value >> 1) ^ -(value & 1), pos
+    elif tag == _TAG_NONE:
+        return None, pos
+    elif tag == _TAG_TRUE:
+        return True, pos
+    elif tag == _TAG_FALSE:
+        return False, pos
+    elif tag == _TAG_DICT:
+        count, pos = _unpack_varint(buf, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _unpack_str(buf, pos)
+            result[key], pos = _unpack_value(buf, pos)
+        return result, pos
+    elif tag == _TAG_LIST:
+        count, pos = _unpack_varint(buf, pos)
+        result = []
+        for _ in range(count):
+            item, pos = _unpack_value(buf, pos)
+            result.append(item)
+        return result, pos
+    elif tag == _TAG_FLOAT:
+        return _double.unpack_from(buf, pos)[0], pos + 8
+    elif tag == _TAG_UUID:
+        if pos + 16 > len(buf):
+            raise IndexError
+        return str(uuid.UUID(bytes=bytes(buf[pos:pos + 16]))), pos + 16
+
+    raise ValueError("Unknown tag {0}".format(tag))
+
+
+class TokenSigner(object):
+    """
+    Signs and verifies payloads in the format of ``itsdangerous.URLSafeTimedSerializer``.
+
+    The signing key is derived once from the secret and the prepared HMAC state is copied
+    for every signature, so tokens issued by earlier versions stay valid.
+
+    :param secret_key: The secret used to sign tokens.
+    :type secret_key: str
+    """
+    salt = b"itsdangerous"
+
+    def __init__(self, secret_key):
+        if isinstance(secret_key, str):
+            secret_key = secret_key.encode("utf-8")
+
+        derived_key = hashlib.sha1(self.salt + b"signer" + secret_key).digest()
+
+        self._mac = hmac.new(derived_key, digestmod=hashlib.sha1)
+        self._compact_mac = hmac.new(hashlib.sha256(b"oauth2.compact" + secret_key).digest(), digestmod=hashlib.sha256)
+        self._decode = json.JSONDecoder().decode
+
+    def signature(self, value):
+        """
+        :return: The URL-safe signature of ``value``.
+        :rtype: bytes
+        """
+        mac = self._mac.copy()
+        mac.update(value)
+        return b64encode(mac.digest())
+
+    def dumps(self, obj):
+        """
+        Serializes ``obj`` and signs it together with the current time.
+
+        :return: The signed token.
+        :rtype: str
+        """
+        payload = _json_encode(obj).encode("utf-8")
+        # The fastest level shrinks short JSON payloads as well as the default level does.
+        compressed = zlib.compress(payload, 1)
+
+        if len(compressed) < len(payload) - 1:
+            value = b"." + b64encode(compressed)
+        else:
+            value = b64encode(payload)
+
+        timestamp = int(time.time() - EPOCH)
+        value += b"." + b64encode(timestamp.to_bytes((timestamp.bit_length() + 7) // 8, "big"))
+
+        return (value + b"." + self.signature(value)).decode("ascii")
+
+    def loads(self, token):
+        """
+        Verifies a token created by :meth:`dumps`.
+
+        :return: A tuple ``(payload, issued_at)`` with ``issued_at`` as a unix timestamp.
+        :rtype: tuple
+
+        :raises oauth2.error.AccessTokenNotFound: If the token is malformed or the signature does not match.
+        """
+        try:
+            if isinstance(token, str):
+                token = token.encode("ascii")
+
+            value, signature = token.rsplit(b".", 1)
+            if not hmac.compare_digest(signature, self.signature(value)):
+                raise AccessTokenNotFound
+
+            payload, timestamp = value.rsplit(b".", 1)
+            if payload[:1] == b".":
+                payload = zlib.decompress(b64decode(payload[1:]))
+            else:
+                payload = b64decode(payload)
+
+            return self._decode(payload.decode("utf-8")), int.from_bytes(b64decode(timestamp), "big") + EPOCH
+        except (ValueError, binascii.Error, zlib.error):
+            raise AccessTokenNotFound
+
+    def seal(self, blob):
+        """
+        Signs a binary payload as created by :class:`CompactTokenFormat`.
+
+        :return: The URL-safe token.
+        :rtype: str
+        """
+        mac = self._compact_mac.copy()
+        mac.update(blob)
+        return b64encode(blob + mac.digest()[:COMPACT_TAG_SIZE]).decode("ascii")
+
+    def unseal(self, token):
+        """
+        Verifies a token created by :meth:`seal`.
+
+        :return: The binary payload.
+        :rtype: bytes
+
+        :raises oauth2.error.AccessTokenNotFound: If the token is malformed or the signature does not match.
+        """
+        try:
+            if isinstance(token, str):
+                token = token.encode("ascii")
+            sealed = b64decode(token)
+        except (ValueError, binascii.Error):
+            raise AccessTokenNotFound
+
+        blob = sealed[:-COMPACT_TAG_SIZE]
+        mac = self._compact_mac.copy()
+        mac.update(blob)
+        if len(blob) == 0 or not hmac.compare_digest(sealed[-COMPACT_TAG_SIZE:], mac.digest()[:COMPACT_TAG_SIZE]):
+            raise AccessTokenNotFound
+
+        return blob
+
+
+class CompactTokenFormat(object):
+    """
+    Binary layout of stateless tokens, selected with ``StatelessTokenGenerator(token_format="compact")``.
+
+    A token starts with a fixed header of version, token type, grant and issue time, followed by
+    user id, client id, scopes and data in a small tagged encoding. Scopes listed in ``scopes``
+    are stored by their position in the list, so entries may only ever be appended to it. Scopes
+    issued as an integer mask (see :class:`oauth2.grant.ScopePolicy`) are stored as a single number.
+
+    :param scopes: Known scopes that are encoded as an integer id.
+    :type scopes: list
+    """
+    version = 1
+
+    header = struct.Struct(">BBBI")
+
+    token_types = ("access_token", "refresh_token")
+
+    grant_types = (None, "authorization_code", "implicit", "password", "client_credentials", "refresh_token")
+
+    def __init__(self, scopes=None):
+        self.scopes = list(scopes) if scopes else []
+        self._scope_ids = dict((scope, index) for index, scope in enumerate(self.scopes))
+        self._grant_ids = dict((grant_type, index) for index, grant_type in enumerate(self.grant_types))
+
+    def encode(self, token_type, grant_type, data, scopes, user_id, client_id, issued_at):
+        """
+        :return: The binary payload of a token.
+        :rtype: bytes
+        """
+        grant_id = self._grant_ids.get(grant_type, _CUSTOM_GRANT)
+        type_id = self.token_types.index(token_type)
+        if isinstance(scopes, int):
+            type_id |= _SCOPE_MASK
+        out = bytearray(self.header.pack(self.version, type_id, grant_id, issued_at))
+
+        if grant_id == _CUSTOM_GRANT:
+            _pack_value(grant_type, out)
+
+        _pack_value(user_id, out)
+        _pack_value(client_id, out)
+
+        if type_id & _SCOPE_MASK:
+            _pack_varint(scopes, out)
+        elif scopes:
+            _pack_varint(len(scopes), out)
+            for scope in scopes:
+                scope_id = self._scope_ids.get(scope)
+                if scope_id is None:
+                    encoded = scope.encode("utf-8")
+                    _pack_varint(len(encoded) << 1 | 1, out)
+                    out += encoded
+                else:
+                    _pack_varint(scope_id << 1, out)
+        else:
+            out.append(0)
+
+        _pack_value(data, out)
+
+        return bytes(out)
+
+    def decode(self, blob):
+        """
+        Reverse of :meth:`encode`.
+
+        :return: A tuple ``(payload, issued_at)`` where payload contains the same keys as a JSON token.
+        :rtype: tuple
+
+        :raises oauth2.error.AccessTokenNotFound: If the payload cannot be decoded.
+        """
+        try:
+            version, type_id, grant_id, issued_at = self.header.unpack_from(blob)
+            if version != self.version:
+                raise AccessTokenNotFound
+
+            payload = {"type": self.token_types[type_id & ~_SCOPE_MASK]}
+            pos = self.header.size
+
+            if grant_id == _CUSTOM_GRANT:
+                grant_type, pos = _unpack_value(blob, pos)
+            else:
+                grant_type = self.grant_types[grant_id]
+
+            user_id, pos = _unpack_value(blob, pos)
+            client_id, pos = _unpack_value(blob, pos)
+
+            if type_id & _SCOPE_MASK:
+                scopes, pos = _unpack_varint(blob, pos)
+            else:
+                count, pos = _unpack_varint(blob, pos)
+                scopes = []
+                for _ in range(count):
+                    value, pos = _unpack_varint(blob, pos)
+                    if value & 1:
+                        end = pos + (value >> 1)
+                        scopes.append(blob[pos:end].decode("utf-8"))
+                        pos = end
+                    else:
+                        scopes.append(self.scopes[value >> 1])
+
+            data, pos = _unpack_value(blob, pos)
+        except (IndexError, ValueError, struct.error):
+            raise AccessTokenNotFound
+
+        if pos != len(blob):
+            raise AccessTokenNotFound
+
+        # Empty values are left out like in JSON tokens.
+        for key, value in (("grant_type", grant_type), ("user_id", user_id), ("data", data), ("scopes", scopes),
+                           ("client_id", client_id)):
+            if value:
+                payload[key] = value
+
+        return payload, issued_at
+
+
+class KeyRing(object):
+    """
+    Secrets of a :class:`StatelessTokenGenerator` indexed by key id.
+
+    New tokens are signed with the active key and carry its id as a prefix (``<key id>~<token>``),
+    so verification looks up the matching key directly. All other keys only verify tokens.
+    Tokens without a prefix, issued before a key ring was used, belong to the key with id ``None``.
+
+    Keys can be added, activated and removed at runtime::
+
+        keyring = KeyRing({None: "old-secret", "2024-06": "new-secret"}, active_key_id="2024-06")
+        token_generator = StatelessTokenGenerator(keyring)
+
+        keyring.add_key("2024-12", "newer-secret")
+        keyring.activate("2024-12")
+
+    :param keys: A ``dict`` mapping key ids to secrets.
+    :type keys: dict
+    :param active_key_id: Id of the key that signs new tokens.
+    :type active_key_id: str
+    """
+    separator = "~"
+
+    def __init__(self, keys, active_key_id=None):
+        self._signers = {}
+        self.active = None
+
+        for key_id, secret_key in keys.items():
+            self.add_key(key_id, secret_key)
+
+        self.activate(active_key_id)
+
+    def add_key(self, key_id, secret_key):
+        """
+        Adds a verify-only key. The signing key is derived right away.
+        """
+        if key_id is not None and (not key_id or self.separator in key_id or "." in key_id):
+            raise ValueError("Invalid key id '{0}'".format(key_id))
+
+        self._signers[key_id] = TokenSigner(secret_key)
+
+    def remove_key(self, key_id):
+        """
+        Removes a key. Tokens signed with it are no longer valid.
+        """
+        if self.active is not None and self.active[0] == key_id:
+            raise ValueError("Cannot remove the active key '{0}'".format(key_id))
+
+        self._signers.pop(key_id, None)
+
+    def activate(self, key_id):
+        """
+        Signs new tokens with the key ``key_id``.
+        """
+        if key_id not in self._signers:
+            raise KeyError(key_id)
+
+        prefix = "" if key_id is None else key_id + self.separator
+        # A single assignment lets other threads switch over atomically.
+        self.active = (key_id, prefix, self._signers[key_id])
+
+    def find(self, token):
+        """
+        Looks up the key named in the prefix of a token.
+
+        :return: A tuple ``(signer, token)`` of the :class:`TokenSigner` and the token without prefix.
+        :rtype: tuple
+
+        :raises oauth2.error.AccessTokenNotFound: If the key is unknown.
+        """
+        key_id, separator, token = token.rpartition(self.separator)
+        signer = self._signers.get(key_id if separator else None)
+
+        if signer is None:
+            raise AccessTokenNotFound
+
+        return signer, token
+
+
 class StatelessTokenGenerator(TokenGenerator):
     """
     Generate a token using JSON Web Tokens tokens.
+
+    :param secret_key: The secret used to sign tokens, or a :class:`KeyRing` to rotate secrets.
+    :type secret_key: str
+    :param token_format: ``"json"`` (default) issues tokens compatible with itsdangerous,
+                         ``"compact"`` issues the shorter binary tokens of :class:`CompactTokenFormat`.
+                         Tokens of both formats are accepted by :meth:`validate_token`.
+    :type token_format: str
+    :param scopes: Known scopes that compact tokens store as an integer id. Only append to this list.
+    :type scopes: list
+    :param revocation_list: Revoked tokens, e.g. an :class:`oauth2.store.stateless.RevocationList`.
+                            Tokens in it are rejected by :meth:`validate_token`. (optional)
     """
 
-    def __init__(self, secret_key):
-        self.serializer = itsdangerous.URLSafeTimedSerializer(secret_key)
+    token_formats = ("json", "compact")
+
+    def __init__(self, secret_key, token_format="json", scopes=None, revocation_list=None):
+        if token_format not in self.token_formats:
+            raise ValueError("Unknown token format '{0}'".format(token_format))
+
+        self.keyring = secret_key if isinstance(secret_key, KeyRing) else KeyRing({None: secret_key})
+        self.token_format = token_format
+        self.compact_format = CompactTokenFormat(scopes)
+        self.revocation_list = revocation_list
         TokenGenerator.__init__(self)
 
+    @staticmethod
+    def token_id(token):
+        """
+        :return: The signature part of a token, which identifies it.
+        :rtype: str
+        """
+        return token.rpartition(".")[2]
+
+    def revoke(self, token):
+        """
+        Adds a valid token to the revocation list.
+
+        The token is kept in the list until it would have expired anyway:
+        ``expires_in`` of its grant type after it was issued for access tokens,
+        ``refresh_expires_in`` for refresh tokens. Tokens that never expire are kept forever.
+
+        :param token: The access or refresh token to revoke.
+        :type token: str
+
+        :raises: :class:`oauth2.error.AccessTokenNotFound` if the token is invalid or already revoked.
+        """
+        if self.revocation_list is None:
+            raise ValueError("StatelessTokenGenerator has no revocation list")
+
+        payload, issued_at = self._load(token)
+
+        if payload["type"] == "refresh_token":
+            expires_in = self.refresh_expires_in
+        else:
+            expires_in = self.expires_in.get(payload.get("grant_type"))
+
+        self.revocation_list.revoke(self.token_id(token), issued_at + expires_in if expires_in else 0)
+
     def json_serialize(self, data):
         _data = dict((k, v) for k, v in data.items() if v)  # Remove empty val
-        return self.serializer.dumps(_data)
+        _, prefix, signer = self.keyring.active
+        return prefix + signer.dumps(_data)
 
     def unserialize(self, serialized):
-        try:
-            payload, timestamp = self.serializer.loads(serialized, return_timestamp=True)
-            payload["refresh_expires_at"] = timestamp
-            return payload
-        except (itsdangerous.BadSignature, itsdangerous.SignatureExpired):
-            raise AccessTokenNotFound
+        payload, _ = self._load(serialized)
+        return payload
 
-    def validate_token(self, token, token_type):
-        payload = self.unserialize(token)
+    def validate_token(self, token, token_type, return_timestamp=False):
+        """
+        Checks the signature and the type of a token.
+
+        :param token: The token to validate.
+        :type token: str
+        :param token_type: Expected type of the token, ``access_token`` or ``refresh_token``.
+        :type token_type: str
+        :param return_timestamp: Also return the time the token was issued at, in seconds since the epoch.
+        :type return_timestamp: bool
+
+        :return: The payload of the token, or a tuple ``(payload, issued_at)`` if ``return_timestamp`` is set.
+
+        :raises: :class:`oauth2.error.AccessTokenNotFound` if the token is invalid.
+        """
+        payload, issued_at = self._load(token)
         if payload['type'] != token_type:
             raise AccessTokenNotFound
+        if return_timestamp:
+            return payload, issued_at
         return payload
 
+    def validate_many(self, tokens, token_type, executor=None, chunk_size=512):
+        """
+        Validates a batch of tokens without raising an exception for invalid ones.
+
+        A token that appears several times in a batch is verified once and shares its payload.
+        Pass an executor, e.g. a ``concurrent.futures.ThreadPoolExecutor``, to validate batches
+        larger than ``chunk_size`` in parallel chunks. This pays off for large tokens only,
+        as ``hashlib`` releases the GIL for inputs above 2 KiB.
+
+        :param tokens: A list of tokens.
+        :type tokens: list
+        :param token_type: Expected type of the tokens, ``access_token`` or ``refresh_token``.
+        :type token_type: str
+        :param executor: Executor to spread large batches over. (optional)
+        :type executor: concurrent.futures.Executor
+        :param chunk_size: Number of tokens validated per task of the executor.
+        :type chunk_size: int
+
+        :return: A tuple ``(payload, error)`` for every token, in the order of ``tokens``.
+                 Either ``payload`` is ``None`` and ``error`` an instance of
+                 :class:`oauth2.error.AccessTokenNotFound`, or ``error`` is ``None``.
+        :rtype: list
+        """
+        distinct = list(dict.fromkeys(tokens))
+
+        if executor is None or len(distinct) <= chunk_size:
+            validated = self._validate_chunk(distinct, token_type)
+        else:
+            chunks = [distinct[i:i + chunk_size] for i in range(0, len(distinct), chunk_size)]
+
+            validated = []
+            for chunk_results in executor.map(self._validate_chunk, chunks, [token_type] * len(chunks)):
+                validated.extend(chunk_results)
+
+        if len(distinct) == len(tokens):
+            return validated
+
+        results = dict(zip(distinct, validated))
+        return [results[token] for token in tokens]
+
+    def _load(self, serialized):
+        if self.revocation_list is not None and self.token_id(serialized) in self.revocation_list:
+            raise AccessTokenNotFound
+
+        signer, token = self.keyring.find(serialized)
+
+        # Compact tokens start with the version byte, JSON tokens with '{' or the '.' compression marker.
+        if token[:1] == "A":
+            payload, issued_at = self.compact_format.decode(signer.unseal(token))
+        else:
+            payload, issued_at = signer.loads(token)
+        payload["refresh_expires_at"] = datetime.fromtimestamp(issued_at, timezone.utc).replace(tzinfo=None)
+        return payload, issued_at
+
+    def _validate_chunk(self, tokens, token_type):
+        unserialize = self.unserialize
+        results = []
+
+        for token in tokens:
+            try:
+                payload = unserialize(token)
+            except AccessTokenNotFound as error:
+                results.append((None, error))
+            except (TypeError, AttributeError):  # not a string
+                results.append((None, AccessTokenNotFound()))
+            else:
+                if payload["type"] == token_type:
+                    results.append((payload, None))
+                else:
+                    results.append((None, AccessTokenNotFound()))
+
+        return results
+
     def generate(self, grant_type=None, data=None, scopes=None, user_id=None, client_id=None):
         """
         :return: A new token
@@ -122,27 +784,504 @@ class StatelessTokenGenerator(TokenGenerator):
         """
         # We use the same generator for code and access_token
         # JWT will return the same code for different user
-        user_id = user_id if user_id else str(uuid.uuid4())
+        if not user_id:
+            user_id = uuid.uuid4() if self.token_format == "compact" else str(uuid.uuid4())
 
-        return self.json_serialize(dict(type='access_token', grant_type=grant_type, user_id=user_id, data=data,
-                                        scopes=scopes, client_id=client_id))
+        return self._sign('access_token', grant_type, data, scopes, user_id, client_id)
 
     def refresh_generate(self, grant_type=None, data=None, scopes=None, user_id=None, client_id=None):
         """
         :return: A new refresh token
         :rtype: str
         """
-        return self.json_serialize(dict(type='refresh_token', grant_type=grant_type, user_id=user_id, data=data,
-                                        scopes=scopes, client_id=client_id))
+        return self._sign('refresh_token', grant_type, data, scopes, user_id, client_id)
+
+    def generate_many(self, requests):
+        return self._sign_many('access_token', requests)
+
+    def refresh_generate_many(self, requests):
+        return self._sign_many('refresh_token', requests)
+
+    def _sign_many(self, token_type, requests):
+        # One key and one issue time for the whole batch.
+        _, prefix, signer = self.keyring.active
+        compact = self.token_format == "compact"
+        issued_at = int(time.time())
+        tokens = []
+
+        for request in requests:
+            user_id = request.get("user_id")
+            if not user_id and token_type == 'access_token':
+                user_id = uuid.uuid4() if compact else str(uuid.uuid4())
+
+            if compact:
+                token = signer.seal(self.compact_format.encode(
+                    token_type, request.get("grant_type"), request.get("data"), request.get("scopes"), user_id,
+                    request.get("client_id"), issued_at))
+            else:
+                token = signer.dumps(self._payload(token_type, request.get("grant_type"), request.get("data"),
+                                                   request.get("scopes"), user_id, request.get("client_id")))
+            tokens.append(prefix + token)
+
+        return tokens
+
+    def _sign(self, token_type, grant_type, data, scopes, user_id, client_id):
+        _, prefix, signer = self.keyring.active
+
+        if self.token_format == "compact":
+            return prefix + signer.seal(self.compact_format.encode(token_type, grant_type, data, scopes, user_id,
+                                                                   client_id, int(time.time())))
+
+        return prefix + signer.dumps(self._payload(token_type, grant_type, data, scopes, user_id, client_id))
+
+    @staticmethod
+    def _payload(token_type, grant_type, data, scopes, user_id, client_id):
+        # Empty values are left out, in the same order json_serialize() would keep them.
+        payload = {'type': token_type}
+        if grant_type:
+            payload['grant_type'] = grant_type
+        if user_id:
+            payload['user_id'] = user_id
+        if data:
+            payload['data'] = data
+        if scopes:
+            payload['scopes'] = scopes
+        if client_id:
+            payload['client_id'] = client_id
+        return payload
+
+
+def _load_private_key(key):
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    if isinstance(key, bytes):
+        key = serialization.load_pem_private_key(key, password=None)
+    return key
+
+
+def _load_public_key(key):
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    if isinstance(key, bytes):
+        key = serialization.load_pem_public_key(key)
+    return key
+
+
+def _jwt_algorithm(key):
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and key.curve.name == "secp256r1":
+        return "ES256"
+    raise ValueError("Only Ed25519 and P-256 keys are supported")
+
+
+def public_key_to_jwk(public_key, key_id=None):
+    """
+    Converts an Ed25519 or P-256 public key into a JSON Web Key.
+
+    :return: A ``dict`` as defined by RFC 7517.
+    :rtype: dict
+    """
+    if _jwt_algorithm(public_key) == "EdDSA":
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        jwk = {"kty": "OKP", "crv": "Ed25519", "alg": "EdDSA", "x": b64encode(raw).decode("ascii")}
+    else:
+        numbers = public_key.public_numbers()
+        jwk = {"kty": "EC", "crv": "P-256", "alg": "ES256",
+               "x": b64encode(numbers.x.to_bytes(32, "big")).decode("ascii"),
+               "y": b64encode(numbers.y.to_bytes(32, "big")).decode("ascii")}
+
+    jwk["use"] = "sig"
+    if key_id is not None:
+        jwk["kid"] = key_id
+    return jwk
+
+
+def jwk_to_public_key(jwk):
+    """
+    Reverse of :func:`public_key_to_jwk`.
+
+    :raises ValueError: If the key type is not supported.
+    """
+    if jwk.get("kty") == "OKP" and jwk.get("crv") == "Ed25519":
+        return ed25519.Ed25519PublicKey.from_public_bytes(b64decode(jwk["x"].encode("ascii")))
+
+    if jwk.get("kty") == "EC" and jwk.get("crv") == "P-256":
+        x = int.from_bytes(b64decode(jwk["x"].encode("ascii")), "big")
+        y = int.from_bytes(b64decode(jwk["y"].encode("ascii")), "big")
+        return ec.EllipticCurvePublicNumbers(x, y, ec.SECP256R1()).public_key()
+
+    raise ValueError("Unsupported JSON Web Key '{0}'".format(jwk.get("kid")))
+
+
+class JwtTokenGenerator(TokenGenerator):
+    """
+    Generate JSON Web Tokens signed with an asymmetric key (Ed25519 or ECDSA P-256).
+
+    Resource servers only need the public key to validate these tokens, see :class:`JwtTokenVerifier`.
+    Besides the registered claims ``sub`` (the user id as string), ``iat``, ``exp``, ``jti`` and ``iss``
+    a token carries ``type``, ``grant_type``, ``client_id``, ``scope`` (space separated) and ``data``.
+
+    Requires the ``cryptography`` package.
+
+    :param private_key: A private key object of ``cryptography`` or a PEM encoded key.
+    :param key_id: Sent as ``kid`` in the header so verifiers can select the key.
+    :type key_id: str
+    :param issuer: Sent as ``iss`` claim. (optional)
+    :type issuer: str
+
+    The ``scope`` claim holds scope names, so grants that issue scope masks cannot use this generator.
+    """
+
+    supports_scope_masks = False
+
+    def __init__(self, private_key, key_id=None, issuer=None):
+        if ed25519 is None:  # pragma: no cover
+            raise ImportError("JwtTokenGenerator requires the 'cryptography' package")
+
+        self.private_key = _load_private_key(private_key)
+        self.algorithm = _jwt_algorithm(self.private_key)
+        self.key_id = key_id
+        self.issuer = issuer
+
+        header = {"alg": self.algorithm, "typ": "JWT"}
+        if key_id is not None:
+            header["kid"] = key_id
+        # The header never changes, so it is encoded only once.
+        self._header = b64encode(_json_encode(header).encode("utf-8")) + b"."
+
+        if self.algorithm == "ES256":
+            self._ecdsa = ec.ECDSA(hashes.SHA256())
+
+        TokenGenerator.__init__(self)
+
+    def jwk(self):
+        """
+        :return: The public key as JSON Web Key, to be published to resource servers.
+        :rtype: dict
+        """
+        return public_key_to_jwk(self.private_key.public_key(), self.key_id)
+
+    def verifier(self):
+        """
+        :return: A :class:`JwtTokenVerifier` for the tokens of this generator.
+        """
+        return JwtTokenVerifier(keys={self.key_id: self.private_key.public_key()}, issuer=self.issuer)
+
+    def generate(self, grant_type=None, data=None, scopes=None, user_id=None, client_id=None):
+        """
+        :return: A new token
+        :rtype: str
+        """
+        return self._sign("access_token", grant_type, data, scopes, user_id, client_id,
+                          self.expires_in.get(grant_type))
+
+    def refresh_generate(self, grant_type=None, data=None, scopes=None, user_id=None, client_id=None):
+        """
+        :return: A new refresh token
+        :rtype: str
+        """
+        return self._sign("refresh_token", grant_type, data, scopes, user_id, client_id, self.refresh_expires_in)
+
+    def _sign(self, token_type, grant_type, data, scopes, user_id, client_id, expires_in):
+        now = int(time.time())
+        claims = {"type": token_type, "iat": now, "jti": entropy_pool.token_urlsafe(16)}
+
+        if expires_in:
+            claims["exp"] = now + expires_in
+        if self.issuer is not None:
+            claims["iss"] = self.issuer
+        if user_id is not None:
+            claims["sub"] = str(user_id)
+        if grant_type:
+            claims["grant_type"] = grant_type
+        if client_id:
+            claims["client_id"] = client_id
+        if scopes:
+            claims["scope"] = " ".join(scopes)
+        if data:
+            claims["data"] = data
+
+        signing_input = self._header + b64encode(_json_encode(claims).encode("utf-8"))
+
+        if self.algorithm == "EdDSA":
+            signature = self.private_key.sign(signing_input)
+        else:
+            r, s = decode_dss_signature(self.private_key.sign(signing_input, self._ecdsa))
+            signature = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+        return (signing_input + b"." + b64encode(signature)).decode("ascii")
+
+
+class JwtTokenVerifier(object):
+    """
+    Validates tokens of :class:`JwtTokenGenerator` with public keys only.
+
+    Parsed keys and headers are cached, so validation is local CPU work without any I/O.
+    Keys are selected by the ``kid`` of a token; a key registered with id ``None`` validates
+    tokens without ``kid``.
+
+    Requires the ``cryptography`` package.
+
+    :param keys: A ``dict`` mapping key ids to public key objects or PEM encoded public keys.
+    :type keys: dict
+    :param issuer: If set, the ``iss`` claim of a token has to match.
+    :type issuer: str
+    :param leeway: Seconds a token is still accepted after its ``exp``.
+    :type leeway: int
+    """
+
+    # Upper bound of cached headers, distinct headers can be sent by anyone.
+    max_cached_headers = 64
+
+    def __init__(self, keys=None, issuer=None, leeway=0):
+        if ed25519 is None:  # pragma: no cover
+            raise ImportError("JwtTokenVerifier requires the 'cryptography' package")
+
+        self.issuer = issuer
+        self.leeway = leeway
+
+        self._keys = {}
+        self._headers = {}
+        self._ecdsa = ec.ECDSA(hashes.SHA256())
+        self._decode = json.JSONDecoder().decode
+
+        for key_id, key in (keys or {}).items():
+            self.add_key(key_id, key)
+
+    @classmethod
+    def from_jwks(cls, jwks, **kwargs):
+        """
+        Creates a verifier from a JWKS document like ``{"keys": [...]}``.
+        Keys of other types or algorithms are skipped.
+        """
+        verifier = cls(**kwargs)
+        verifier.load_jwks(jwks)
+        return verifier
+
+    def load_jwks(self, jwks):
+        """
+        Adds all supported keys of a JWKS document.
+        """
+        for jwk in jwks.get("keys", []):
+            try:
+                self.add_key(jwk.get("kid"), jwk_to_public_key(jwk))
+            except ValueError:
+                continue
+
+    def add_key(self, key_id, public_key):
+        """
+        Adds a public key object or PEM encoded public key.
+        """
+        public_key = _load_public_key(public_key)
+        self._keys[key_id] = (_jwt_algorithm(public_key), public_key)
+        self._headers.clear()
+
+    def remove_key(self, key_id):
+        self._keys.pop(key_id, None)
+        self._headers.clear()
+
+    def verify(self, token):
+        """
+        Verifies signature, expiration and issuer of a token.
+
+        :return: The claims of the token.
+        :rtype: dict
+
+        :raises oauth2.error.AccessTokenNotFound: If the token is not valid.
+        """
+        try:
+            if isinstance(token, str):
+                token = token.encode("ascii")
+
+            signing_input, signature = token.rsplit(b".", 1)
+            header, claims = signing_input.split(b".")
+
+            algorithm, public_key = self._key_for_header(header)
+            signature = b64decode(signature)
+
+            if algorithm == "EdDSA":
+                public_key.verify(signature, signing_input)
+            else:
+                if len(signature) != 64:
+                    raise AccessTokenNotFound
+                public_key.verify(encode_dss_signature(int.from_bytes(signature[:32], "big"),
+                                                       int.from_bytes(signature[32:], "big")),
+                                  signing_input, self._ecdsa)
+
+            claims = self._decode(b64decode(claims).decode("utf-8"))
+        except (ValueError, binascii.Error, InvalidSignature):
+            raise AccessTokenNotFound
+
+        if not isinstance(claims, dict):
+            raise AccessTokenNotFound
+
+        expires_at = claims.get("exp")
+        if expires_at is not None and (not isinstance(expires_at, (int, float))
+                                       or expires_at + self.leeway < time.time()):
+            raise AccessTokenNotFound
+
+        if self.issuer is not None and claims.get("iss") != self.issuer:
+            raise AccessTokenNotFound
+
+        return claims
+
+    def validate_token(self, token, token_type):
+        """
+        Like :meth:`verify` but also checks that the token is of type ``token_type``.
+        """
+        claims = self.verify(token)
+        if claims.get("type") != token_type:
+            raise AccessTokenNotFound
+        return claims
+
+    def _key_for_header(self, header):
+        try:
+            return self._headers[header]
+        except KeyError:
+            pass
+
+        fields = self._decode(b64decode(header).decode("utf-8"))
+        if not isinstance(fields, dict):
+            raise AccessTokenNotFound
+
+        key = self._keys.get(fields.get("kid"))
+        # The algorithm is bound to the key, a token cannot choose another one.
+        if key is None or fields.get("alg") != key[0]:
+            raise AccessTokenNotFound
+
+        if len(self._headers) < self.max_cached_headers:
+            self._headers[header] = key
+        return key
+
+
+class EntropyPool(object):
+    """
+    Hands out random bytes from blocks read from ``os.urandom()``.
+
+    Reading one large block instead of a few bytes per token saves a system call for almost
+    every token. The pool is thread-safe and discards its buffer in a forked child process,
+    so workers of a prefork server never share random bytes. Where ``os.register_at_fork()``
+    is available the child also gets a new lock, which another thread of the parent may have
+    held while it forked.
+
+    :param block_size: Number of bytes read from the OS at once.
+    :type block_size: int
+    """
+
+    def __init__(self, block_size=4096):
+        self.block_size = block_size
+        self._reset()
+
+        if hasattr(os, "register_at_fork"):
+            # A weak reference does not keep pools alive for the lifetime of the process.
+            after_fork = weakref.WeakMethod(self._reset)
+            os.register_at_fork(after_in_child=lambda: after_fork() and after_fork()())
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._buffer = b""
+        self._pos = 0
+        self._pid = os.getpid()
+
+    def read(self, size):
+        """
+        :return: ``size`` random bytes.
+        :rtype: bytes
+        """
+        if size > self.block_size:
+            return os.urandom(size)
+
+        with self._lock:
+            pos = self._pos
+            if pos + size > len(self._buffer) or self._pid != os.getpid():
+                self._buffer = os.urandom(self.block_size)
+                self._pid = os.getpid()
+                pos = 0
+
+            self._pos = pos + size
+            return self._buffer[pos:pos + size]
+
+    def token_hex(self, length):
+        """
+        :return: A random string of ``length`` hex digits.
+        :rtype: str
+        """
+        return self.read((length + 1) // 2).hex()[:length]
+
+    def token_urlsafe(self, length):
+        """
+        :return: A random string of ``length`` URL-safe base64 characters.
+        :rtype: str
+        """
+        return b64encode(self.read((length * 3 + 3) // 4))[:length].decode("ascii")
+
+    def token_hex_many(self, length, count):
+        """
+        :return: ``count`` strings as returned by :meth:`token_hex`, taken from one read.
+        :rtype: list
+        """
+        size = (length + 1) // 2 * 2
+        digits = self.read(size // 2 * count).hex()
+
+        return [digits[start:start + length] for start in range(0, size * count, size)]
+
+    def token_urlsafe_many(self, length, count):
+        """
+        :return: ``count`` strings as returned by :meth:`token_urlsafe`, taken from one read.
+        :rtype: list
+        """
+        # Whole groups of three bytes encode to four characters without padding.
+        size = (length + 3) // 4 * 4
+        characters = b64encode(self.read(size // 4 * 3 * count)).decode("ascii")
+
+        return [characters[start:start + length] for start in range(0, size * count, size)]
+
+    def uuid4(self):
+        """
+        :return: A random UUID (version 4) in its string form.
+        :rtype: str
+        """
+        return self.uuid4_many(1)[0]
+
+    def uuid4_many(self, count):
+        """
+        :return: ``count`` strings as returned by :meth:`uuid4`, taken from one read.
+        :rtype: list
+        """
+        data = bytearray(self.read(16 * count))
+        result = []
+
+        for start in range(0, 16 * count, 16):
+            data[start + 6] = data[start + 6] & 0x0f | 0x40
+            data[start + 8] = data[start + 8] & 0x3f | 0x80
+            value = data[start:start + 16].hex()
+            result.append("-".join((value[:8], value[8:12], value[12:16], value[16:20], value[20:])))
+
+        return result
+
+
+# Shared by all token generators of a process.
+entropy_pool = EntropyPool()
 
 
 class URandomTokenGenerator(TokenGenerator):
     """
-    Create a token using ``os.urandom()``.
+    Create a token of random hex digits from ``os.urandom()``.
+
+    :param length: Length of a token.
+    :type length: int
+    :param urlsafe: Use URL-safe base64 characters instead of hex digits, which carry 6 instead
+                    of 4 bits of entropy per character.
+    :type urlsafe: bool
+    :param pool: The :class:`EntropyPool` to read from. Defaults to the pool shared by all generators.
+    :type pool: EntropyPool
     """
 
-    def __init__(self, length=40):
+    def __init__(self, length=40, urlsafe=False, pool=None):
         self.token_length = length
+        self.urlsafe = urlsafe
+        self.pool = pool if pool is not None else entropy_pool
         TokenGenerator.__init__(self)
 
     def generate(self, grant_type=None, data=None, scopes=None, user_id=None, client_id=None):
@@ -150,26 +1289,42 @@ class URandomTokenGenerator(TokenGenerator):
         :return: A new token
         :rtype: str
         """
-        random_data = os.urandom(100)
-
-        hash_gen = hashlib.new("sha512")
-        hash_gen.update(random_data)
+        if self.urlsafe:
+            return self.pool.token_urlsafe(self.token_length)
+        return self.pool.token_hex(self.token_length)
 
-        return hash_gen.hexdigest()[:self.token_length]
+    def generate_many(self, requests):
+        if self.urlsafe:
+            return self.pool.token_urlsafe_many(self.token_length, len(requests))
+        return self.pool.token_hex_many(self.token_length, len(requests))
 
     refresh_generate = generate
 
+    refresh_generate_many = generate_many
+
 
 class Uuid4TokenGenerator(TokenGenerator):
     """
     Generate a token using uuid4.
+
+    :param pool: The :class:`EntropyPool` to read from. Defaults to the pool shared by all generators.
+    :type pool: EntropyPool
     """
 
+    def __init__(self, pool=None):
+        self.pool = pool if pool is not None else entropy_pool
+        TokenGenerator.__init__(self)
+
     def generate(self, grant_type=None, data=None, scopes=None, user_id=None, client_id=None):
         """
         :return: A new token
         :rtype: str
         """
-        return str(uuid.uuid4())
+        return self.pool.uuid4()
+
+    def generate_many(self, requests):
+        return self.pool.uuid4_many(len(requests))
 
     refresh_generate = generate
+
+    refresh_generate_many = generate_many
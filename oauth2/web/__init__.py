@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import copy
+
 
 class AuthenticatingSiteAdapter(object):
     """
@@ -103,6 +105,53 @@ class ResourceOwnerGrantSiteAdapter(AuthenticatingSiteAdapter):
     pass
 
 
+class AsyncAuthenticatingSiteAdapter(AuthenticatingSiteAdapter):
+    """
+    Like :class:`AuthenticatingSiteAdapter` but :meth:`authenticate` is a coroutine.
+
+    Used with :meth:`oauth2.Provider.dispatch_async`.
+    """
+    async def authenticate(self, request, environ, scopes, client):
+        raise NotImplementedError
+
+
+class AsyncUserFacingSiteAdapter(UserFacingSiteAdapter):
+    """
+    Like :class:`UserFacingSiteAdapter` but :meth:`render_auth_page` and :meth:`user_has_denied_access`
+    are coroutines.
+
+    Used with :meth:`oauth2.Provider.dispatch_async`.
+    """
+    async def render_auth_page(self, request, response, environ, scopes, client):
+        raise NotImplementedError
+
+    async def user_has_denied_access(self, request):
+        raise NotImplementedError
+
+
+class AsyncAuthorizationCodeGrantSiteAdapter(AsyncUserFacingSiteAdapter, AsyncAuthenticatingSiteAdapter,
+                                             AuthorizationCodeGrantSiteAdapter):
+    """
+    Asynchronous site adapter for :class:`oauth2.grant.AuthorizationCodeGrant`.
+    """
+    pass
+
+
+class AsyncImplicitGrantSiteAdapter(AsyncUserFacingSiteAdapter, AsyncAuthenticatingSiteAdapter,
+                                    ImplicitGrantSiteAdapter):
+    """
+    Asynchronous site adapter for :class:`oauth2.grant.ImplicitGrant`.
+    """
+    pass
+
+
+class AsyncResourceOwnerGrantSiteAdapter(AsyncAuthenticatingSiteAdapter, ResourceOwnerGrantSiteAdapter):
+    """
+    Asynchronous site adapter for :class:`oauth2.grant.ResourceOwnerGrant`.
+    """
+    pass
+
+
 class Request(object):
     """
     Base class defining the interface of a request.
@@ -144,11 +193,36 @@ class Request(object):
 class Response(object):
     """
     Contains data returned to the requesting user agent.
+
+    The body can be set as ``str`` or as UTF-8 encoded ``bytes``. HTTP adapters read :attr:`body_bytes`, so a
+    body that is set as ``bytes`` is passed to the server without another copy.
     """
     def __init__(self):
         self.status_code = 200
         self._headers = {"Content-Type": "text/html"}
-        self.body = ""
+        self._body = b""
+
+    @property
+    def body(self):
+        """
+        The body as ``str``.
+        """
+        body = self._body
+        return body.decode("utf-8") if isinstance(body, bytes) else body
+
+    @body.setter
+    def body(self, body):
+        self._body = body
+
+    @property
+    def body_bytes(self):
+        """
+        The body as UTF-8 encoded ``bytes``.
+        """
+        body = self._body
+        if not isinstance(body, bytes):
+            body = self._body = body.encode("utf-8")
+        return body
 
     @property
     def headers(self):
@@ -159,3 +233,11 @@ class Response(object):
         Add a header to the response.
         """
         self._headers[header] = str(value)
+
+    def copy(self):
+        """
+        :return: A copy of this response that shares the body and has its own headers.
+        """
+        response = copy.copy(self)
+        response._headers = dict(self._headers)
+        return response
@@ -5,7 +5,10 @@
 .. warning::
    aiohttp support is currently experimental.
 
-Use aiohttp to serve token requests:
+Use aiohttp to serve token requests. Requests are dispatched with :meth:`oauth2.Provider.dispatch_async`,
+so stores and site adapters can implement the asynchronous interfaces of :mod:`oauth2.store` and
+:mod:`oauth2.web`. A provider with synchronous stores should be given a
+:class:`oauth2.web.executor.DispatchExecutor` to keep it from blocking the event loop:
 
 .. literalinclude:: examples/aiohttp_server.py
 """
@@ -45,20 +48,30 @@ class Request(object):
 
 
 class OAuth2Handler:
-    def __init__(self, provider):
+    def __init__(self, provider, executor=None):
         """
         :type provider: :class:`oauth2.Provider`
+        :param executor: Runs the synchronous dispatch of the provider in a pool of threads.
+                         If not set, the provider is dispatched asynchronously in the event loop.
+        :type executor: :class:`oauth2.web.executor.DispatchExecutor`
         """
         self.provider = provider
+        self.executor = executor
 
     async def dispatch_request(self, request):
-        response = self.provider.dispatch(request=Request(request), environ=dict())
+        response = await self._dispatch(Request(request))
         return self._map_response(response)
 
     async def post_dispatch_request(self, request):
         data = await request.post()
-        response = self.provider.dispatch(request=Request(request, data), environ=dict())
+        response = await self._dispatch(Request(request, data))
         return self._map_response(response)
 
+    async def _dispatch(self, request):
+        if self.executor is None:
+            return await self.provider.dispatch_async(request=request, environ=dict())
+
+        return await self.executor.dispatch(self.provider, request, dict())
+
     def _map_response(self, response):
-        return web.Response(body=response.body, status=response.status_code, headers=response.headers)
+        return web.Response(body=response.body_bytes, status=response.status_code, headers=response.headers)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Serve token requests with an ASGI server like uvicorn or hypercorn:
+
+.. code-block:: python
+
+    from oauth2.web.asgi import Application
+
+    app = Application(provider=provider)
+
+Requests are dispatched with :meth:`oauth2.Provider.dispatch_async`, so stores and site adapters can implement the
+asynchronous interfaces of :mod:`oauth2.store` and :mod:`oauth2.web`. A provider with synchronous stores should be
+given a :class:`oauth2.web.executor.DispatchExecutor` to keep it from blocking the event loop.
+"""
+
+from oauth2.compatibility import unquote_plus
+from oauth2.web.wsgi import FORM_CONTENT_TYPE, MAX_BODY_SIZE, split_params
+
+
+def encode_headers(headers):
+    """
+    Encodes response headers as expected by the ``http.response.start`` event.
+
+    :param headers: ``dict`` of header name to value.
+
+    :return: ``list`` of ``(name, value)`` tuples of ``bytes`` with lowercase names.
+    """
+    return [(_encoded_name(name), value.encode("latin-1")) for name, value in headers.items()]
+
+
+def _encoded_name(name):
+    encoded = _header_names.get(name)
+    if encoded is None:
+        encoded = name.lower().encode("latin-1")
+        if len(_header_names) < 64:
+            _header_names[name] = encoded
+    return encoded
+
+
+_header_names = {}
+
+
+class Request(object):
+    """
+    Contains data of the current HTTP request.
+
+    Like :class:`oauth2.web.wsgi.Request` only the values of requested params are decoded.
+    """
+    def __init__(self, scope, body=b""):
+        """
+        :param scope: ASGI connection scope
+        :param body: The received body. Only parsed if it is urlencoded.
+        """
+        self.scope = scope
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query_string = scope.get("query_string", b"").decode("latin-1")
+        self.body = body
+
+        self._headers = None
+        self._query = None
+        self._body = None
+
+    def get_param(self, name, default=None):
+        """
+        Returns a param of a GET request identified by its name.
+        """
+        if self._query is None:
+            self._query = split_params(self.query_string)
+
+        try:
+            return unquote_plus(self._query[name])
+        except KeyError:
+            return default
+
+    def post_param(self, name, default=None):
+        """
+        Returns a param of a POST request identified by its name.
+        """
+        if self._body is None:
+            self._body = {}
+            if self.method == "POST" and self.header("content-type", "").startswith(FORM_CONTENT_TYPE):
+                self._body = split_params(self.body.decode("utf-8", "replace"))
+
+        try:
+            return unquote_plus(self._body[name])
+        except KeyError:
+            return default
+
+    def header(self, name, default=None):
+        """
+        Returns the value of the HTTP header identified by `name`.
+        """
+        if self._headers is None:
+            self._headers = dict((key.decode("latin-1"), value.decode("latin-1"))
+                                 for key, value in reversed(self.scope.get("headers", [])))
+
+        return self._headers.get(name.lower().replace("_", "-"), default)
+
+
+class Application(object):
+    """
+    Implements ASGI 3.
+
+    The body of an urlencoded POST request is received in chunks as they arrive. Requests with a body bigger than
+    ``max_body_size`` are rejected once their ``Content-Length`` or the received chunks exceed it.
+
+    :param provider: The provider that handles requests.
+    :type provider: oauth2.Provider
+    :param authorize_uri: Path of the authorization endpoint.
+    :param token_uri: Path of the token endpoint.
+    :param max_body_size: Largest body in bytes that is received.
+    :param executor: Runs the synchronous dispatch of the provider in a pool of threads.
+                     If not set, the provider is dispatched asynchronously in the event loop.
+    :type executor: oauth2.web.executor.DispatchExecutor
+    :param request_class: Class that wraps the ASGI scope and the received body.
+    """
+    REJECTIONS = dict((status_code, ({"type": "http.response.start", "status": status_code,
+                                      "headers": [(b"content-type", b"text/html"),
+                                                  (b"content-length", str(len(text)).encode("latin-1"))]},
+                                     {"type": "http.response.body", "body": text.encode("utf-8")}))
+                      for status_code, text in ((400, "Bad Request"), (404, "Not Found"),
+                                                (413, "Payload Too Large")))
+
+    def __init__(self, provider, authorize_uri="/authorize", token_uri="/token", max_body_size=MAX_BODY_SIZE,
+                 executor=None, request_class=Request):
+        self.authorize_uri = authorize_uri
+        self.executor = executor
+        self.max_body_size = max_body_size
+        self.provider = provider
+        self.request_class = request_class
+        self.token_uri = token_uri
+
+        self.provider.authorize_path = authorize_uri
+        self.provider.token_path = token_uri
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+
+        if scope["type"] != "http":
+            raise ValueError("Unsupported ASGI scope type '{0}'".format(scope["type"]))
+
+        if scope["path"] != self.authorize_uri and scope["path"] != self.token_uri:
+            return await self._reject(404, send)
+
+        body = b""
+        if scope["method"] == "POST":
+            body = await self._receive_body(scope, receive)
+            if isinstance(body, int):
+                return await self._reject(body, send)
+
+        request = self.request_class(scope, body)
+
+        if self.executor is None:
+            response = await self.provider.dispatch_async(request, {})
+        else:
+            response = await self.executor.dispatch(self.provider, request, {})
+
+        body = response.body_bytes
+        headers = encode_headers(response.headers)
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+        await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _receive_body(self, scope, receive):
+        """
+        Receives an urlencoded body.
+
+        :return: The body or the status code to reject the request with.
+        """
+        length = None
+        is_form = False
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    length = int(value)
+                except ValueError:
+                    return 400
+                if length < 0:
+                    return 400
+            elif name == b"content-type":
+                is_form = value.startswith(FORM_CONTENT_TYPE.encode("latin-1"))
+
+        if not is_form:
+            return b""
+
+        if length is not None and length > self.max_body_size:
+            return 413
+
+        chunks = []
+        received = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return 400
+
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if received > self.max_body_size:
+                return 413
+
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+
+        return b"".join(chunks)
+
+    async def _reject(self, status_code, send):
+        start, body = self.REJECTIONS[status_code]
+        await send(start)
+        await send(body)
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
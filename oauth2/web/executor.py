@@ -0,0 +1,117 @@
+"""
+Runs :meth:`oauth2.Provider.dispatch` outside of an event loop.
+
+The aiohttp and Tornado adapters serve requests in an event loop. A provider with synchronous stores or site
+adapters blocks that loop while it waits for I/O, which stalls every connection served by it. Passing a
+:class:`DispatchExecutor` to an adapter moves the synchronous dispatch to a pool of threads of fixed size, so a
+slow store only delays the requests waiting for it:
+
+.. code-block:: python
+
+    from oauth2.web.aiohttp import OAuth2Handler
+    from oauth2.web.executor import DispatchExecutor
+
+    handler = OAuth2Handler(provider, executor=DispatchExecutor(max_workers=8, max_queue=64))
+
+Requests that arrive while all threads are busy and ``max_queue`` requests are already waiting are answered at once
+with ``503 Service Unavailable``.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from oauth2.compatibility import json_dumps_bytes
+from oauth2.log import gen_log
+from oauth2.web import Response
+
+
+class DispatchExecutor(object):
+    """
+    Dispatches requests to a synchronous :class:`oauth2.Provider` in a bounded pool of threads.
+
+    :param max_workers: Number of threads that dispatch requests.
+    :param max_queue: Number of requests that may wait for a free thread. Any further request is rejected.
+    :param retry_after: Seconds sent in the ``Retry-After`` header of a rejected request.
+    :param on_timing: Callable that receives the request, the response, the seconds the request waited for a thread
+                      and the seconds it took to dispatch. Defaults to logging both at debug level.
+    """
+
+    def __init__(self, max_workers=4, max_queue=32, retry_after=1, on_timing=None):
+        if max_workers < 1:
+            raise ValueError("max_workers has to be at least 1")
+
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_pending = max_workers + max_queue
+        self.retry_after = retry_after
+        self.on_timing = on_timing or self._log_timing
+        self.pending = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="oauth2-dispatch")
+        self._overloaded_body = json_dumps_bytes({"error": "temporarily_unavailable",
+                                                  "error_description": "Too many pending requests"})
+
+    async def dispatch(self, provider, request, environ):
+        """
+        Runs :meth:`oauth2.Provider.dispatch` in a thread of the pool.
+
+        :param provider: The provider that handles the request.
+        :type provider: oauth2.Provider
+        :param request: The incoming request.
+        :param environ: Passed through to the provider.
+
+        :return: The response of the provider or ``503 Service Unavailable`` if too many requests are pending.
+        :rtype: oauth2.web.Response
+        """
+        if self.pending >= self.max_pending:
+            return self.overloaded_response()
+
+        self.pending += 1
+        queued = time.perf_counter()
+        try:
+            started, finished, response = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._dispatch, provider, request, environ)
+        finally:
+            self.pending -= 1
+
+        self.on_timing(request, response, started - queued, finished - started)
+
+        return response
+
+    def overloaded_response(self):
+        """
+        Creates the response to a request that is rejected because too many requests are pending.
+
+        :rtype: oauth2.web.Response
+        """
+        response = Response()
+        response.status_code = 503
+        response.add_header("Content-Type", "application/json")
+        response.add_header("Retry-After", str(self.retry_after))
+        response.body = self._overloaded_body
+
+        return response
+
+    def shutdown(self, wait=True):
+        """
+        Stops the threads of the pool.
+
+        :param wait: Whether to wait for pending requests to finish.
+        """
+        self._executor.shutdown(wait=wait)
+
+    @staticmethod
+    def _dispatch(provider, request, environ):
+        started = time.perf_counter()
+        response = provider.dispatch(request, environ)
+
+        return started, time.perf_counter(), response
+
+    @staticmethod
+    def _log_timing(request, response, wait, run):
+        gen_log.debug("%s %s %d waited %.2f ms, dispatched in %.2f ms", request.method, request.path,
+                      response.status_code, wait * 1000, run * 1000)
@@ -52,6 +52,6 @@ def oauth_request_hook(provider):
         def decorated_fn(*args, **kwargs):
             # We are not call fn(args, kwargs) because oauth.dispatch should doing that.
             response = provider.dispatch(Request(request), request.environ)
-            return response.body, response.status_code, response.headers.items()
+            return response.body_bytes, response.status_code, response.headers.items()
         return decorated_fn
     return wrapper
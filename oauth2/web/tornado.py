@@ -5,7 +5,15 @@
 .. warning::
    Tornado support is currently experimental.
 
-Use Tornado to serve token requests:
+Use Tornado to serve token requests. Requests are dispatched with :meth:`oauth2.Provider.dispatch_async`,
+so stores and site adapters can implement the asynchronous interfaces of :mod:`oauth2.store` and
+:mod:`oauth2.web`. A provider with synchronous stores should be given a
+:class:`oauth2.web.executor.DispatchExecutor` to keep it from blocking the IOLoop:
+
+.. code-block:: python
+
+    url(provider.token_path, OAuth2Handler, dict(provider=provider, executor=DispatchExecutor()))
+
 
 .. literalinclude:: examples/tornado_server.py
 """
@@ -46,28 +54,37 @@ class Request(object):
 
 
 class OAuth2Handler(RequestHandler):
-    def initialize(self, provider):
+    def initialize(self, provider, executor=None):
         """
         :type provider: :class:`oauth2.Provider`
+        :param executor: Runs the synchronous dispatch of the provider in a pool of threads.
+                         If not set, the provider is dispatched asynchronously in the IOLoop.
+        :type executor: :class:`oauth2.web.executor.DispatchExecutor`
         """
         self.provider = provider
+        self.executor = executor
 
-    def get(self):
-        response = self._dispatch_request()
+    async def get(self):
+        response = await self._dispatch_request()
 
         self._map_response(response)
 
-    def post(self):
-        response = self._dispatch_request()
+    async def post(self):
+        response = await self._dispatch_request()
 
         self._map_response(response)
 
-    def _dispatch_request(self):
-        return self.provider.dispatch(request=Request(handler=self), environ=dict())
+    async def _dispatch_request(self):
+        request = Request(handler=self)
+
+        if self.executor is None:
+            return await self.provider.dispatch_async(request=request, environ=dict())
+
+        return await self.executor.dispatch(self.provider, request, dict())
 
     def _map_response(self, response):
         for name, value in list(response.headers.items()):
             self.set_header(name, value)
 
         self.set_status(response.status_code)
-        self.write(response.body)
+        self.write(response.body_bytes)
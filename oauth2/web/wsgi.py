@@ -5,43 +5,115 @@
 Classes for handling a HTTP request/response flow.
 """
 
-from oauth2.compatibility import parse_qs
+from oauth2.compatibility import unquote_plus
+
+#: Largest request body in bytes that is read. Bigger bodies are rejected by :class:`Application`.
+MAX_BODY_SIZE = 64 * 1024
+
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+
+
+def content_length(env):
+    """
+    Reads ``CONTENT_LENGTH`` from a WSGI environment. An empty value, as sent by ``wsgiref`` for a request
+    without a body, counts as 0.
+
+    :param env: Wsgi environment
+
+    :return: The length of the body or ``None`` if it is missing or invalid.
+    :rtype: int
+    """
+    try:
+        length = int(env["CONTENT_LENGTH"] or 0)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    return length if length >= 0 else None
+
+
+def split_params(query):
+    """
+    Splits an urlencoded string into its params without decoding the values.
+
+    Like ``parse_qs`` params without a value are left out and the first value of a param wins.
+
+    :param query: An urlencoded string.
+
+    :return: A ``dict`` of param name to undecoded value.
+    :rtype: dict
+    """
+    params = {}
+    for pair in query.split("&"):
+        name, _, value = pair.partition("=")
+        if not value:
+            continue
+        if "%" in name or "+" in name:
+            name = unquote_plus(name)
+        params.setdefault(name, value)
+
+    return params
 
 
 class Request(object):
     """
     Contains data of the current HTTP request.
+
+    The query string and the body are parsed on first access and only the values of requested params are decoded.
+    A body is read if it is urlencoded and its ``CONTENT_LENGTH`` is valid and at most ``max_body_size``.
     """
-    def __init__(self, env):
+    def __init__(self, env, max_body_size=MAX_BODY_SIZE):
         """
         :param env: Wsgi environment
+        :param max_body_size: Largest body in bytes that is read.
         """
         self.method = env["REQUEST_METHOD"]
-        self.query_params = {}
         self.query_string = env["QUERY_STRING"]
         self.path = env["PATH_INFO"]
-        self.post_params = {}
         self.env_raw = env
+        self.max_body_size = max_body_size
 
-        for param, value in parse_qs(env["QUERY_STRING"]).items():
-            self.query_params[param] = value[0]
+        self._query = None
+        self._body = None
+        self._query_params = None
+        self._post_params = None
 
-        if (self.method == "POST" and env["CONTENT_TYPE"].startswith("application/x-www-form-urlencoded")):
-            self.post_params = {}
-            content = env['wsgi.input'].read(int(env['CONTENT_LENGTH']))
-            post_params = parse_qs(content)
+    @property
+    def query_params(self):
+        """
+        All params of the query string. Decoded on first access, can be replaced by assigning a ``dict``.
+        """
+        if self._query_params is None:
+            self._query_params = dict((name, unquote_plus(value)) for name, value in self._query_values().items())
+
+        return self._query_params
+
+    @query_params.setter
+    def query_params(self, params):
+        self._query_params = params
 
-            for param, value in post_params.items():
-                decoded_param = param.decode('utf-8')
-                decoded_value = value[0].decode('utf-8')
-                self.post_params[decoded_param] = decoded_value
+    @property
+    def post_params(self):
+        """
+        All params of an urlencoded body. Decoded on first access, can be replaced by assigning a ``dict``.
+        """
+        if self._post_params is None:
+            self._post_params = dict((name, unquote_plus(value)) for name, value in self._body_values().items())
+
+        return self._post_params
+
+    @post_params.setter
+    def post_params(self, params):
+        self._post_params = params
 
     def get_param(self, name, default=None):
         """
         Returns a param of a GET request identified by its name.
         """
+        if self._query_params is not None:
+            return self._query_params.get(name, default)
+
         try:
-            return self.query_params[name]
+            return unquote_plus(self._query_values()[name])
         except KeyError:
             return default
 
@@ -49,11 +121,33 @@ class Request(object):
         """
         Returns a param of a POST request identified by its name.
         """
+        if self._post_params is not None:
+            return self._post_params.get(name, default)
+
         try:
-            return self.post_params[name]
+            return unquote_plus(self._body_values()[name])
         except KeyError:
             return default
 
+    def _query_values(self):
+        if self._query is None:
+            self._query = split_params(self.query_string)
+
+        return self._query
+
+    def _body_values(self):
+        if self._body is None:
+            self._body = {}
+            env = self.env_raw
+
+            if self.method == "POST" and env.get("CONTENT_TYPE", "").startswith(FORM_CONTENT_TYPE):
+                length = content_length(env)
+                if length is not None and length <= self.max_body_size:
+                    content = env["wsgi.input"].read(length)
+                    self._body = split_params(content.decode("utf-8", "replace"))
+
+        return self._body
+
     def header(self, name, default=None):
         """
         Returns the value of the HTTP header identified by `name`.
@@ -70,6 +164,10 @@ class Application(object):
     """
     Implements WSGI.
 
+    Urlencoded POST requests without a valid ``CONTENT_LENGTH`` or with a body bigger than ``max_body_size``
+    are rejected before the body is read. ``request_class`` is created with the environment and
+    ``max_body_size`` is set on the new request.
+
     .. versionchanged:: 1.0.0
        Renamed from ``Server`` to ``Application``.
     """
@@ -78,12 +176,15 @@ class Application(object):
                   302: "302 Found",
                   400: "400 Bad Request",
                   401: "401 Unauthorized",
-                  404: "404 Not Found"}
+                  404: "404 Not Found",
+                  411: "411 Length Required",
+                  413: "413 Payload Too Large"}
 
     def __init__(self, provider, authorize_uri="/authorize", env_vars=None,
-                 request_class=Request, token_uri="/token"):
+                 request_class=Request, token_uri="/token", max_body_size=MAX_BODY_SIZE):
         self.authorize_uri = authorize_uri
         self.env_vars = env_vars
+        self.max_body_size = max_body_size
         self.request_class = request_class
         self.provider = provider
         self.token_uri = token_uri
@@ -98,7 +199,19 @@ class Application(object):
             start_response("404 Not Found", [('Content-type', 'text/html')])
             return [b"Not Found"]
 
+        # Urlencoded bodies are rejected before anything is read if their size is unknown or too big.
+        if env.get("REQUEST_METHOD") == "POST" and env.get("CONTENT_TYPE", "").startswith(FORM_CONTENT_TYPE):
+            if "CONTENT_LENGTH" not in env:
+                return self._reject(411, start_response)
+
+            length = content_length(env)
+            if length is None:
+                return self._reject(400, start_response)
+            if length > self.max_body_size:
+                return self._reject(413, start_response)
+
         request = self.request_class(env)
+        request.max_body_size = self.max_body_size
 
         if isinstance(self.env_vars, list):
             for varname in self.env_vars:
@@ -108,4 +221,9 @@ class Application(object):
         response = self.provider.dispatch(request, environ)
         start_response(self.HTTP_CODES[response.status_code], list(response.headers.items()))
 
-        return [response.body.encode('utf-8')]
+        return [response.body_bytes]
+
+    def _reject(self, status_code, start_response):
+        status = self.HTTP_CODES[status_code]
+        start_response(status, [('Content-type', 'text/html')])
+        return [status[4:].encode('utf-8')]
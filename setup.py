@@ -15,21 +15,20 @@ setup(
         for d in os.walk("oauth2")
         if not d[0].endswith("__pycache__")
     ],
-    install_requires=["ujson", "itsdangerous"],
+    python_requires=">=3.9",
+    install_requires=["ujson"],
     extras_require={
         "memcache": ["python-memcached"],
         "mongodb": ["pymongo"],
-        "redis": ["redis"],
+        "redis": ["redis>=6.2.0"],
+        "msgpack": ["msgpack"],
+        "jwt": ["cryptography"],
+        "orjson": ["orjson"],
     },
     classifiers=[
         "Development Status :: 4 - Beta",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.4",
-        "Programming Language :: Python :: 3.5",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
     ],